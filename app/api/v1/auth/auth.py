@@ -18,7 +18,7 @@ from app.api.v1.models.auth import ErrorMessage
 
 from app.api.v1.models.user import UserScope
 from app.core import Settings
-from app.core.user import get_user_info
+from app.core.user import get_user_info_async
 
 from ..models import Token, TokenData
 
@@ -135,9 +135,9 @@ async def login_for_access_token(
     request: Request, form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Token:
     """Log in using the provided username and password."""
-    authenticated = AuthenticationContext(
+    authenticated = await AuthenticationContext(
         request.app.state.settings
-    ).authenticate_credential(form_data.username, form_data.password)
+    ).authenticate_credential_async(form_data.username, form_data.password)
     if not authenticated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -145,7 +145,9 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     # get the database cached user info
-    user_info = get_user_info(form_data.username, request.app.state.settings)
+    user_info = await get_user_info_async(
+        form_data.username, request.app.state.settings
+    )
     access_token_expires = timedelta(
         minutes=request.app.state.settings.AUTH_ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -21,9 +21,10 @@ from ..models import (
 
 from ....core import (
     AuthenticationContext,
-    get_user_info,
+    get_user_info_async,
     set_user_info,
     filter_user_info,
+    filter_user_info_async,
     get_auth_credential,
     set_auth_credential,
     update_auth_credential,
@@ -53,7 +54,9 @@ async def find_users(
     If no filter criteria is specified the API will return all users.
     """
     filter = write_json_object(data.filter) if data.filter else {}
-    users = filter_user_info(filter, skip, limit, request.app.state.settings)
+    users = await filter_user_info_async(
+        filter, skip, limit, request.app.state.settings
+    )
     return UserQueryResponse(users=users)
 
 
@@ -84,7 +87,9 @@ async def me(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User not specified"
         )
 
-    current_user = get_user_info(token_data.username, request.app.state.settings)
+    current_user = await get_user_info_async(
+        token_data.username, request.app.state.settings
+    )
 
     if current_user.disabled:
         raise HTTPException(
@@ -137,7 +142,7 @@ def create_user(
     dependencies=[ScopedTo([UserScope.admin])],
     tags=[USER],
 )
-async def reset_password(request: Request, username: str) -> Any:
+def reset_password(request: Request, username: str) -> Any:
     """Reset a user's password."""
 
     credential = get_auth_credential(
@@ -0,0 +1,151 @@
+from typing import Any, Dict, Mapping, Optional
+
+from gmpy2 import mpz
+
+from electionguard.ballot import (
+    CiphertextBallotContest,
+    CiphertextBallotSelection,
+    SubmittedBallot,
+)
+from electionguard.ballot_box import BallotBoxState
+from electionguard.chaum_pedersen import (
+    ConstantChaumPedersenProof,
+    DisjunctiveChaumPedersenProof,
+)
+from electionguard.elgamal import ElGamalCiphertext
+from electionguard.group import P, Q, ElementModP, ElementModQ
+from electionguard.proof import ProofUsage
+
+from .type_mapper import type_error_message
+
+__all__ = ["decode_submitted_ballot", "decode_ciphertext"]
+
+_P = mpz(P)
+_Q = mpz(Q)
+
+# both encodings name enums differently, so accept either
+_STATES: Dict[Any, BallotBoxState] = {
+    **{state.name: state for state in BallotBoxState},
+    **{state.value: state for state in BallotBoxState},
+}
+_USAGES: Dict[str, ProofUsage] = {
+    **{usage.name: usage for usage in ProofUsage},
+    **{usage.value: usage for usage in ProofUsage},
+}
+
+
+def decode_submitted_ballot(data: Mapping[str, Any]) -> SubmittedBallot:
+    """
+    Build a submitted ballot from its json object in one pass,
+    without the intermediate models of `SubmittedBallotDto`
+    or the reflection of `SubmittedBallot.from_json_object`.
+
+    Accepts the api encoding, with elements wrapped as `{"data": hex}`,
+    and the sdk encoding, with elements as bare hex strings.
+    Elements are parsed straight from hex and checked to be in range.
+    Raises ValueError if the ballot is malformed.
+    """
+    try:
+        return SubmittedBallot(
+            data["object_id"],
+            data["style_id"],
+            _q(data["manifest_hash"]),
+            _q(data["code_seed"]),
+            [_contest(contest) for contest in data["contests"]],
+            _q(data["code"]),
+            int(data["timestamp"]),
+            _q(data["crypto_hash"]),
+            _optional_q(data.get("nonce")),
+            _STATES[data["state"]],
+        )
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"could not decode ballot: {error!r}") from error
+
+
+def _contest(data: Mapping[str, Any]) -> CiphertextBallotContest:
+    proof = data["proof"]
+    return CiphertextBallotContest(
+        data["object_id"],
+        _q(data["description_hash"]),
+        [_selection(selection) for selection in data["ballot_selections"]],
+        _ciphertext(data["ciphertext_accumulation"]),
+        _q(data["crypto_hash"]),
+        _optional_q(data.get("nonce")),
+        ConstantChaumPedersenProof(
+            _p(proof["pad"]),
+            _p(proof["data"]),
+            _q(proof["challenge"]),
+            _q(proof["response"]),
+            int(proof["constant"]),
+            _USAGES[proof["usage"]],
+        ),
+    )
+
+
+def _selection(data: Mapping[str, Any]) -> CiphertextBallotSelection:
+    proof = data["proof"]
+    extended_data = data.get("extended_data")
+    return CiphertextBallotSelection(
+        data["object_id"],
+        _q(data["description_hash"]),
+        _ciphertext(data["ciphertext"]),
+        _q(data["crypto_hash"]),
+        _bool(data["is_placeholder_selection"]),
+        _optional_q(data.get("nonce")),
+        DisjunctiveChaumPedersenProof(
+            _p(proof["proof_zero_pad"]),
+            _p(proof["proof_zero_data"]),
+            _p(proof["proof_one_pad"]),
+            _p(proof["proof_one_data"]),
+            _q(proof["proof_zero_challenge"]),
+            _q(proof["proof_one_challenge"]),
+            _q(proof["challenge"]),
+            _q(proof["proof_zero_response"]),
+            _q(proof["proof_one_response"]),
+            _USAGES[proof["usage"]],
+        ),
+        None if extended_data is None else _ciphertext(extended_data),
+    )
+
+
+def decode_ciphertext(data: Mapping[str, Any]) -> ElGamalCiphertext:
+    """
+    Build a ciphertext from its json object, as stored in a ballot or tally.
+    Raises ValueError if the ciphertext is malformed.
+    """
+    try:
+        return _ciphertext(data)
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"could not decode ciphertext: {error!r}") from error
+
+
+def _ciphertext(data: Mapping[str, Any]) -> ElGamalCiphertext:
+    return ElGamalCiphertext(_p(data["pad"]), _p(data["data"]))
+
+
+# Elements are converted one at a time as they are reached.  Converting a ballot's
+# elements in one call is only slightly faster, and finding them first costs more
+# than it saves, see tests/benchmarks/ballot_decoding.py.
+def _p(value: Any) -> ElementModP:
+    element = mpz(value["data"] if isinstance(value, dict) else value, 16)
+    if not 0 <= element < _P:
+        raise ValueError(type_error_message(str(value), "element_mod_p"))
+    return ElementModP(element)
+
+
+def _q(value: Any) -> ElementModQ:
+    element = mpz(value["data"] if isinstance(value, dict) else value, 16)
+    if not 0 <= element < _Q:
+        raise ValueError(type_error_message(str(value), "element_mod_q"))
+    return ElementModQ(element)
+
+
+def _bool(value: Any) -> bool:
+    # bool("false") is True, so only json booleans are accepted
+    if not isinstance(value, bool):
+        raise ValueError(type_error_message(str(value), "bool"))
+    return value
+
+
+def _optional_q(value: Any) -> Optional[ElementModQ]:
+    return None if value is None else _q(value)
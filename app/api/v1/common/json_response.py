@@ -0,0 +1,102 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, TypeVar, Union
+import gzip
+import json
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+__all__ = ["fast_json_response", "encode_json"]
+
+# most of the size reduction of level 9 for a fraction of the time
+_GZIP_LEVEL = 6
+
+_Model = TypeVar("_Model", bound=BaseModel)
+
+
+def fast_json_response(
+    request: Request, content: _Model, status_code: int = 200
+) -> Union[_Model, Response]:
+    """
+    Render a response model straight to json bytes when FAST_JSON_RESPONSES is set.
+
+    The model is trusted as built by the route, so it is neither validated again
+    against the route's `response_model` nor walked by `jsonable_encoder`.
+    The body is gzipped when the client accepts it and it is large enough to gain.
+    Otherwise the model is returned for FastAPI to render as usual.
+    """
+    settings = request.app.state.settings
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+
+    body = encode_json(content)
+    headers = {"Vary": "Accept-Encoding"}
+    accepts_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    if accepts_gzip and len(body) >= settings.RESPONSE_GZIP_MINIMUM_SIZE:
+        body = gzip.compress(body, compresslevel=_GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header allows gzip, honoring quality values.
+    A coding listed with q=0 is refused, and `*` covers gzip when it is not listed.
+    """
+    qualities: Dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *parameters = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Encode json ready content, including pydantic models, to bytes.
+    Uses orjson when it is installed and the content fits it.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_encode_default)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits, which json accepts
+            pass
+    return json.dumps(
+        content,
+        default=_encode_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        # the field values of a model, without copying them as `dict()` would
+        return value.__dict__
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not json serializable")
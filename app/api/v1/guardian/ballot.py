@@ -1,11 +1,14 @@
+from typing import Union
+
 from electionguard.ballot import SubmittedBallot
 from electionguard.decryption import compute_decryption_share_for_ballot
 from electionguard.election import CiphertextElectionContext
 from electionguard.key_ceremony import ElectionKeyPair
 from electionguard.scheduler import Scheduler
 from electionguard.serializable import read_json_object, write_json_object
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response
 
+from app.api.v1.common.json_response import fast_json_response
 from app.core.scheduler import get_scheduler
 from ..models import (
     DecryptBallotSharesRequest,
@@ -20,9 +23,10 @@ router = APIRouter()
     "/decrypt-shares", response_model=DecryptBallotSharesResponse, tags=[TALLY]
 )
 def decrypt_ballot_shares(
+    http_request: Request,
     request: DecryptBallotSharesRequest = Body(...),
     scheduler: Scheduler = Depends(get_scheduler),
-) -> DecryptBallotSharesResponse:
+) -> Union[DecryptBallotSharesResponse, Response]:
     """
     Decrypt this guardian's share of one or more ballots
     """
@@ -45,4 +49,4 @@ def decrypt_ballot_shares(
         shares=[write_json_object(share) for share in shares]
     )
 
-    return response
+    return fast_json_response(http_request, response)
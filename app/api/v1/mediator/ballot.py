@@ -1,8 +1,19 @@
-from typing import List, Optional, Tuple, cast
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple, Union
 from logging import getLogger
-import sys
-
-from fastapi import APIRouter, Body, HTTPException, Request, status
+import json
+import zlib
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
 
 from electionguard.ballot import (
     SubmittedBallot,
@@ -10,35 +21,52 @@ from electionguard.ballot import (
     from_ciphertext_ballot,
 )
 from electionguard.ballot_box import BallotBoxState
-from electionguard.ballot_validator import ballot_is_valid_for_election
-from electionguard.election import CiphertextElectionContext
-from electionguard.manifest import InternalManifest, Manifest
+from electionguard.scheduler import Scheduler
 from electionguard.serializable import write_json_object
 from app.api.v1.auth.auth import ScopedTo
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.common.json_response import fast_json_response
 
-from app.api.v1.models.ballot import BallotInventory, SubmitBallotsRequestDto
 from app.api.v1.models.user import UserScope
 
 from ....core.ballot import (
+    exclude_duplicate_ballots,
     filter_ballots,
     get_ballot,
+    get_ballot_async,
+    get_ballot_code_async,
     set_ballots,
     get_ballot_inventory,
-    upsert_ballot_inventory,
+    add_ballot_inventory,
+)
+from ....core.ballot_queue import (
+    drain_ballot_queue,
+    get_ballot_submission,
+    publish_ballot_submission,
+)
+from ....core.ballot_validator import (
+    BallotValidationParameters,
+    get_election_validation_parameters,
+    get_validation_parameters,
+    validate_ballots,
 )
 from ....core.election import get_election
-from ....core.repository import get_repository, DataCollection
-from ....core.settings import Settings
-from ....core.queue import get_message_queue, IMessageQueue
+from ....core.scheduler import get_scheduler
+from ....core.settings import QueueMode, Settings
 from ..models import (
     BaseResponse,
     BaseQueryRequest,
     BaseBallotRequest,
+    BallotIngestChunk,
+    BallotCodeResponse,
+    BallotIngestResponse,
     BallotInventoryResponse,
     BallotQueryResponse,
+    BallotSubmissionResponse,
     CastBallotsRequest,
     SpoilBallotsRequest,
     SubmitBallotsRequest,
+    SubmitBallotsResponse,
     ValidateBallotRequest,
 )
 from ..tags import BALLOTS
@@ -61,14 +89,52 @@ def fetch_ballot(
     )
 
 
+@router.get("/code/{code}", response_model=BallotCodeResponse, tags=[BALLOTS])
+async def fetch_ballot_code(
+    request: Request,
+    response: Response,
+    code: str,
+    election_id: str,
+    include_ballot: bool = False,
+) -> BallotCodeResponse:
+    """
+    Fetch the ballot id and state of a ballot tracking code, and optionally the ballot.
+
+    Found codes do not change, so the response may be cached by clients and proxies.
+    """
+    settings = request.app.state.settings
+    ballot_code = await get_ballot_code_async(election_id, code, settings)
+    if not ballot_code:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Could not find ballot code {code}",
+        )
+
+    ballot = None
+    if include_ballot:
+        ballot = await get_ballot_async(election_id, ballot_code.object_id, settings)
+    response.headers[
+        "Cache-Control"
+    ] = f"public, max-age={int(settings.CACHE_TTL_SECONDS)}"
+    return BallotCodeResponse(
+        election_id=election_id,
+        ballot_code=ballot_code,
+        ballot=ballot.to_json_object() if ballot else None,
+    )
+
+
 @router.get("/inventory", response_model=BallotInventoryResponse, tags=[BALLOTS])
 def fetch_ballot_inventory(
-    request: Request, election_id: str
+    request: Request, election_id: str, skip: int = 0, limit: int = 1000
 ) -> BallotInventoryResponse:
     """
     Fetch the Ballot Inventory for a specific election.
+
+    The counts include every ballot.  The cast and spoiled ballot codes are paged by skip and limit.
     """
-    inventory = get_ballot_inventory(election_id, request.app.state.settings)
+    inventory = get_ballot_inventory(
+        election_id, request.app.state.settings, skip, limit
+    )
 
     return BallotInventoryResponse(
         inventory=inventory,
@@ -82,7 +148,7 @@ def find_ballots(
     skip: int = 0,
     limit: int = 100,
     data: BaseQueryRequest = Body(...),
-) -> BallotQueryResponse:
+) -> Union[BallotQueryResponse, Response]:
     """
     Find Ballots.
 
@@ -93,14 +159,18 @@ def find_ballots(
     ballots = filter_ballots(
         election_id, filter, skip, limit, request.app.state.settings
     )
-    return BallotQueryResponse(
-        election_id=election_id, ballots=[ballot.to_json_object() for ballot in ballots]
+    return fast_json_response(
+        request,
+        BallotQueryResponse(
+            election_id=election_id,
+            ballots=[ballot.to_json_object() for ballot in ballots],
+        ),
     )
 
 
 @router.post(
     "/cast",
-    response_model=BaseResponse,
+    response_model=SubmitBallotsResponse,
     tags=[BALLOTS],
     dependencies=[ScopedTo([UserScope.admin])],
     status_code=status.HTTP_202_ACCEPTED,
@@ -109,12 +179,14 @@ def cast_ballots(
     request: Request,
     election_id: Optional[str] = None,
     data: CastBallotsRequest = Body(...),
-) -> BaseResponse:
+    scheduler: Scheduler = Depends(get_scheduler),
+) -> SubmitBallotsResponse:
     """
     Cast ballot
     """
     logger.info(f"casting ballot for election {election_id}")
-    manifest, context, election_id = _get_election_parameters(election_id, data)
+    settings = request.app.state.settings
+    parameters, election_id = _get_election_parameters(election_id, data, settings)
     ballots = [
         from_ciphertext_ballot(
             CiphertextBallot.from_json_object(ballot), BallotBoxState.CAST
@@ -122,19 +194,16 @@ def cast_ballots(
         for ballot in data.ballots
     ]
 
-    for ballot in ballots:
-        validation_request = ValidateBallotRequest(
-            ballot=ballot.to_json_object(), manifest=manifest, context=context
-        )
-        _validate_ballot(validation_request)
+    ballots, duplicate_ids = exclude_duplicate_ballots(election_id, ballots, settings)
+    _validate_ballots(ballots, parameters, settings, scheduler)
 
     logger.info(f"all {len(ballots)} ballots validated successfully")
-    return _submit_ballots(election_id, ballots, request.app.state.settings)
+    return _submit_ballots(election_id, ballots, settings, duplicate_ids)
 
 
 @router.post(
     "/spoil",
-    response_model=BaseResponse,
+    response_model=SubmitBallotsResponse,
     tags=[BALLOTS],
     dependencies=[ScopedTo([UserScope.admin])],
     status_code=status.HTTP_202_ACCEPTED,
@@ -143,11 +212,13 @@ def spoil_ballots(
     request: Request,
     election_id: Optional[str] = None,
     data: SpoilBallotsRequest = Body(...),
-) -> BaseResponse:
+    scheduler: Scheduler = Depends(get_scheduler),
+) -> SubmitBallotsResponse:
     """
     Spoil ballot
     """
-    manifest, context, election_id = _get_election_parameters(election_id, data)
+    settings = request.app.state.settings
+    parameters, election_id = _get_election_parameters(election_id, data, settings)
     ballots = [
         from_ciphertext_ballot(
             CiphertextBallot.from_json_object(ballot), BallotBoxState.SPOILED
@@ -155,18 +226,15 @@ def spoil_ballots(
         for ballot in data.ballots
     ]
 
-    for ballot in ballots:
-        validation_request = ValidateBallotRequest(
-            ballot=ballot.to_json_object(), manifest=manifest, context=context
-        )
-        _validate_ballot(validation_request)
+    ballots, duplicate_ids = exclude_duplicate_ballots(election_id, ballots, settings)
+    _validate_ballots(ballots, parameters, settings, scheduler)
 
-    return _submit_ballots(election_id, ballots, request.app.state.settings)
+    return _submit_ballots(election_id, ballots, settings, duplicate_ids)
 
 
 @router.put(
     "/submit",
-    response_model=BaseResponse,
+    response_model=SubmitBallotsResponse,
     tags=[BALLOTS],
     dependencies=[ScopedTo([UserScope.admin])],
     status_code=status.HTTP_202_ACCEPTED,
@@ -174,8 +242,9 @@ def spoil_ballots(
 def submit_ballots(
     request: Request,
     election_id: str,
-    data: SubmitBallotsRequestDto = Body(...),
-) -> BaseResponse:
+    data: SubmitBallotsRequest = Body(...),
+    scheduler: Scheduler = Depends(get_scheduler),
+) -> SubmitBallotsResponse:
     """
     Submit ballots for an election.
 
@@ -186,32 +255,132 @@ def submit_ballots(
     logger.info(f"Submitting ballots for {election_id}")
 
     settings = request.app.state.settings
-    election_sdk = get_election(election_id, settings)
-    manifest_sdk = election_sdk.manifest
-    context_dto = election_sdk.context
-    context_sdk = context_dto.to_sdk_format()
+    parameters = get_election_validation_parameters(election_id, settings)
 
-    res: str = ""
     logger.info(f"Converting {len(data.ballots)} ballots to sdk format")
-    ballots_sdk = list(map(lambda b: b.to_sdk_format(), data.ballots))
-    for ballot in ballots_sdk:
-        if ballot.state == BallotBoxState.UNKNOWN:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Submitted ballot {ballot.object_id} must have a cast or spoil state",
+    ballots_sdk = _decode_ballots(data.ballots)
+
+    ballots_sdk, duplicate_ids = exclude_duplicate_ballots(
+        election_id, ballots_sdk, settings
+    )
+
+    logger.info("about to validate ballots")
+    _validate_ballots(ballots_sdk, parameters, settings, scheduler)
+    logger.info("validated ballots successfully")
+
+    return _submit_ballots(election_id, ballots_sdk, settings, duplicate_ids)
+
+
+@router.put(
+    "/submit/stream",
+    response_model=BallotIngestResponse,
+    tags=[BALLOTS],
+    dependencies=[ScopedTo([UserScope.admin])],
+)
+async def submit_ballot_stream(
+    request: Request,
+    election_id: str,
+    scheduler: Scheduler = Depends(get_scheduler),
+) -> BallotIngestResponse:
+    """
+    Submit a stream of ballots for an election.
+
+    The body is newline delimited json (`application/x-ndjson`) with one submitted ballot per line,
+    and may be gzip compressed with `Content-Encoding: gzip`.
+    Ballots are read, validated and stored in chunks as the body arrives,
+    so memory use does not grow with the size of the upload.
+    Invalid ballots are rejected individually and reported in the summary of their chunk.
+    """
+    settings = request.app.state.settings
+    # fail before reading the body if the election does not exist
+    await run_in_threadpool(get_election_validation_parameters, election_id, settings)
+
+    response = BallotIngestResponse(election_id=election_id)
+    lines: List[Tuple[int, bytes]] = []
+    async for line in _read_lines(request, settings):
+        lines.append(line)
+        if len(lines) >= settings.BALLOT_INGEST_CHUNK_SIZE:
+            response.chunks.append(
+                await run_in_threadpool(
+                    _ingest_chunk,
+                    election_id,
+                    len(response.chunks),
+                    lines,
+                    settings,
+                    scheduler,
+                )
+            )
+            lines = []
+    if lines:
+        response.chunks.append(
+            await run_in_threadpool(
+                _ingest_chunk,
+                election_id,
+                len(response.chunks),
+                lines,
+                settings,
+                scheduler,
             )
-        ballot_json = ballot.to_json_object()
-        validation_request = ValidateBallotRequest(
-            ballot=ballot_json,
-            manifest=manifest_sdk,
-            context=context_sdk,
         )
-        logger.info("about to validate ballots")
-        _validate_ballot(validation_request)
-        logger.info("validated ballots successfully")
-        res += str(ballot.state)
 
-    return _submit_ballots(election_id, ballots_sdk, request.app.state.settings)
+    response.ballot_count = sum(chunk.ballot_count for chunk in response.chunks)
+    response.accepted_count = sum(chunk.accepted_count for chunk in response.chunks)
+    logger.info(
+        f"accepted {response.accepted_count} of {response.ballot_count} streamed ballots"
+    )
+    return response
+
+
+@router.put(
+    "/submit/queue",
+    response_model=BallotSubmissionResponse,
+    tags=[BALLOTS],
+    dependencies=[ScopedTo([UserScope.admin])],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def queue_ballots(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    election_id: Optional[str] = None,
+    data: SubmitBallotsRequest = Body(...),
+) -> BallotSubmissionResponse:
+    """
+    Queue ballots to be validated and stored by the ballot worker.
+
+    Returns a tracking id to follow the progress of the submission at `GET /submit/queue`.
+    When the queue is local to the api, the ballots are processed after the response is sent.
+    """
+    settings = request.app.state.settings
+    election_id = election_id or data.election_id
+    if not election_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="specify election_id in the query parameter or request body.",
+        )
+    get_election(election_id, settings)
+
+    ballots = _decode_ballots(data.ballots)
+    submission = publish_ballot_submission(election_id, ballots, settings)
+    if settings.QUEUE_MODE == QueueMode.LOCAL:
+        background_tasks.add_task(drain_ballot_queue, settings)
+    return BallotSubmissionResponse(submission=submission)
+
+
+@router.get(
+    "/submit/queue",
+    response_model=BallotSubmissionResponse,
+    tags=[BALLOTS],
+)
+def fetch_ballot_submission(
+    request: Request, election_id: str, tracking_id: str
+) -> BallotSubmissionResponse:
+    """
+    Fetch the progress of queued ballots by the tracking id returned when they were queued.
+    """
+    submission = get_ballot_submission(
+        election_id, tracking_id, request.app.state.settings
+    )
+    return BallotSubmissionResponse(submission=submission)
 
 
 @router.post("/validate", response_model=BaseResponse, tags=[BALLOTS])
@@ -229,8 +398,11 @@ def _get_election_parameters(
     election_id: Optional[str],
     request_data: BaseBallotRequest,
     settings: Settings = Settings(),
-) -> Tuple[Manifest, CiphertextElectionContext, str]:
-    """Get the election parameters either from the data cache or from the request body."""
+) -> Tuple[BallotValidationParameters, str]:
+    """
+    Get the validation parameters of the election from the cache,
+    or from the request body when it overrides the manifest or context.
+    """
 
     # Check an election is assigned
     if not election_id:
@@ -242,104 +414,191 @@ def _get_election_parameters(
             detail="specify election_id in the query parameter or request body.",
         )
 
-    election = get_election(election_id, settings)
+    if not request_data.manifest and not request_data.context:
+        return get_election_validation_parameters(election_id, settings), election_id
 
-    if request_data.manifest:
-        manifest = request_data.manifest
-    else:
-        manifest = Manifest.from_json_object(election.manifest)
+    election = get_election(election_id, settings)
+    parameters = get_validation_parameters(
+        request_data.manifest or election.manifest,
+        request_data.context or election.context.to_sdk_format(),
+    )
+    return parameters, election_id
 
-    if request_data.context:
-        context = cast(CiphertextElectionContext, request_data.context)
-    else:
-        context = election.context.to_sdk_format()
 
-    return manifest, context, election_id
+def _decode_ballots(data: List[Any]) -> List[SubmittedBallot]:
+    """Decode submitted ballots, which must be cast or spoiled."""
+    try:
+        ballots = [decode_submitted_ballot(ballot) for ballot in data]
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(error),
+        ) from error
+    for ballot in ballots:
+        if ballot.state == BallotBoxState.UNKNOWN:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Submitted ballot {ballot.object_id} must have a cast or spoil state",
+            )
+    return ballots
 
 
 def _submit_ballots(
-    election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
-) -> BaseResponse:
+    election_id: str,
+    ballots: List[SubmittedBallot],
+    settings: Settings = Settings(),
+    duplicate_ids: Optional[List[str]] = None,
+) -> SubmitBallotsResponse:
+    """
+    Store ballots and add the ones that were not already counted to the inventory.
+    Ballots stored by a submission that failed before counting them are counted now.
+    Duplicates are acknowledged in the response rather than failing the request.
+    """
     logger.info("submitting ballots")
     set_response = set_ballots(election_id, ballots, settings)
     if set_response.is_success():
         logger.info(f"successfully set ballots: {str(set_response)}")
-        inventory = get_ballot_inventory(election_id, settings)
-        if inventory is None:
-            inventory = BallotInventory(
-                election_id=election_id,
-                cast_ballot_count=0,
-                spoiled_ballot_count=0,
-                cast_ballots=[],
-                spoiled_ballots=[],
-            )
-        for ballot in ballots:
-            if ballot.state == BallotBoxState.CAST:
-                inventory.cast_ballot_count += 1
-                inventory.cast_ballots[ballot.code.to_hex()] = ballot.object_id
-            elif ballot.state == BallotBoxState.SPOILED:
-                inventory.spoiled_ballot_count += 1
-                inventory.spoiled_ballots[ballot.code.to_hex()] = ballot.object_id
-        upsert_ballot_inventory(election_id, inventory, settings)
-
+        inventory_response = add_ballot_inventory(election_id, ballots, settings)
+        set_response.duplicate_ballot_ids = inventory_response.duplicate_ballot_ids
+    set_response.duplicate_ballot_ids = (
+        duplicate_ids or []
+    ) + set_response.duplicate_ballot_ids
     return set_response
 
 
-def _validate_ballot(request: ValidateBallotRequest) -> None:
-    ballot = CiphertextBallot.from_json_object(request.ballot)
-    manifest = Manifest.from_json_object(request.manifest)
-    internal_manifest = InternalManifest(manifest)
-    context = CiphertextElectionContext.from_json_object(request.context)
-
-    if not ballot_is_valid_for_election(ballot, internal_manifest, context):
+async def _read_lines(
+    request: Request, settings: Settings
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Yield the numbered, non-empty lines of the request body as it arrives.
+    A gzip body is inflated at most a line's length at a time, and a line
+    over BALLOT_INGEST_MAX_LINE_BYTES or a body of more than BALLOT_INGEST_MAX_BALLOTS
+    lines fails the request, so memory use stays bounded.
+    Chunks stored before the failure stay stored.
+    """
+    max_line_bytes = settings.BALLOT_INGEST_MAX_LINE_BYTES
+    decompressor = (
+        zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if request.headers.get("content-encoding") == "gzip"
+        else None
+    )
+    buffer = b""
+    line_number = 0
+    ballot_count = 0
+    async for data in request.stream():
+        pieces = (
+            _inflate(decompressor, data, max_line_bytes) if decompressor else [data]
+        )
+        for piece in pieces:
+            *complete, buffer = (buffer + piece).split(b"\n")
+            for line in complete:
+                line_number += 1
+                if line.strip():
+                    ballot_count += 1
+                    _check_line(line_number, line, ballot_count, settings)
+                    yield line_number, line
+            _check_line(line_number + 1, buffer, ballot_count, settings)
+    if decompressor:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        line_number += 1
+        if line.strip():
+            ballot_count += 1
+            _check_line(line_number, line, ballot_count, settings)
+            yield line_number, line
+
+
+def _inflate(decompressor: Any, data: bytes, max_length: int) -> Iterator[bytes]:
+    """Decompress data in pieces of at most max_length bytes."""
+    yield decompressor.decompress(data, max_length)
+    while decompressor.unconsumed_tail:
+        yield decompressor.decompress(decompressor.unconsumed_tail, max_length)
+
+
+def _check_line(
+    line_number: int, line: bytes, ballot_count: int, settings: Settings
+) -> None:
+    if len(line) > settings.BALLOT_INGEST_MAX_LINE_BYTES:
         raise HTTPException(
-            status_code=status.HTTP_406_NOT_ACCEPTABLE,
-            detail=f"ballot {ballot.object_id} is not valid.",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"line {line_number} is longer than "
+            f"{settings.BALLOT_INGEST_MAX_LINE_BYTES} bytes",
+        )
+    if ballot_count > settings.BALLOT_INGEST_MAX_BALLOTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"more than {settings.BALLOT_INGEST_MAX_BALLOTS} ballots",
         )
 
 
-@router.put("/test/submit_queue", tags=[BALLOTS], status_code=status.HTTP_202_ACCEPTED)
-def test_submit_ballot(
-    request: SubmitBallotsRequest = Body(...),
-) -> BaseResponse:
-    """
-    Submit a single ballot using a queue.  For testing purposes only.
-    """
-    # TODO: complete the implementation
+def _ingest_chunk(
+    election_id: str,
+    index: int,
+    lines: List[Tuple[int, bytes]],
+    settings: Settings,
+    scheduler: Scheduler,
+) -> BallotIngestChunk:
+    """Parse, validate and store one chunk of a streamed ballot submission."""
+    chunk = BallotIngestChunk(index=index, ballot_count=len(lines))
+    ballots: List[SubmittedBallot] = []
+    for line_number, line in lines:
+        try:
+            ballot = decode_submitted_ballot(json.loads(line))
+        except ValueError:
+            chunk.rejected[f"line {line_number}"] = "could not read ballot"
+            continue
+        if ballot.state == BallotBoxState.UNKNOWN:
+            chunk.rejected[ballot.object_id] = "must have a cast or spoil state"
+            continue
+        ballots.append(ballot)
 
-    if not request.election_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Must submit an election id.",
-        )
+    ballots, duplicate_ids = exclude_duplicate_ballots(election_id, ballots, settings)
+    for ballot_id in duplicate_ids:
+        chunk.rejected[ballot_id] = "already submitted"
+
+    parameters = get_election_validation_parameters(election_id, settings)
+    results = validate_ballots(ballots, parameters, settings, scheduler)
+    valid_ballots = [ballot for ballot in ballots if results[ballot.object_id]]
+    for ballot in ballots:
+        if not results[ballot.object_id]:
+            chunk.rejected[ballot.object_id] = "not valid"
 
     try:
-        ballots = [
-            SubmittedBallot.from_json_object(ballot) for ballot in request.ballots
-        ]
-        with get_message_queue("submitted-ballots", "submitted-ballots") as queue:
-            for ballot in ballots:
-                queue.publish(ballot.to_json())
-            _process_ballots(queue, request.election_id)
-    except Exception as error:
-        print(sys.exc_info())
+        set_response = _submit_ballots(election_id, valid_ballots, settings)
+    except HTTPException as error:
+        chunk.error = str(error.detail)
+        return chunk
+    for ballot_id in set_response.duplicate_ballot_ids:
+        chunk.rejected[ballot_id] = "already submitted"
+    chunk.accepted_count = len(valid_ballots) - len(set_response.duplicate_ballot_ids)
+    return chunk
+
+
+def _validate_ballots(
+    ballots: Sequence[CiphertextBallot],
+    parameters: BallotValidationParameters,
+    settings: Settings,
+    scheduler: Scheduler,
+) -> None:
+    """Validate a batch of ballots, failing with the result of every ballot if any is invalid."""
+    results = validate_ballots(ballots, parameters, settings, scheduler)
+    invalid_count = sum(1 for valid in results.values() if not valid)
+    if invalid_count > 0:
         raise HTTPException(
-            status_code=500,
-            detail="Ballot failed to be submitted.",
-        ) from error
-    return BaseResponse(message="Ballot Successfully Submitted.")
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail={
+                "message": f"{invalid_count} of {len(results)} ballots are not valid.",
+                "ballots": results,
+            },
+        )
 
 
-def _process_ballots(queue: IMessageQueue, election_id: str) -> None:
-    try:
-        with get_repository(election_id, DataCollection.SUBMITTED_BALLOT) as repository:
-            for message in queue.subscribe():
-                ballot = SubmittedBallot.from_json(message)
-                key = repository.set(ballot.to_json_object())
-                print(f"process_ballots: key {key}")
-    except Exception as error:
-        print(sys.exc_info())
+def _validate_ballot(request: ValidateBallotRequest) -> None:
+    ballot = CiphertextBallot.from_json_object(request.ballot)
+    parameters = get_validation_parameters(request.manifest, request.context)
+
+    if not parameters.is_valid(ballot):
         raise HTTPException(
-            status_code=500,
-            detail="Ballot failed to be processed.",
-        ) from error
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"ballot {ballot.object_id} is not valid.",
+        )
@@ -18,7 +18,7 @@ from app.api.v1.models.election import ElectionListResponseDto, ElectionSummaryD
 from app.api.v1.models.user import UserScope
 
 from .manifest import get_manifest
-from ....core.ballot import get_ballot_inventory, upsert_ballot_inventory
+from ....core.ballot import create_ballot_inventory, get_ballot_inventory_counts
 from ....core.key_ceremony import get_key_ceremony
 from ....core.election import (
     get_election,
@@ -28,7 +28,6 @@ from ....core.election import (
 )
 from ..models import (
     BaseResponse,
-    BallotInventory,
     Election,
     ElectionState,
     ElectionQueryRequest,
@@ -160,7 +159,7 @@ def list_elections(
     index = 0
     for election in result.elections:
         election.index = index
-        inventory = get_ballot_inventory(
+        inventory = get_ballot_inventory_counts(
             election.election_id, request.app.state.settings
         )
         if inventory is not None:
@@ -206,8 +205,7 @@ def open_election(request: Request, election_id: str) -> BaseResponse:
     Open an election.
     """
     # create the ballot inventory on election open
-    ballot_inventory = BallotInventory(election_id=election_id)
-    upsert_ballot_inventory(election_id, ballot_inventory, request.app.state.settings)
+    create_ballot_inventory(election_id, request.app.state.settings)
 
     return update_election_state(
         election_id, ElectionState.OPEN, request.app.state.settings
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.job import get_job
+from app.core.tally import get_ciphertext_tally_progress
+from ..models import JobKind, JobResponse
+from ..tags import JOBS
+
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse, tags=[JOBS])
+def fetch_job(request: Request, job_id: str) -> JobResponse:
+    """
+    Fetch the state and progress of a background tally or decryption job.
+    """
+    settings = request.app.state.settings
+    job = get_job(job_id, settings)
+    if job.kind == JobKind.CIPHERTEXT_TALLY:
+        # the tally records its progress as it accumulates the ballots
+        try:
+            progress = get_ciphertext_tally_progress(
+                job.election_id, job.tally_name, settings
+            )
+            job.processed_count = progress.processed_ballot_count
+            job.total_count = progress.ballot_count
+        except HTTPException:
+            pass
+    return JobResponse(job=job)
@@ -3,6 +3,7 @@ from . import ballot
 from . import decrypt
 from . import election
 from . import encrypt
+from . import job
 from . import key_admin
 from . import key_ceremony
 from . import key_guardian
@@ -22,3 +23,4 @@ router.include_router(decrypt.router, prefix="/ballot")
 router.include_router(encrypt.router, prefix="/ballot")
 router.include_router(tally.router, prefix="/tally")
 router.include_router(tally_decrypt.router, prefix="/tally/decrypt")
+router.include_router(job.router, prefix="/jobs")
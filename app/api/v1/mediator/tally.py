@@ -1,5 +1,5 @@
 # pylint: disable=unused-argument
-from typing import Dict
+from typing import Dict, List, MutableMapping, Optional, Set, Tuple, Union
 from logging import getLogger
 from datetime import datetime
 import sys
@@ -14,38 +14,64 @@ from fastapi import (
     Response,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 from electionguard.ballot import BallotBoxState
 from electionguard.decrypt_with_shares import decrypt_tally as decrypt
 from electionguard.decryption_share import DecryptionShare
+from electionguard.elgamal import ElGamalCiphertext
 from electionguard.manifest import ElectionType, InternalManifest, Manifest
 from electionguard.scheduler import Scheduler
 from electionguard.serializable import read_json_object, write_json_object
-from electionguard.type import CONTEST_ID
+from electionguard.type import BALLOT_ID, CONTEST_ID, SELECTION_ID
 import electionguard.tally
 
 
+from app.api.v1.common.json_response import fast_json_response
 from app.core.scheduler import get_scheduler
 from app.core.settings import Settings
-from app.core.ballot import get_ballot_inventory, filter_ballots
+from app.core.ballot import (
+    get_ballot_inventory_counts,
+    get_counted_ballot_ids,
+    stream_ballot_ciphertexts,
+)
 from app.core.election import get_election
 from app.core.tally import (
     get_ciphertext_tally,
     set_ciphertext_tally,
     filter_ciphertext_tallies,
-    set_plaintext_tally,
-    filter_plaintext_tallies,
+    get_ciphertext_tally_progress,
+    set_ciphertext_tally_progress,
+    get_plaintext_tally,
+    set_plaintext_tally_async,
+    filter_plaintext_tallies_async,
     update_plaintext_tally,
 )
+from app.core.distributed_tally import publish_tally_shards, reduce_tally_shards
+from app.core.job import register_job_handler, submit_job
+from app.core.running_tally import (
+    ballot_ids_digest,
+    get_running_tally,
+    read_running_tally_selections,
+)
 from app.core.tally_decrypt import filter_decryption_shares
 from ..models import (
+    BallotInventory,
     BaseQueryRequest,
+    CiphertextTallyProgress,
+    CiphertextTallyProgressResponse,
     CiphertextTallyQueryResponse,
     DecryptTallyRequest,
     CiphertextTally,
+    Job,
+    JobKind,
+    JobResponse,
     PlaintextTally,
     PlaintextTallyState,
     PlaintextTallyQueryResponse,
+    RunningTally,
 )
 from ..tags import TALLY
 
@@ -59,64 +85,141 @@ def fetch_ciphertext_tally(
     request: Request,
     election_id: str,
     tally_name: str,
-) -> CiphertextTally:
+) -> Union[CiphertextTally, Response]:
     """
     Fetch a specific ciphertext tally.
     """
     tally = get_ciphertext_tally(election_id, tally_name, request.app.state.settings)
-    return tally
+    return fast_json_response(request, tally)
 
 
-@router.post("", response_model=CiphertextTally, tags=[TALLY])
+@router.post(
+    "",
+    response_model=CiphertextTally,
+    responses={202: {"model": JobResponse}},
+    tags=[TALLY],
+)
 def tally_ballots(
     request: Request,
     election_id: str,
     tally_name: str,
+    recompute: bool = False,
+    distributed: bool = False,
+    background: bool = False,
     scheduler: Scheduler = Depends(get_scheduler),
-) -> CiphertextTally:
+) -> Union[CiphertextTally, Response]:
     """
     Start a new ciphertext tally of a collection of ballots.
 
     An election can have more than one tally.  Each tally must have a unique name.
     Each tally correlates to a snapshot of all ballots submitted for a given election.
+
+    The tally is a snapshot of the running tally kept as ballots are cast.
+    Set `recompute` to accumulate every stored ballot again instead, e.g. to audit the snapshot.
+    Set `distributed` to recompute it as shards tallied by the tally workers.
+    Set `background` to tally on the job workers instead.  The job is returned immediately
+    with a 202, and its state and progress can be polled at `/jobs/{job_id}`.
     """
-    election = get_election(election_id, request.app.state.settings)
+    settings = request.app.state.settings
+    if background:
+        # fail fast on an unknown election rather than in the job
+        get_election(election_id, settings)
+        job = submit_job(
+            JobKind.CIPHERTEXT_TALLY,
+            election_id,
+            tally_name,
+            {"recompute": recompute, "distributed": distributed},
+            settings,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(JobResponse(job=job)),
+        )
+    return _tally_ballots(
+        election_id, tally_name, recompute, distributed, settings, scheduler
+    )
+
+
+def _tally_ballots(
+    election_id: str,
+    tally_name: str,
+    recompute: bool,
+    distributed: bool,
+    settings: Settings,
+    scheduler: Scheduler,
+) -> CiphertextTally:
+    election = get_election(election_id, settings)
     manifest = Manifest.from_json_object(election.manifest)
     context = election.context.to_sdk_format()
 
     # get the cast and spoiled ballots by checking the current ballot inventory
     # and filtering the table for
-    inventory = get_ballot_inventory(election_id, request.app.state.settings)
+    inventory = get_ballot_inventory_counts(election_id, settings)
     if inventory is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Could not find a ballot inventory with election_id {election_id}",
         )
-    cast_ballots = filter_ballots(
-        election_id,
-        {"state": BallotBoxState.CAST.name},
-        0,
-        inventory.cast_ballot_count,
-        request.app.state.settings,
-    )
-    spoiled_ballots = filter_ballots(
-        election_id,
-        {"state": BallotBoxState.SPOILED.name},
-        0,
-        inventory.spoiled_ballot_count,
-        request.app.state.settings,
-    )
-    # TODO: check inventory list matches find result above and throw if it does not.
 
-    # append the ballots to the eg library tally
     sdk_tally = electionguard.tally.CiphertextTally(
         f"{election_id}-{tally_name}", InternalManifest(manifest), context
     )
-    sdk_tally.batch_append(
-        [(ballot.object_id, ballot) for ballot in cast_ballots], scheduler
+    ballot_count = inventory.cast_ballot_count + inventory.spoiled_ballot_count
+    running_tally = get_running_tally(election_id, settings)
+    snapshot_ballot_ids = (
+        None
+        if recompute or distributed
+        else _get_snapshot_ballot_ids(running_tally, inventory, settings)
     )
-    sdk_tally.batch_append(
-        [(ballot.object_id, ballot) for ballot in spoiled_ballots], scheduler
+    if distributed:
+        _accumulate_ballot_shards(
+            sdk_tally,
+            CiphertextTallyProgress(
+                election_id=election_id,
+                tally_name=tally_name,
+                ballot_count=inventory.cast_ballot_count,
+            ),
+            inventory,
+            settings,
+            scheduler,
+        )
+    elif snapshot_ballot_ids is not None:
+        logger.info(
+            f"tallying {election_id} from running tally version {running_tally.version}"
+        )
+        _set_selection_ciphertexts(
+            sdk_tally, read_running_tally_selections(running_tally)
+        )
+        # pylint: disable=protected-access
+        sdk_tally._cast_ballot_ids.update(snapshot_ballot_ids)
+        sdk_tally._spoiled_ballot_ids.update(
+            get_counted_ballot_ids(election_id, BallotBoxState.SPOILED, settings)
+        )
+    else:
+        if not recompute:
+            logger.warning(
+                f"running tally of {election_id} does not include the same "
+                f"{inventory.cast_ballot_count} cast ballots as the inventory, recomputing"
+            )
+        _accumulate_stored_ballots(
+            sdk_tally,
+            CiphertextTallyProgress(
+                election_id=election_id,
+                tally_name=tally_name,
+                ballot_count=ballot_count,
+            ),
+            inventory,
+            settings,
+            scheduler,
+        )
+    set_ciphertext_tally_progress(
+        CiphertextTallyProgress(
+            election_id=election_id,
+            tally_name=tally_name,
+            ballot_count=ballot_count,
+            processed_ballot_count=ballot_count,
+        ),
+        settings,
     )
 
     # create and cache the api tally.
@@ -127,11 +230,181 @@ def tally_ballots(
         tally=sdk_tally.to_json_object(),
     )
 
-    set_ciphertext_tally(api_tally, request.app.state.settings)
+    set_ciphertext_tally(api_tally, settings)
 
     return api_tally
 
 
+def _get_snapshot_ballot_ids(
+    running_tally: RunningTally, inventory: BallotInventory, settings: Settings
+) -> Optional[Set[BALLOT_ID]]:
+    """
+    Get the ids of the cast ballots counted by the inventory if the running tally
+    includes exactly those ballots, by comparing the digests of their ids.
+    Returns None if the running tally cannot be used as the tally.
+    """
+    if (
+        running_tally.cast_ballot_ids_digest is None
+        or running_tally.cast_ballot_count != inventory.cast_ballot_count
+    ):
+        return None
+    cast_ballot_ids = get_counted_ballot_ids(
+        inventory.election_id, BallotBoxState.CAST, settings
+    )
+    if running_tally.cast_ballot_ids_digest != ballot_ids_digest(cast_ballot_ids):
+        return None
+    return cast_ballot_ids
+
+
+def _run_ciphertext_tally_job(job: Job, settings: Settings) -> None:
+    _tally_ballots(
+        job.election_id,
+        job.tally_name,
+        job.parameters.get("recompute", False),
+        job.parameters.get("distributed", False),
+        settings,
+        get_scheduler(),
+    )
+
+
+register_job_handler(JobKind.CIPHERTEXT_TALLY, _run_ciphertext_tally_job)
+
+
+@router.get("/progress", response_model=CiphertextTallyProgressResponse, tags=[TALLY])
+def fetch_ciphertext_tally_progress(
+    request: Request,
+    election_id: str,
+    tally_name: str,
+) -> CiphertextTallyProgressResponse:
+    """
+    Fetch how many ballots a ciphertext tally has accumulated so far.
+    """
+    progress = get_ciphertext_tally_progress(
+        election_id, tally_name, request.app.state.settings
+    )
+    return CiphertextTallyProgressResponse(progress=progress)
+
+
+def _accumulate_stored_ballots(
+    sdk_tally: electionguard.tally.CiphertextTally,
+    progress: CiphertextTallyProgress,
+    inventory: BallotInventory,
+    settings: Settings,
+    scheduler: Scheduler,
+) -> None:
+    """
+    Accumulate the stored ballots counted by the inventory into the sdk tally.
+    Ballots are read and appended a chunk at a time, so memory is bounded by the chunk size,
+    and the progress is recorded after each chunk.
+    """
+    set_ciphertext_tally_progress(progress, settings)
+    for state, count in (
+        (BallotBoxState.CAST, inventory.cast_ballot_count),
+        (BallotBoxState.SPOILED, inventory.spoiled_ballot_count),
+    ):
+        # only the ciphertexts are read, since the ballots were validated when submitted
+        for ballots in stream_ballot_ciphertexts(
+            progress.election_id,
+            {"state": state.name},
+            count,
+            settings.TALLY_CHUNK_SIZE,
+            settings,
+        ):
+            if state == BallotBoxState.CAST:
+                _append_ballot_ciphertexts(sdk_tally, ballots, [], scheduler)
+            else:
+                _append_ballot_ciphertexts(sdk_tally, [], ballots, scheduler)
+            progress.processed_ballot_count += len(ballots)
+            set_ciphertext_tally_progress(progress, settings)
+
+
+def _accumulate_ballot_shards(
+    sdk_tally: electionguard.tally.CiphertextTally,
+    progress: CiphertextTallyProgress,
+    inventory: BallotInventory,
+    settings: Settings,
+    scheduler: Scheduler,
+) -> None:
+    """
+    Accumulate the cast ballots counted by the inventory by publishing them in shards
+    to the tally workers and merging the partial tallies they store.
+    The workers record the progress as each shard is tallied.
+    """
+    set_ciphertext_tally_progress(progress, settings)
+    shard_ids = publish_tally_shards(
+        progress.election_id,
+        progress.tally_name,
+        {"state": BallotBoxState.CAST.name},
+        inventory.cast_ballot_count,
+        settings,
+    )
+    ciphertexts, ballot_ids = reduce_tally_shards(
+        progress.election_id, progress.tally_name, shard_ids, settings, scheduler
+    )
+    if len(ballot_ids) != inventory.cast_ballot_count:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"tally shards included {len(ballot_ids)} of "
+            f"{inventory.cast_ballot_count} cast ballots",
+        )
+    _set_selection_ciphertexts(sdk_tally, ciphertexts)
+    # pylint: disable=protected-access
+    sdk_tally._cast_ballot_ids.update(ballot_ids)
+
+
+def _set_selection_ciphertexts(
+    sdk_tally: electionguard.tally.CiphertextTally,
+    ciphertexts: Dict[SELECTION_ID, ElGamalCiphertext],
+) -> None:
+    """Set the selections of the sdk tally to the accumulated ciphertexts."""
+    for contest in sdk_tally.contests.values():
+        for selection_id, selection in contest.selections.items():
+            if selection_id in ciphertexts:
+                selection.ciphertext = ciphertexts[selection_id]
+
+
+def _append_ballot_ciphertexts(
+    sdk_tally: electionguard.tally.CiphertextTally,
+    cast_ballots: List[MutableMapping],
+    spoiled_ballots: List[MutableMapping],
+    scheduler: Scheduler,
+) -> None:
+    """
+    Accumulate the projected selection ciphertexts of ballots into the sdk tally.
+    This mirrors `CiphertextTally.batch_append` without validating the proofs again.
+    """
+    # pylint: disable=protected-access
+    cast_ballot_selections: Dict[SELECTION_ID, Dict[BALLOT_ID, ElGamalCiphertext]] = {}
+    for ballot in cast_ballots:
+        if ballot["object_id"] in sdk_tally._cast_ballot_ids:
+            continue
+        for contest in ballot["contests"]:
+            for selection in contest["ballot_selections"]:
+                cast_ballot_selections.setdefault(selection["object_id"], {})[
+                    ballot["object_id"]
+                ] = read_json_object(selection["ciphertext"], ElGamalCiphertext)
+
+    tasks = list(cast_ballot_selections.items())
+    products: List[Tuple[SELECTION_ID, ElGamalCiphertext]] = scheduler.schedule(
+        sdk_tally._accumulate, tasks
+    )
+    if len(products) != len(tasks):
+        # the scheduler returns nothing if the pool fails
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"accumulated {len(products)} of {len(tasks)} selections",
+        )
+    accumulated = dict(products)
+    for contest in sdk_tally.contests.values():
+        for selection_id, selection in contest.selections.items():
+            if selection_id in accumulated:
+                selection.elgamal_accumulate(accumulated[selection_id])
+    sdk_tally._cast_ballot_ids.update(ballot["object_id"] for ballot in cast_ballots)
+    sdk_tally._spoiled_ballot_ids.update(
+        ballot["object_id"] for ballot in spoiled_ballots
+    )
+
+
 @router.post("/find", response_model=CiphertextTallyQueryResponse, tags=[TALLY])
 def find_ciphertext_tallies(
     request: Request,
@@ -160,7 +433,7 @@ async def decrypt_tally(
     background_tasks: BackgroundTasks,
     restart: bool = False,
     data: DecryptTallyRequest = Body(...),
-) -> PlaintextTallyQueryResponse:
+) -> Union[PlaintextTallyQueryResponse, Response]:
     """
     Decrypt a tally from a collection of decrypted guardian shares.
 
@@ -168,10 +441,11 @@ async def decrypt_tally(
 
     The decryption process can take some time,
     so the method returns immediately and continues processing in the background.
+    The state of the decryption can be polled at `/jobs/{job_id}`.
     """
 
     # if we already have a value cached, then return it.
-    plaintext_tallies = filter_plaintext_tallies(
+    plaintext_tallies = await filter_plaintext_tallies_async(
         data.election_id,
         {"election_id": data.election_id, "tally_name": data.tally_name},
         0,
@@ -180,7 +454,9 @@ async def decrypt_tally(
     )
     if not restart and len(plaintext_tallies) > 0:
         logger.info("returning plaintext tally from cache")
-        return PlaintextTallyQueryResponse(tallies=plaintext_tallies)
+        return fast_json_response(
+            request, PlaintextTallyQueryResponse(tallies=plaintext_tallies)
+        )
 
     logger.info("no tally exists in cache")
 
@@ -190,20 +466,40 @@ async def decrypt_tally(
         created=datetime.now(),
         state=PlaintextTallyState.CREATED,
     )
-    set_plaintext_tally(tally, request.app.state.settings)
+    await set_plaintext_tally_async(tally, request.app.state.settings)
 
-    # queue a background task to execute the tally
-    # TODO: determine whether we wait or continue
-    # asyncio.create_task(_decrypt_tally(tally, request.app.state.settings))
-    await _decrypt_tally(tally, request.app.state.settings)
+    # decrypt on the job workers, which can be polled at /jobs/{job_id}
+    job = await run_in_threadpool(
+        submit_job,
+        JobKind.PLAINTEXT_TALLY,
+        data.election_id,
+        data.tally_name,
+        None,
+        request.app.state.settings,
+    )
 
     response.status_code = status.HTTP_202_ACCEPTED
-    return PlaintextTallyQueryResponse(
-        message="tally computing, check back in a few minutes.", tallies=[tally]
+    return fast_json_response(
+        request,
+        PlaintextTallyQueryResponse(
+            message="tally computing, check back in a few minutes.",
+            tallies=[tally],
+            job_id=job.job_id,
+        ),
+        status.HTTP_202_ACCEPTED,
     )
 
 
-async def _decrypt_tally(
+def _run_plaintext_tally_job(job: Job, settings: Settings) -> None:
+    _decrypt_tally(
+        get_plaintext_tally(job.election_id, job.tally_name, settings), settings
+    )
+
+
+register_job_handler(JobKind.PLAINTEXT_TALLY, _run_plaintext_tally_job)
+
+
+def _decrypt_tally(
     api_plaintext_tally: PlaintextTally, settings: Settings = Settings()
 ) -> None:
 
@@ -271,7 +567,6 @@ async def _decrypt_tally(
         }
         sdk_ciphertext_tally.contests = contests
 
-        # decrypt
         sdk_plaintext_tally = decrypt(
             sdk_ciphertext_tally,
             tally_shares,
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Body, HTTPException, Request, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 
 from electionguard.key_ceremony import PublicKeySet
 from electionguard.decryption_share import DecryptionShare
+from electionguard.scheduler import Scheduler
 from electionguard.serializable import read_json_object
-from electionguard.tally import CiphertextTallyContest
 from electionguard.utils import get_optional
 
+from app.api.v1.common.ballot_decoder import decode_ciphertext
+from app.core.decryption_share_validator import validate_decryption_share
 from app.core.election import get_election
 from app.core.key_guardian import get_key_guardian
+from app.core.scheduler import get_scheduler
 from app.core.tally import get_ciphertext_tally
 from app.core.tally_decrypt import (
     get_decryption_share,
@@ -42,21 +45,25 @@ def fetch_decryption_share(
 @router.post("/submit-share", response_model=BaseResponse, tags=[TALLY_DECRYPT])
 def submit_share(
     request: Request,
+    batch_verify: bool = False,
     data: DecryptionShareRequest = Body(...),
+    scheduler: Scheduler = Depends(get_scheduler),
 ) -> BaseResponse:
     """
     Announce a guardian participating in a tally decryption by submitting a decryption share.
-    """
 
-    election = get_election(data.share.election_id, request.app.state.settings)
+    The proofs of the share are checked on the scheduler's process pool.
+    Set `batch_verify` to check them together with far fewer exponentiations,
+    checking them one by one only to find the invalid selection when the batch fails.
+    """
+    settings = request.app.state.settings
+    election = get_election(data.share.election_id, settings)
     context = election.context.to_sdk_format()
-    guardian = get_key_guardian(
-        election.key_name, data.share.guardian_id, request.app.state.settings
-    )
+    guardian = get_key_guardian(election.key_name, data.share.guardian_id, settings)
     public_keys = read_json_object(get_optional(guardian.public_keys), PublicKeySet)
 
     api_tally = get_ciphertext_tally(
-        data.share.election_id, data.share.tally_name, request.app.state.settings
+        data.share.election_id, data.share.tally_name, settings
     )
     tally_share = read_json_object(data.share.tally_share, DecryptionShare)
 
@@ -67,26 +74,33 @@ def submit_share(
     # ]
 
     # validate the decryption share data matches the expectations in the tally
-    # TODO: use the SDK for validation
-    # sdk_tally = read_json_object(api_tally.tally, electionguard.tally.CiphertextTally)
-    for contest_id, contest in api_tally.tally["contests"].items():
-        tally_contest = read_json_object(contest, CiphertextTallyContest)
-        contest_share = tally_share.contests[contest_id]
-        for selection_id, selection in tally_contest.selections.items():
-            selection_share = contest_share.selections[selection_id]
-            if not selection_share.is_valid(
-                selection.ciphertext,
-                public_keys.election.key,
-                context.crypto_extended_base_hash,
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"decryption share failed valitation for contest: {contest_id} selection: {selection_id}",
-                )
+    # only the selection ciphertexts are read, rather than each tally contest
+    ciphertexts = {
+        contest_id: {
+            selection_id: decode_ciphertext(selection["ciphertext"])
+            for selection_id, selection in contest["selections"].items()
+        }
+        for contest_id, contest in api_tally.tally["contests"].items()
+    }
+    invalid = validate_decryption_share(
+        tally_share,
+        ciphertexts,
+        public_keys.election.key,
+        context.crypto_extended_base_hash,
+        batch_verify,
+        settings,
+        scheduler,
+    )
+    if invalid is not None:
+        contest_id, selection_id = invalid
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"decryption share failed valitation for contest: {contest_id} selection: {selection_id}",
+        )
 
     # TODO: validate spoiled ballot shares
 
-    return set_decryption_share(data.share, request.app.state.settings)
+    return set_decryption_share(data.share, settings)
 
 
 @router.post("/find", response_model=DecryptionShareResponse, tags=[TALLY_DECRYPT])
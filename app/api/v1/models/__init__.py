@@ -5,6 +5,7 @@ from .decrypt import *
 from .encrypt import *
 from .election import *
 from .guardian import *
+from .job import *
 from .key_ceremony import *
 from .key_guardian import *
 from .manifest import *
@@ -1,4 +1,5 @@
 from typing import Any, Dict, List, Optional
+from enum import Enum
 from electionguard.ballot import (
     SubmittedBallot,
     CiphertextBallotContest,
@@ -25,10 +26,18 @@ __all__ = [
     "BallotQueryResponse",
     "BallotInventory",
     "BallotInventoryResponse",
+    "BallotCode",
+    "BallotCodeResponse",
+    "BallotIngestChunk",
+    "BallotIngestResponse",
+    "BallotSubmission",
+    "BallotSubmissionState",
+    "BallotSubmissionResponse",
     "BaseBallotRequest",
     "CastBallotsRequest",
     "SpoilBallotsRequest",
     "SubmitBallotsRequest",
+    "SubmitBallotsResponse",
     "ValidateBallotRequest",
 ]
 
@@ -82,6 +91,61 @@ class BallotInventoryResponse(BaseResponse):
     inventory: BallotInventory
 
 
+class BallotCode(Base):
+    """The ballot and state a ballot tracking code belongs to."""
+
+    code: BALLOT_CODE
+    object_id: str
+    state: str
+
+
+class BallotCodeResponse(BaseResponse):
+    election_id: str
+    ballot_code: BallotCode
+    ballot: Optional[AnySubmittedBallot] = None
+
+
+class BallotIngestChunk(Base):
+    """The outcome of one chunk of a streamed ballot submission."""
+
+    index: int
+    ballot_count: int = 0
+    accepted_count: int = 0
+    rejected: Dict[str, str] = {}
+    """Reasons keyed by ballot id, or by line number for lines that could not be read"""
+    error: Optional[str] = None
+    """Set when the accepted ballots of the chunk could not be stored"""
+
+
+class BallotIngestResponse(BaseResponse):
+    election_id: str
+    ballot_count: int = 0
+    accepted_count: int = 0
+    chunks: List[BallotIngestChunk] = []
+
+
+class BallotSubmissionState(str, Enum):
+    """Enumeration expressing the state of a queued ballot submission."""
+
+    PENDING = "PENDING"
+    COMPLETE = "COMPLETE"
+
+
+class BallotSubmission(Base):
+    """The progress of ballots submitted through the queue, found by tracking id."""
+
+    tracking_id: str
+    election_id: str
+    state: BallotSubmissionState = BallotSubmissionState.PENDING
+    ballot_count: int = 0
+    accepted_count: int = 0
+    rejected_count: int = 0
+
+
+class BallotSubmissionResponse(BaseResponse):
+    submission: BallotSubmission
+
+
 class BallotQueryResponse(BaseResponse):
     election_id: str
     ballots: List[AnyCiphertextBallot] = []
@@ -111,6 +175,11 @@ class SubmitBallotsRequest(BaseBallotRequest):
     ballots: List[AnySubmittedBallot]
 
 
+class SubmitBallotsResponse(BaseResponse):
+    duplicate_ballot_ids: List[str] = []
+    """Ballots that were already submitted, which are acknowledged without being stored again"""
+
+
 class ElGamalCiphertextDto(Base):
     pad: ElementModPDto
     data: ElementModPDto
@@ -0,0 +1,52 @@
+from typing import Any, Dict, Optional
+from enum import Enum
+from datetime import datetime
+
+from .base import BaseResponse, Base
+
+__all__ = [
+    "Job",
+    "JobKind",
+    "JobState",
+    "JobResponse",
+]
+
+
+class JobKind(str, Enum):
+    CIPHERTEXT_TALLY = "CIPHERTEXT_TALLY"
+    PLAINTEXT_TALLY = "PLAINTEXT_TALLY"
+
+
+class JobState(str, Enum):
+    QUEUED = "QUEUED"
+    PROCESSING = "PROCESSING"
+    ERROR = "ERROR"
+    COMPLETE = "COMPLETE"
+
+
+class Job(Base):
+    """
+    Long running work on a tally, run in the background by the job workers of the mediator.
+    A processing job is leased by one process, and resumed by another if the lease expires.
+    """
+
+    job_id: str
+    kind: JobKind
+    election_id: str
+    tally_name: str
+    parameters: Dict[str, Any] = {}
+    state: JobState = JobState.QUEUED
+    version: int = 0
+    """Increases every time the job is claimed, so only one process can claim it."""
+    attempts: int = 0
+    processed_count: int = 0
+    total_count: int = 0
+    created: datetime
+    updated: datetime
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class JobResponse(BaseResponse):
+    job: Job
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -6,11 +6,15 @@ from .base import BaseResponse, BaseRequest, Base
 
 __all__ = [
     "CiphertextTally",
+    "CiphertextTallyProgress",
+    "CiphertextTallyProgressResponse",
+    "CiphertextTallyShard",
     "CiphertextTallyQueryResponse",
     "DecryptTallyRequest",
     "PlaintextTally",
     "PlaintextTallyState",
     "PlaintextTallyQueryResponse",
+    "RunningTally",
 ]
 
 ElectionGuardCiphertextTally = Any
@@ -27,6 +31,53 @@ class CiphertextTally(Base):
     """The full electionguard CiphertextTally that includes the cast and spoiled ballot id's."""
 
 
+class CiphertextTallyProgress(Base):
+    """The ballots accumulated so far by a ciphertext tally."""
+
+    election_id: str
+    tally_name: str
+    ballot_count: int = 0
+    processed_ballot_count: int = 0
+
+
+class CiphertextTallyProgressResponse(BaseResponse):
+    progress: CiphertextTallyProgress
+
+
+class CiphertextTallyShard(Base):
+    """
+    The partial tally of a shard of the cast ballots of a distributed tally,
+    computed by a worker and merged into the tally by the mediator.
+    """
+
+    election_id: str
+    tally_name: str
+    shard_id: str
+    ballot_ids: List[str] = []
+    """The ballots accumulated into the shard."""
+    selections: Dict[str, Any] = {}
+    """The accumulated ciphertext of each selection, keyed by selection id."""
+
+
+class RunningTally(Base):
+    """
+    The running product of the selection ciphertexts of the cast ballots of an election,
+    updated as ballots are stored.  The version increases with every update.
+    """
+
+    election_id: str
+    version: int = 0
+    cast_ballot_count: int = 0
+    cast_ballot_ids_digest: Optional[str] = None
+    """
+    An order independent digest of the ids of the cast ballots included,
+    to check the running tally covers the same ballots as the inventory.
+    None for running tallies written before it was recorded.
+    """
+    selections: Dict[str, Any] = {}
+    """The accumulated ciphertext of each selection, keyed by selection id."""
+
+
 class PlaintextTallyState(str, Enum):
     CREATED = "CREATED"
     PROCESSING = "PROCESSING"
@@ -54,6 +105,8 @@ class PlaintextTallyQueryResponse(BaseResponse):
     """A collection of Plaintext Tallies."""
 
     tallies: List[PlaintextTally] = []
+    job_id: Optional[str] = None
+    """The background job decrypting the tally, if one was started."""
 
 
 class DecryptTallyRequest(BaseRequest):
@@ -9,6 +9,7 @@ BALLOTS = "Query Ballots"
 ENCRYPT = "Encrypt Ballots"
 TALLY = "Tally Results"
 TALLY_DECRYPT = "Tally Decrypt"
+JOBS = "Background Jobs"
 PUBLISH = "Publish Results"
 UTILITY = "Utility Functions"
 USER = "User Information"
@@ -1,13 +1,22 @@
+from .async_repository import *
 from .auth import *
 from .ballot import *
+from .ballot_queue import *
+from .ballot_validator import *
+from .cache import *
 from .client import *
+from .decryption_share_validator import *
+from .distributed_tally import *
 from .election import *
 from .guardian import *
+from .indexes import *
+from .job import *
 from .key_ceremony import *
 from .key_guardian import *
 from .manifest import *
 from .queue import *
 from .repository import *
+from .running_tally import *
 from .scheduler import *
 from .schema import *
 from .settings import *
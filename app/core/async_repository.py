@@ -0,0 +1,351 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
+from collections.abc import MutableMapping
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from threading import Lock
+
+import asyncio
+from pymongo.errors import BulkWriteError
+import pymongo.errors
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from .repository import (
+    DOCUMENT_VALUE_TYPE,
+    PROJECTION_TYPE,
+    DuplicateKeyError,
+    IRepository,
+    _duplicate_key_positions,
+    _is_duplicate_key_failure,
+    ensure_mongo_indexes_async,
+    get_repository,
+)
+from .settings import Settings, StorageMode
+
+__all__ = [
+    "IAsyncRepository",
+    "AsyncMongoRepository",
+    "ThreadedAsyncRepository",
+    "get_async_mongo_client",
+    "close_async_mongo_clients",
+    "run_in_repository_executor",
+    "shutdown_repository_executor",
+    "get_async_repository",
+]
+
+# The number of documents fetched per round trip to the executor while streaming
+FIND_BATCH_SIZE = 100
+
+
+class IAsyncRepository(ABC):
+    """A repository that does not block the event loop."""
+
+    async def __aenter__(self) -> Any:
+        return self
+
+    async def __aexit__(
+        self, exc_type: Any, exc_value: Any, exc_traceback: Any
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> AsyncIterator[MutableMapping]:
+        """
+        Find items matching the filter
+        """
+
+    @abstractmethod
+    async def get(
+        self, filter: MutableMapping, projection: PROJECTION_TYPE = None
+    ) -> Any:
+        """
+        Get an item from the container
+        """
+
+    @abstractmethod
+    async def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """
+        Set and item in the container
+        """
+
+    @abstractmethod
+    async def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        """
+        Set each item independently, skipping the items that repeat a unique field.
+        Returns the positions of the skipped items.
+        """
+
+    @abstractmethod
+    async def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """
+        Update an item
+        """
+
+    @abstractmethod
+    async def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        """
+        Atomically add to numeric fields of an item,
+        creating the item from the filter if it does not exist
+        """
+
+
+class AsyncMongoRepository(IAsyncRepository):
+    """A repository backed by a MongoDB collection using the native async driver."""
+
+    def __init__(
+        self,
+        client: "AsyncIOMotorClient",
+        container: str,
+        collection: str,
+    ):
+        super().__init__()
+        self._container = container
+        self._collection = collection
+        self._client = client
+        self._database: "AsyncIOMotorDatabase" = None
+
+    async def __aenter__(self) -> Any:
+        self._database = self._client.get_database(self._container)
+        await ensure_mongo_indexes_async(self._database, self._collection)
+        return self
+
+    async def __aexit__(
+        self, exc_type: Any, exc_value: Any, exc_traceback: Any
+    ) -> None:
+        self._database = None
+
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> AsyncIterator[MutableMapping]:
+        collection = self._database.get_collection(self._collection)
+        return cast(
+            AsyncIterator[MutableMapping],
+            collection.find(
+                filter=filter, projection=projection, skip=skip, limit=limit
+            ),
+        )
+
+    async def get(
+        self, filter: MutableMapping, projection: PROJECTION_TYPE = None
+    ) -> Any:
+        collection = self._database.get_collection(self._collection)
+        return await collection.find_one(filter, projection=projection)
+
+    async def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
+        collection = self._database.get_collection(self._collection)
+        try:
+            if isinstance(value, List):
+                result = await collection.insert_many(value)
+                return [str(id) for id in result.inserted_ids]
+            result = await collection.insert_one(value)
+            return [str(result.inserted_id)]
+        except pymongo.errors.DuplicateKeyError as error:
+            raise DuplicateKeyError(str(error)) from error
+        except BulkWriteError as error:
+            if _is_duplicate_key_failure(error):
+                raise DuplicateKeyError(str(error)) from error
+            raise
+
+    async def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        if not values:
+            return []
+        collection = self._database.get_collection(self._collection)
+        try:
+            await collection.insert_many(values, ordered=False)
+            return []
+        except BulkWriteError as error:
+            if _is_duplicate_key_failure(error):
+                return _duplicate_key_positions(error)
+            raise
+
+    async def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """Returns the number of documents matched."""
+        collection = self._database.get_collection(self._collection)
+        result = await collection.update_one(filter=filter, update={"$set": value})
+        return result.matched_count
+
+    async def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        collection = self._database.get_collection(self._collection)
+        await collection.update_one(filter=filter, update={"$inc": value}, upsert=True)
+        return 1
+
+
+class ThreadedAsyncRepository(IAsyncRepository):
+    """
+    Adapts a synchronous repository by running its calls on a bounded thread pool.
+    Calls on one repository are awaited in order, so the wrapped repository
+    is never used by two threads at once.
+    """
+
+    def __init__(self, repository: IRepository, settings: Settings = Settings()):
+        super().__init__()
+        self._repository = repository
+        self._settings = settings
+
+    async def __aenter__(self) -> Any:
+        await run_in_repository_executor(self._repository.__enter__, self._settings)
+        return self
+
+    async def __aexit__(
+        self, exc_type: Any, exc_value: Any, exc_traceback: Any
+    ) -> None:
+        await run_in_repository_executor(
+            lambda: self._repository.__exit__(exc_type, exc_value, exc_traceback),
+            self._settings,
+        )
+
+    async def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> AsyncIterator[MutableMapping]:
+        """Stream the results in batches so only one batch is held at a time."""
+        cursor: Iterator[MutableMapping] = iter(
+            await run_in_repository_executor(
+                lambda: self._repository.find(filter, skip, limit, projection),
+                self._settings,
+            )
+        )
+        while True:
+            batch = await run_in_repository_executor(
+                lambda: list(islice(cursor, FIND_BATCH_SIZE)), self._settings
+            )
+            if not batch:
+                return
+            for document in batch:
+                yield document
+
+    async def get(
+        self, filter: MutableMapping, projection: PROJECTION_TYPE = None
+    ) -> Any:
+        return await run_in_repository_executor(
+            lambda: self._repository.get(filter, projection), self._settings
+        )
+
+    async def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
+        return await run_in_repository_executor(
+            lambda: self._repository.set(value), self._settings
+        )
+
+    async def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        return cast(
+            List[int],
+            await run_in_repository_executor(
+                lambda: self._repository.set_unordered(values), self._settings
+            ),
+        )
+
+    async def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        return await run_in_repository_executor(
+            lambda: self._repository.update(filter, value), self._settings
+        )
+
+    async def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        return await run_in_repository_executor(
+            lambda: self._repository.increment(filter, value), self._settings
+        )
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+async def run_in_repository_executor(
+    function: Callable[[], Any], settings: Settings = Settings()
+) -> Any:
+    """Run blocking repository work on the bounded repository thread pool."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.REPOSITORY_THREAD_POOL_SIZE,
+                thread_name_prefix="repository",
+            )
+        executor = _executor
+    return await asyncio.get_running_loop().run_in_executor(executor, function)
+
+
+def shutdown_repository_executor() -> None:
+    """Stop the repository thread pool.  Call once when the app shuts down."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+_async_mongo_clients: Dict[Tuple[str, int], "AsyncIOMotorClient"] = {}
+_async_mongo_clients_lock = Lock()
+
+
+def get_async_mongo_client(settings: Settings = Settings()) -> "AsyncIOMotorClient":
+    """
+    Get the process-wide async client for the configured uri and the running event loop.
+    Async clients are bound to the loop they were created on.
+    """
+    # the async driver is only required in mongo storage mode
+    # pylint: disable=import-outside-toplevel
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    key = (settings.MONGODB_URI, id(asyncio.get_running_loop()))
+    with _async_mongo_clients_lock:
+        client = _async_mongo_clients.get(key)
+        if client is None:
+            client = AsyncIOMotorClient(
+                settings.MONGODB_URI,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+            )
+            _async_mongo_clients[key] = client
+        return client
+
+
+def close_async_mongo_clients() -> None:
+    """Close all of the process-wide async clients.  Call once when the app shuts down."""
+    with _async_mongo_clients_lock:
+        for client in _async_mongo_clients.values():
+            client.close()
+        _async_mongo_clients.clear()
+
+
+def get_async_repository(
+    container: str, collection: str, settings: Settings = Settings()
+) -> IAsyncRepository:
+    """
+    Get an async repository by settings storage mode.
+    Must be called from a coroutine running on the event loop.
+    """
+    if settings.STORAGE_MODE == StorageMode.MONGO:
+        return AsyncMongoRepository(
+            get_async_mongo_client(settings), container, collection
+        )
+
+    return ThreadedAsyncRepository(
+        get_repository(container, collection, settings), settings
+    )
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 
 from passlib.context import CryptContext
 
+from .async_repository import get_async_repository, run_in_repository_executor
 from .client import get_client_id
 from .repository import get_repository, DataCollection
 from .settings import Settings
@@ -12,6 +13,7 @@ from ..api.v1.models import BaseResponse, AuthenticationCredential
 __all__ = [
     "AuthenticationContext",
     "get_auth_credential",
+    "get_auth_credential_async",
     "set_auth_credential",
     "update_auth_credential",
 ]
@@ -31,6 +33,14 @@ class AuthenticationContext:
         credential = get_auth_credential(username, self.settings)
         return self.verify_password(password, credential.hashed_password)
 
+    async def authenticate_credential_async(self, username: str, password: str) -> Any:
+        credential = await get_auth_credential_async(username, self.settings)
+        # hashing is deliberately slow, so keep it off the event loop
+        return await run_in_repository_executor(
+            lambda: self.verify_password(password, credential.hashed_password),
+            self.settings,
+        )
+
     def verify_password(self, plain_password: str, hashed_password: str) -> Any:
         return self.context.verify(plain_password, hashed_password)
 
@@ -61,6 +71,29 @@ def get_auth_credential(
         ) from error
 
 
+async def get_auth_credential_async(
+    username: str, settings: Settings = Settings()
+) -> AuthenticationCredential:
+    """Get an authenitcation credential from the repository without blocking."""
+    try:
+        async with get_async_repository(
+            get_client_id(), DataCollection.AUTHENTICATION, settings
+        ) as repository:
+            query_result = await repository.get({"username": username})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find credential for {username}",
+                )
+            return AuthenticationCredential(**query_result)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{username} not found",
+        ) from error
+
+
 def set_auth_credential(
     credential: AuthenticationCredential, settings: Settings = Settings()
 ) -> None:
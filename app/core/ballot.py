@@ -1,22 +1,59 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Set, Tuple
+from threading import Lock
 import sys
 from fastapi import HTTPException, status
 
 from electionguard.ballot import (
+    BallotBoxState,
     SubmittedBallot,
 )
+from electionguard.type import BALLOT_ID
 
-from .repository import get_repository, DataCollection
+from .async_repository import get_async_repository
+from .bloom import BloomFilter
+from .cache import CacheName, LruCache, get_cache
+from .client import get_client_id
+from .repository import (
+    get_repository,
+    DataCollection,
+    PROJECTION_TYPE,
+)
+from .running_tally import accumulate_running_tally
 from .settings import Settings
-from ..api.v1.models import BaseResponse, BallotInventory
+from ..api.v1.models import (
+    BaseResponse,
+    BallotCode,
+    BallotInventory,
+    SubmitBallotsResponse,
+)
 
 
 __all__ = [
     "get_ballot",
+    "get_ballot_async",
     "set_ballots",
+    "exclude_duplicate_ballots",
     "filter_ballots",
+    "filter_ballots_async",
+    "filter_ballot_ciphertexts",
+    "stream_ballot_ciphertexts",
+    "stream_ballot_ids",
+    "get_ballot_ciphertexts",
+    "get_ballot_code_async",
+    "get_counted_ballot_ids",
     "get_ballot_inventory",
-    "upsert_ballot_inventory",
+    "get_ballot_inventory_counts",
+    "create_ballot_inventory",
+    "add_ballot_inventory",
+]
+
+# The fields of a submitted ballot needed to accumulate a tally.
+# Proofs are most of a ballot document and are only needed to validate it.
+BALLOT_CIPHERTEXT_PROJECTION = [
+    "object_id",
+    "state",
+    "contests.ballot_selections.object_id",
+    "contests.ballot_selections.ciphertext",
 ]
 
 
@@ -42,18 +79,46 @@ def get_ballot(
         ) from error
 
 
+async def get_ballot_async(
+    election_id: str, ballot_id: str, settings: Settings = Settings()
+) -> SubmittedBallot:
+    try:
+        async with get_async_repository(
+            election_id, DataCollection.SUBMITTED_BALLOT, settings
+        ) as repository:
+            query_result = await repository.get({"object_id": ballot_id})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find ballot_id {ballot_id}",
+                )
+            return SubmittedBallot.from_json_object(query_result)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{ballot_id} not found",
+        ) from error
+
+
 def set_ballots(
     election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
-) -> BaseResponse:
+) -> SubmitBallotsResponse:
+    """
+    Store ballots with distinct ids in one unordered bulk write.
+    Ballots that were already stored are skipped and reported as duplicates.
+    """
+    if not ballots:
+        return SubmitBallotsResponse(message="Ballots Successfully Set")
     try:
         with get_repository(
             election_id, DataCollection.SUBMITTED_BALLOT, settings
         ) as repository:
             cacheable_ballots = [ballot.to_json_object() for ballot in ballots]
-            _ = repository.set(cacheable_ballots)
-            return BaseResponse(
-                message="Ballots Successfully Set",
-            )
+            duplicates = repository.set_unordered(cacheable_ballots)
+        ballot_filter = _get_ballot_filter(election_id, settings)
+        for ballot in ballots:
+            ballot_filter.add(ballot.object_id)
     except Exception as error:
         print(sys.exc_info())
         raise HTTPException(
@@ -61,6 +126,101 @@ def set_ballots(
             detail="set ballots failed",
         ) from error
 
+    return SubmitBallotsResponse(
+        message="Ballots Successfully Set",
+        duplicate_ballot_ids=[ballots[position].object_id for position in duplicates],
+    )
+
+
+def exclude_duplicate_ballots(
+    election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
+) -> Tuple[List[SubmittedBallot], List[BALLOT_ID]]:
+    """
+    Split ballots into those not yet counted and the ids of those that were,
+    including repeats within the batch.
+
+    A ballot is counted once its code is recorded.  A ballot that was stored
+    by a submission that failed before recording its code is not a duplicate,
+    so submitting it again finishes counting it, unless it differs from the stored one.
+
+    Ids the in-memory filter has never seen are new without a storage lookup,
+    so only possible duplicates are looked up.  Ballots counted by other processes
+    since the filter was loaded are caught by the unique index when they are recorded.
+    """
+    submitted: Set[BALLOT_ID] = set()
+    try:
+        ballot_filter = _get_ballot_filter(election_id, settings)
+        candidates = {
+            ballot.object_id: ballot.code.to_hex()
+            for ballot in ballots
+            if ballot.object_id in ballot_filter
+        }
+        if candidates:
+            with get_repository(
+                election_id, DataCollection.SUBMITTED_BALLOT, settings
+            ) as repository:
+                stored_codes: Dict[BALLOT_ID, str] = {}
+                for ballot_id in candidates:
+                    stored = repository.get({"object_id": ballot_id}, ["code"])
+                    if stored:
+                        stored_codes[ballot_id] = stored["code"]
+            with get_repository(
+                election_id, DataCollection.BALLOT_CODE, settings
+            ) as repository:
+                for ballot_id, stored_code in stored_codes.items():
+                    if stored_code != candidates[ballot_id] or repository.get(
+                        {"object_id": ballot_id}, ["object_id"]
+                    ):
+                        submitted.add(ballot_id)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="find submitted ballots failed",
+        ) from error
+
+    new_ballots: List[SubmittedBallot] = []
+    duplicate_ids: List[BALLOT_ID] = []
+    for ballot in ballots:
+        if ballot.object_id in submitted:
+            duplicate_ids.append(ballot.object_id)
+        else:
+            new_ballots.append(ballot)
+            submitted.add(ballot.object_id)
+    return new_ballots, duplicate_ids
+
+
+_ballot_filters: Dict[Tuple[str, str], BloomFilter] = {}
+_ballot_filter_locks: Dict[Tuple[str, str], Lock] = {}
+_ballot_filters_lock = Lock()
+
+
+def _get_ballot_filter(election_id: str, settings: Settings) -> BloomFilter:
+    """Get the process-wide filter of submitted ballot ids, loading it on first use."""
+    key = (get_client_id(), election_id)
+    with _ballot_filters_lock:
+        ballot_filter = _ballot_filters.get(key)
+        if ballot_filter is not None:
+            return ballot_filter
+        election_lock = _ballot_filter_locks.setdefault(key, Lock())
+
+    # only loads of the same election wait for the scan
+    with election_lock:
+        with _ballot_filters_lock:
+            ballot_filter = _ballot_filters.get(key)
+        if ballot_filter is None:
+            ballot_filter = BloomFilter(
+                settings.BALLOT_FILTER_CAPACITY, settings.BALLOT_FILTER_ERROR_RATE
+            )
+            with get_repository(
+                election_id, DataCollection.SUBMITTED_BALLOT, settings
+            ) as repository:
+                for document in repository.find({}, projection=["object_id"]):
+                    ballot_filter.add(document["object_id"])
+            with _ballot_filters_lock:
+                _ballot_filters[key] = ballot_filter
+        return ballot_filter
+
 
 def filter_ballots(
     election_id: str,
@@ -86,9 +246,243 @@ def filter_ballots(
         ) from error
 
 
+def filter_ballot_ciphertexts(
+    election_id: str,
+    filter: Any,
+    skip: int = 0,
+    limit: int = 1000,
+    settings: Settings = Settings(),
+) -> List[MutableMapping]:
+    """
+    Find ballots without their proofs, as json objects with only
+    the object_id, state and the object_id and ciphertext of each selection.
+    """
+    try:
+        with get_repository(
+            election_id, DataCollection.SUBMITTED_BALLOT, settings
+        ) as repository:
+            return list(
+                repository.find(filter, skip, limit, BALLOT_CIPHERTEXT_PROJECTION)
+            )
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="provided filter not found",
+        ) from error
+
+
+def stream_ballot_ciphertexts(
+    election_id: str,
+    filter: Any,
+    limit: int = 0,
+    chunk_size: int = 1000,
+    settings: Settings = Settings(),
+) -> Iterator[List[MutableMapping]]:
+    """
+    Find ballots as in `filter_ballot_ciphertexts`, yielding them in chunks
+    as they are read from the repository cursor, so only one chunk is held at a time.
+    A limit of 0 is unlimited.
+    """
+    return _stream_ballots(
+        election_id, filter, limit, chunk_size, BALLOT_CIPHERTEXT_PROJECTION, settings
+    )
+
+
+def stream_ballot_ids(
+    election_id: str,
+    filter: Any,
+    limit: int = 0,
+    chunk_size: int = 1000,
+    settings: Settings = Settings(),
+) -> Iterator[List[BALLOT_ID]]:
+    """Find the ids of ballots, yielding them in chunks as they are read."""
+    for chunk in _stream_ballots(
+        election_id, filter, limit, chunk_size, ["object_id"], settings
+    ):
+        yield [ballot["object_id"] for ballot in chunk]
+
+
+def get_ballot_ciphertexts(
+    election_id: str, ballot_ids: List[BALLOT_ID], settings: Settings = Settings()
+) -> List[MutableMapping]:
+    """
+    Get ballots by id, projected as in `filter_ballot_ciphertexts`.
+    Ballots that are not stored are skipped.
+    """
+    try:
+        with get_repository(
+            election_id, DataCollection.SUBMITTED_BALLOT, settings
+        ) as repository:
+            ballots = [
+                repository.get({"object_id": ballot_id}, BALLOT_CIPHERTEXT_PROJECTION)
+                for ballot_id in ballot_ids
+            ]
+            return [ballot for ballot in ballots if ballot]
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get ballot ciphertexts failed",
+        ) from error
+
+
+def _stream_ballots(
+    election_id: str,
+    filter: Any,
+    limit: int,
+    chunk_size: int,
+    projection: PROJECTION_TYPE,
+    settings: Settings,
+) -> Iterator[List[MutableMapping]]:
+    try:
+        with get_repository(
+            election_id, DataCollection.SUBMITTED_BALLOT, settings
+        ) as repository:
+            chunk: List[MutableMapping] = []
+            for ballot in repository.find(filter, 0, limit, projection):
+                chunk.append(ballot)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="provided filter not found",
+        ) from error
+
+
+async def filter_ballots_async(
+    election_id: str,
+    filter: Any,
+    skip: int = 0,
+    limit: int = 1000,
+    settings: Settings = Settings(),
+) -> List[SubmittedBallot]:
+    try:
+        async with get_async_repository(
+            election_id, DataCollection.SUBMITTED_BALLOT, settings
+        ) as repository:
+            ballots: List[SubmittedBallot] = []
+            async for item in repository.find(filter, skip, limit):
+                ballots.append(SubmittedBallot.from_json_object(item))
+            return ballots
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="provided filter not found",
+        ) from error
+
+
+async def get_ballot_code_async(
+    election_id: str, code: str, settings: Settings = Settings()
+) -> Optional[BallotCode]:
+    """
+    Find the ballot a tracking code belongs to by the unique index on codes.
+    Codes that are found are cached, since a submitted ballot does not change state.
+    """
+    cache: LruCache[BallotCode] = get_cache(CacheName.BALLOT_CODE, settings)
+    key = (get_client_id(), election_id, code)
+    cached_code = cache.get(key)
+    if cached_code is not None:
+        return cached_code.copy()
+    try:
+        async with get_async_repository(
+            election_id, DataCollection.BALLOT_CODE, settings
+        ) as repository:
+            query_result = await repository.get({"code": code})
+        if not query_result:
+            # ballots stored before codes had their own collection
+            async with get_async_repository(
+                election_id, DataCollection.SUBMITTED_BALLOT, settings
+            ) as repository:
+                query_result = await repository.get(
+                    {"code": code}, ["code", "object_id", "state"]
+                )
+        if not query_result:
+            return None
+        ballot_code = BallotCode(
+            code=query_result["code"],
+            object_id=query_result["object_id"],
+            state=query_result["state"],
+        )
+        cache.set(key, ballot_code)
+        return ballot_code.copy()
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get ballot code failed",
+        ) from error
+
+
+def get_counted_ballot_ids(
+    election_id: str, state: BallotBoxState, settings: Settings = Settings()
+) -> Set[BALLOT_ID]:
+    """Get the ids of the ballots in a state that were counted, i.e. whose codes are recorded."""
+    try:
+        with get_repository(
+            election_id, DataCollection.BALLOT_CODE, settings
+        ) as repository:
+            return {
+                row["object_id"]
+                for row in repository.find(
+                    {"state": state.name}, projection=["object_id"]
+                )
+            }
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get counted ballots failed",
+        ) from error
+
+
 def get_ballot_inventory(
+    election_id: str,
+    settings: Settings = Settings(),
+    skip: int = 0,
+    limit: int = 1000,
+) -> Optional[BallotInventory]:
+    """
+    Get the ballot counts of an election with a page of its cast ballot codes
+    and a page of its spoiled ballot codes.
+    """
+    inventory = get_ballot_inventory_counts(election_id, settings)
+    if inventory is None:
+        return None
+    if inventory.cast_ballots or inventory.spoiled_ballots:
+        # inventories written before codes were stored in their own collection
+        inventory.cast_ballots = _page(inventory.cast_ballots, skip, limit)
+        inventory.spoiled_ballots = _page(inventory.spoiled_ballots, skip, limit)
+        return inventory
+    try:
+        with get_repository(
+            election_id, DataCollection.BALLOT_CODE, settings
+        ) as repository:
+            for state, codes in [
+                (BallotBoxState.CAST, inventory.cast_ballots),
+                (BallotBoxState.SPOILED, inventory.spoiled_ballots),
+            ]:
+                for row in repository.find({"state": state.name}, skip, limit):
+                    codes[row["code"]] = row["object_id"]
+            return inventory
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get ballot inventory failed",
+        ) from error
+
+
+def get_ballot_inventory_counts(
     election_id: str, settings: Settings = Settings()
 ) -> Optional[BallotInventory]:
+    """Get the ballot counts of an election without the ballot codes."""
     try:
         with get_repository(
             election_id, DataCollection.BALLOT_INVENTORY, settings
@@ -98,10 +492,10 @@ def get_ballot_inventory(
                 return None
             return BallotInventory(
                 election_id=query_result["election_id"],
-                cast_ballot_count=query_result["cast_ballot_count"],
-                spoiled_ballot_count=query_result["spoiled_ballot_count"],
-                cast_ballots=query_result["cast_ballots"],
-                spoiled_ballots=query_result["spoiled_ballots"],
+                cast_ballot_count=query_result.get("cast_ballot_count", 0),
+                spoiled_ballot_count=query_result.get("spoiled_ballot_count", 0),
+                cast_ballots=query_result.get("cast_ballots", {}),
+                spoiled_ballots=query_result.get("spoiled_ballots", {}),
             )
     except Exception as error:
         print(sys.exc_info())
@@ -111,22 +505,91 @@ def get_ballot_inventory(
         ) from error
 
 
-def upsert_ballot_inventory(
-    election_id: str, inventory: BallotInventory, settings: Settings = Settings()
+def create_ballot_inventory(
+    election_id: str, settings: Settings = Settings()
 ) -> BaseResponse:
+    """Create an empty ballot inventory, keeping the counts of an existing one."""
     try:
         with get_repository(
             election_id, DataCollection.BALLOT_INVENTORY, settings
         ) as repository:
-            query_result = repository.get({"election_id": election_id})
-            if not query_result:
-                repository.set(inventory.dict())
-            else:
-                repository.update({"election_id": election_id}, inventory.dict())
+            repository.increment(
+                {"election_id": election_id},
+                {"cast_ballot_count": 0, "spoiled_ballot_count": 0},
+            )
             return BaseResponse()
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="create ballot inventory failed",
+        ) from error
+
+
+def add_ballot_inventory(
+    election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
+) -> SubmitBallotsResponse:
+    """
+    Record the codes of submitted ballots and add them to the ballot counts
+    and the running tally.
+    Each code is stored once, and only the ballots whose codes were not already
+    recorded are counted, so a retried or concurrent submission is counted once.
+    Their ids are reported as duplicates.
+    """
+    if not ballots:
+        return SubmitBallotsResponse()
+    try:
+        with get_repository(
+            election_id, DataCollection.BALLOT_CODE, settings
+        ) as repository:
+            duplicates = set(
+                repository.set_unordered(
+                    [
+                        {
+                            "code": ballot.code.to_hex(),
+                            "object_id": ballot.object_id,
+                            "state": ballot.state.name,
+                        }
+                        for ballot in ballots
+                    ]
+                )
+            )
+        counted = [
+            ballot
+            for position, ballot in enumerate(ballots)
+            if position not in duplicates
+        ]
+        if counted:
+            # added before the inventory, so the running tally only falls behind
+            # the inventory when an update to it was lost
+            accumulate_running_tally(election_id, counted, settings)
+            with get_repository(
+                election_id, DataCollection.BALLOT_INVENTORY, settings
+            ) as repository:
+                repository.increment(
+                    {"election_id": election_id},
+                    {
+                        "cast_ballot_count": _count(counted, BallotBoxState.CAST),
+                        "spoiled_ballot_count": _count(counted, BallotBoxState.SPOILED),
+                    },
+                )
+        return SubmitBallotsResponse(
+            duplicate_ballot_ids=[
+                ballots[position].object_id for position in sorted(duplicates)
+            ]
+        )
     except Exception as error:
         print(sys.exc_info())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="update ballot inventory failed",
         ) from error
+
+
+def _count(ballots: List[SubmittedBallot], state: BallotBoxState) -> int:
+    return sum(1 for ballot in ballots if ballot.state == state)
+
+
+def _page(codes: Dict[str, str], skip: int, limit: int) -> Dict[str, str]:
+    items = list(codes.items())[skip:]
+    return dict(items[:limit] if limit else items)
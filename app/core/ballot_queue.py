@@ -0,0 +1,223 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from logging import getLogger
+from uuid import uuid4
+import json
+import sys
+
+from fastapi import HTTPException, status
+
+from electionguard.ballot import SubmittedBallot
+from electionguard.ballot_box import BallotBoxState
+from electionguard.scheduler import Scheduler
+
+from .ballot import add_ballot_inventory, exclude_duplicate_ballots, set_ballots
+from .ballot_validator import get_election_validation_parameters, validate_ballots
+from .queue import IMessageQueue, QueueMessage, get_message_queue
+from .repository import get_repository, DataCollection
+from .settings import Settings
+from ..api.v1.common.ballot_decoder import decode_submitted_ballot
+from ..api.v1.models import BallotSubmission, BallotSubmissionState
+
+__all__ = [
+    "SUBMITTED_BALLOT_QUEUE",
+    "publish_ballot_submission",
+    "get_ballot_submission",
+    "process_ballot_queue",
+    "drain_ballot_queue",
+]
+
+SUBMITTED_BALLOT_QUEUE = "submitted-ballots"
+
+logger = getLogger(__name__)
+
+
+def publish_ballot_submission(
+    election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
+) -> BallotSubmission:
+    """
+    Record a submission and publish its ballots to the queue, one message per ballot.
+    The ballots are validated and stored by the queue worker.
+    """
+    submission = BallotSubmission(
+        tracking_id=str(uuid4()),
+        election_id=election_id,
+        ballot_count=len(ballots),
+    )
+    try:
+        with get_repository(
+            election_id, DataCollection.BALLOT_SUBMISSION, settings
+        ) as repository:
+            repository.set(submission.dict(exclude={"state"}))
+        with get_message_queue(
+            SUBMITTED_BALLOT_QUEUE, SUBMITTED_BALLOT_QUEUE, settings
+        ) as queue:
+            queue.publish_many(
+                json.dumps(
+                    {
+                        "tracking_id": submission.tracking_id,
+                        "election_id": election_id,
+                        "index": index,
+                        "ballot": ballot.to_json_object(),
+                    }
+                )
+                for index, ballot in enumerate(ballots)
+            )
+        return submission
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="publish ballot submission failed",
+        ) from error
+
+
+def get_ballot_submission(
+    election_id: str, tracking_id: str, settings: Settings = Settings()
+) -> BallotSubmission:
+    try:
+        with get_repository(
+            election_id, DataCollection.BALLOT_SUBMISSION, settings
+        ) as repository:
+            query_result = repository.get({"tracking_id": tracking_id})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find ballot submission {tracking_id}",
+                )
+            submission = BallotSubmission(
+                tracking_id=query_result["tracking_id"],
+                election_id=query_result["election_id"],
+                ballot_count=query_result.get("ballot_count", 0),
+                accepted_count=query_result.get("accepted_count", 0),
+                rejected_count=query_result.get("rejected_count", 0),
+            )
+            if (
+                submission.accepted_count + submission.rejected_count
+                >= submission.ballot_count
+            ):
+                submission.state = BallotSubmissionState.COMPLETE
+            return submission
+    except HTTPException:
+        raise
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get ballot submission failed",
+        ) from error
+
+
+def process_ballot_queue(
+    queue: IMessageQueue,
+    settings: Settings = Settings(),
+    scheduler: Optional[Scheduler] = None,
+    timeout_seconds: float = 0,
+) -> int:
+    """
+    Receive a batch of submitted ballots, validate them and store the valid ones.
+
+    Messages are acknowledged only once their ballots are stored,
+    so a batch that fails to be stored is redelivered.
+    Each ballot of a submission is counted once, however often it is delivered.
+    Returns the number of messages received.
+    """
+    messages = queue.receive(settings.BALLOT_QUEUE_BATCH_SIZE, timeout_seconds)
+
+    batches: Dict[str, List[Tuple[QueueMessage, str, str, SubmittedBallot]]] = {}
+    for message in messages:
+        try:
+            body = json.loads(message.body)
+            election_id = body["election_id"]
+            tracking_id = body["tracking_id"]
+            ballot = decode_submitted_ballot(body["ballot"])
+            # messages published before they carried an index are keyed by ballot id
+            receipt_id = f"{tracking_id}/{body.get('index', ballot.object_id)}"
+        except Exception:  # pylint: disable=broad-except
+            # a message that cannot be read will never be, so it is dropped
+            logger.warning(f"dropping unreadable ballot message {message.delivery_tag}")
+            queue.reject([message], requeue=False)
+            continue
+        batches.setdefault(election_id, []).append(
+            (message, tracking_id, receipt_id, ballot)
+        )
+
+    for election_id, batch in batches.items():
+        batch_messages = [message for message, _, _, _ in batch]
+        try:
+            _store_ballot_batch(election_id, batch, settings, scheduler)
+        except Exception:  # pylint: disable=broad-except
+            print(sys.exc_info())
+            queue.reject(batch_messages, requeue=True)
+            continue
+        queue.ack(batch_messages)
+    return len(messages)
+
+
+def drain_ballot_queue(settings: Settings = Settings()) -> None:
+    """Process submitted ballots until the queue is empty."""
+    with get_message_queue(
+        SUBMITTED_BALLOT_QUEUE, SUBMITTED_BALLOT_QUEUE, settings
+    ) as queue:
+        while process_ballot_queue(queue, settings) > 0:
+            pass
+
+
+def _store_ballot_batch(
+    election_id: str,
+    batch: Sequence[Tuple[QueueMessage, str, str, SubmittedBallot]],
+    settings: Settings,
+    scheduler: Optional[Scheduler],
+) -> None:
+    ballots, _ = exclude_duplicate_ballots(
+        election_id, [ballot for _, _, _, ballot in batch], settings
+    )
+    parameters = get_election_validation_parameters(election_id, settings)
+    results = validate_ballots(ballots, parameters, settings, scheduler)
+    accepted = [
+        ballot
+        for ballot in ballots
+        if ballot.state != BallotBoxState.UNKNOWN and results[ballot.object_id]
+    ]
+
+    # a redelivered batch may have stored ballots without counting them,
+    # so every accepted ballot is counted unless its code was already recorded
+    set_ballots(election_id, accepted, settings)
+    duplicate_ids = set(
+        add_ballot_inventory(election_id, accepted, settings).duplicate_ballot_ids
+    )
+    stored = [ballot for ballot in accepted if ballot.object_id not in duplicate_ids]
+
+    stored_ids = {id(ballot) for ballot in stored}
+    receipts: List[Dict[str, Any]] = [
+        {
+            "receipt_id": receipt_id,
+            "tracking_id": tracking_id,
+            "object_id": ballot.object_id,
+            "accepted": id(ballot) in stored_ids,
+        }
+        for _, tracking_id, receipt_id, ballot in batch
+    ]
+    # the receipts of a redelivered batch that was already counted are duplicates,
+    # so its ballots are not counted again
+    with get_repository(
+        election_id, DataCollection.BALLOT_SUBMISSION_RECEIPT, settings
+    ) as repository:
+        counted = set(repository.set_unordered(receipts))
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for position, receipt in enumerate(receipts):
+        if position in counted:
+            continue
+        count = "accepted_count" if receipt["accepted"] else "rejected_count"
+        tracking_counts = counts.setdefault(
+            receipt["tracking_id"], {"accepted_count": 0, "rejected_count": 0}
+        )
+        tracking_counts[count] += 1
+        if count == "rejected_count":
+            logger.warning(f"rejected queued ballot {receipt['object_id']}")
+
+    with get_repository(
+        election_id, DataCollection.BALLOT_SUBMISSION, settings
+    ) as repository:
+        for tracking_id, tracking_counts in counts.items():
+            repository.increment({"tracking_id": tracking_id}, tracking_counts)
@@ -0,0 +1,254 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import pickle
+
+from electionguard.ballot import (
+    CiphertextBallot,
+    CiphertextBallotContest,
+    CiphertextBallotSelection,
+)
+from electionguard.election import CiphertextElectionContext
+from electionguard.group import ElementModQ
+from electionguard.logs import log_warning
+from electionguard.manifest import InternalManifest, Manifest
+from electionguard.scheduler import Scheduler
+from electionguard.type import BALLOT_ID, CONTEST_ID, SELECTION_ID
+
+from .cache import CacheName, LruCache, get_cache
+from .client import get_client_id
+from .election import get_election
+from .scheduler import get_scheduler
+from .settings import Settings
+
+__all__ = [
+    "BallotValidationParameters",
+    "get_validation_parameters",
+    "get_election_validation_parameters",
+    "validate_ballots",
+]
+
+
+# the parameters of the elections most recently validated by a pool worker
+_WORKER_PARAMETERS_MAX_SIZE = 8
+
+
+class _ContestHashes(NamedTuple):
+    object_id: CONTEST_ID
+    description_hash: ElementModQ
+    selection_count: int
+    selection_hashes: List[Tuple[SELECTION_ID, ElementModQ]]
+
+
+class BallotValidationParameters:
+    """
+    The parsed manifest and context of an election, with the description hashes
+    of the contests and selections of each ballot style computed once,
+    so validating a ballot only checks the ballot itself.
+    """
+
+    def __init__(self, manifest: Manifest, context: CiphertextElectionContext):
+        self.internal_manifest = InternalManifest(manifest)
+        self.context = context
+        # the extended base hash commits to the manifest and the election key
+        self.key = context.crypto_extended_base_hash.to_hex()
+        self._serialized: Optional[bytes] = None
+        self._styles: Dict[str, List[_ContestHashes]] = {
+            style.object_id: [
+                _ContestHashes(
+                    contest.object_id,
+                    contest.crypto_hash(),
+                    len(contest.ballot_selections)
+                    + len(contest.placeholder_selections),
+                    [
+                        (selection.object_id, selection.crypto_hash())
+                        for selection in contest.ballot_selections
+                    ],
+                )
+                for contest in self.internal_manifest.get_contests_for(style.object_id)
+            ]
+            for style in self.internal_manifest.ballot_styles
+        }
+
+    def serialized(self) -> bytes:
+        """Get the parameters pickled for the pool workers, pickling them only once."""
+        if self._serialized is None:
+            self._serialized = pickle.dumps(self)
+        return self._serialized
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, "_serialized": None}
+
+    def is_valid(self, ballot: CiphertextBallot) -> bool:
+        """
+        Determine if a ballot is valid for the election.
+        Equivalent to `ballot_is_valid_for_election` without rehashing the manifest.
+        """
+        return self.is_valid_for_style(ballot) and self._is_valid_encryption(ballot)
+
+    def is_valid_for_style(self, ballot: CiphertextBallot) -> bool:
+        """Determine if the contests and selections of a ballot match its ballot style."""
+        contest_hashes = self._styles.get(ballot.style_id)
+        if contest_hashes is None:
+            log_warning(f"ballot is not valid for style: unknown {ballot.style_id}")
+            return False
+
+        # the first contest or selection with an id is used, as in the sdk
+        contests: Dict[CONTEST_ID, CiphertextBallotContest] = {}
+        for contest in reversed(ballot.contests):
+            contests[contest.object_id] = contest
+        for expected in contest_hashes:
+            use_contest = contests.get(expected.object_id)
+            if use_contest is None:
+                log_warning(
+                    f"ballot is not valid for style: missing contest {expected.object_id}"
+                )
+                return False
+            if use_contest.description_hash != expected.description_hash:
+                log_warning(
+                    f"ballot is not valid for style: mismatched description hash "
+                    f"for contest {expected.object_id}"
+                )
+                return False
+            if len(use_contest.ballot_selections) != expected.selection_count:
+                log_warning(
+                    f"ballot is not valid for style: mismatched selection count "
+                    f"for contest {expected.object_id}"
+                )
+                return False
+
+            selections: Dict[SELECTION_ID, CiphertextBallotSelection] = {}
+            for selection in reversed(use_contest.ballot_selections):
+                selections[selection.object_id] = selection
+            for selection_id, description_hash in expected.selection_hashes:
+                use_selection = selections.get(selection_id)
+                if use_selection is None:
+                    log_warning(
+                        f"ballot is not valid for style: missing selection {selection_id}"
+                    )
+                    return False
+                if use_selection.description_hash != description_hash:
+                    log_warning(
+                        f"ballot is not valid for style: mismatched selection "
+                        f"description hash for selection {selection_id}"
+                    )
+                    return False
+        return True
+
+    def _is_valid_encryption(self, ballot: CiphertextBallot) -> bool:
+        if not ballot.is_valid_encryption(
+            self.internal_manifest.manifest_hash,
+            self.context.elgamal_public_key,
+            self.context.crypto_extended_base_hash,
+        ):
+            log_warning(f"mismatching ballot encryption {ballot.object_id}")
+            return False
+        return True
+
+
+def get_validation_parameters(
+    manifest: Any, context: Any
+) -> BallotValidationParameters:
+    """Get the parameters to validate ballots with from sdk objects or json objects."""
+    if not isinstance(manifest, Manifest):
+        manifest = Manifest.from_json_object(manifest)
+    if not isinstance(context, CiphertextElectionContext):
+        context = CiphertextElectionContext.from_json_object(context)
+    return BallotValidationParameters(manifest, context)
+
+
+def get_election_validation_parameters(
+    election_id: str, settings: Settings = Settings()
+) -> BallotValidationParameters:
+    """
+    Get the parameters to validate the ballots of a stored election.
+    They are cached per election and invalidated when the election is written.
+    """
+    cache: LruCache[BallotValidationParameters] = get_cache(
+        CacheName.BALLOT_VALIDATION, settings
+    )
+    key = (get_client_id(), election_id)
+    parameters = cache.get(key)
+    if parameters is None:
+        election = get_election(election_id, settings)
+        parameters = BallotValidationParameters(
+            Manifest.from_json_object(election.manifest),
+            election.context.to_sdk_format(),
+        )
+        cache.set(key, parameters)
+    return parameters
+
+
+def validate_ballots(
+    ballots: Sequence[CiphertextBallot],
+    parameters: BallotValidationParameters,
+    settings: Settings = Settings(),
+    scheduler: Optional[Scheduler] = None,
+) -> Dict[BALLOT_ID, bool]:
+    """
+    Check the proofs of each ballot against the election.
+
+    Batches at or above the parallel threshold are split into chunks
+    that are validated on the scheduler's process pool.  Each worker keeps the
+    parameters of the elections it has validated, so the parameters are only sent
+    with the chunks given to a worker that does not have them yet.
+    Returns whether each ballot is valid, keyed by ballot id.
+    """
+    if len(ballots) < settings.BALLOT_VALIDATION_PARALLEL_THRESHOLD:
+        return dict(_validate_chunk(ballots, parameters))
+
+    chunk_size = max(1, settings.BALLOT_VALIDATION_CHUNK_SIZE)
+    chunks = [
+        ballots[index : index + chunk_size]
+        for index in range(0, len(ballots), chunk_size)
+    ]
+    scheduler = scheduler or get_scheduler()
+    chunk_results: List[Optional[List[Tuple[BALLOT_ID, bool]]]] = scheduler.schedule(
+        _validate_worker_chunk,
+        [(chunk, parameters.key, None) for chunk in chunks],
+    )
+    if len(chunk_results) == len(chunks):
+        missing = [
+            chunk
+            for chunk, chunk_result in zip(chunks, chunk_results)
+            if chunk_result is None
+        ]
+        if missing:
+            chunk_results += scheduler.schedule(
+                _validate_worker_chunk,
+                [(chunk, parameters.key, parameters.serialized()) for chunk in missing],
+            )
+    results: Dict[BALLOT_ID, bool] = {}
+    for chunk_result in chunk_results:
+        if chunk_result is not None:
+            results.update(chunk_result)
+
+    # the scheduler returns nothing if the pool fails, so finish on this thread
+    remaining = [ballot for ballot in ballots if ballot.object_id not in results]
+    results.update(_validate_chunk(remaining, parameters))
+    return results
+
+
+def _validate_chunk(
+    ballots: Sequence[CiphertextBallot], parameters: BallotValidationParameters
+) -> List[Tuple[BALLOT_ID, bool]]:
+    return [(ballot.object_id, parameters.is_valid(ballot)) for ballot in ballots]
+
+
+_worker_parameters: LruCache[BallotValidationParameters] = LruCache(
+    _WORKER_PARAMETERS_MAX_SIZE, float("inf")
+)
+
+
+def _validate_worker_chunk(
+    ballots: Sequence[CiphertextBallot], key: str, serialized: Optional[bytes]
+) -> Optional[List[Tuple[BALLOT_ID, bool]]]:
+    """
+    Validate a chunk on a pool worker with the parameters it keeps for the election.
+    Returns None when the worker does not have the parameters and none were sent.
+    """
+    parameters = _worker_parameters.get(key)
+    if parameters is None:
+        if serialized is None:
+            return None
+        parameters = pickle.loads(serialized)
+        _worker_parameters.set(key, parameters)
+    return _validate_chunk(ballots, parameters)
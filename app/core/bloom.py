@@ -0,0 +1,45 @@
+from hashlib import blake2b
+from math import ceil, log
+from threading import Lock
+from typing import List
+
+__all__ = [
+    "BloomFilter",
+]
+
+
+class BloomFilter:
+    """
+    A compact set of strings that can answer "definitely not added" exactly
+    and "possibly added" with a configured false positive rate.
+
+    The bit array is sized for the expected capacity.  Adding more items
+    than the capacity raises the false positive rate but never causes a false negative.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self._size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self._hash_count = max(1, round(self._size / capacity * log(2)))
+        self._bits = bytearray(ceil(self._size / 8))
+        self._lock = Lock()
+
+    def add(self, item: str) -> None:
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item: str) -> List[int]:
+        # double hashing derives every position from one 128 bit digest
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first + index * second) % self._size for index in range(self._hash_count)
+        ]
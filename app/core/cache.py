@@ -0,0 +1,106 @@
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from .settings import Settings
+
+__all__ = [
+    "LruCache",
+    "CacheName",
+    "get_cache",
+    "get_cache_stats",
+    "clear_caches",
+]
+
+_T = TypeVar("_T")
+
+
+class CacheName:
+    ELECTION = "election"
+    MANIFEST = "manifest"
+    KEY_CEREMONY = "keyCeremony"
+    BALLOT_VALIDATION = "ballotValidation"
+    BALLOT_CODE = "ballotCode"
+
+
+class LruCache(Generic[_T]):
+    """
+    A thread safe, in-process cache that evicts the least recently used entry
+    once full and expires entries after a time to live.
+
+    The time to live bounds how long another process can serve a stale value,
+    since invalidation only reaches the cache of the process that made the change.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, _T]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[_T]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: _T) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+_caches: Dict[str, LruCache] = {}
+_caches_lock = Lock()
+
+
+def get_cache(name: str, settings: Settings = Settings()) -> LruCache[Any]:
+    """Get the process-wide cache with the given name."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = LruCache(settings.CACHE_MAX_SIZE, settings.CACHE_TTL_SECONDS)
+            _caches[name] = cache
+        return cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Get the hit and miss counts and size of each cache."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def clear_caches() -> None:
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
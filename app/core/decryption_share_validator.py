@@ -0,0 +1,239 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import secrets
+
+from gmpy2 import jacobi, mpz, powmod
+
+from electionguard.chaum_pedersen import ChaumPedersenProof
+from electionguard.decryption_share import (
+    CiphertextDecryptionSelection,
+    DecryptionShare,
+)
+from electionguard.elgamal import ElGamalCiphertext
+from electionguard.group import G, P, Q, ElementModP, ElementModQ
+from electionguard.hash import hash_elems
+from electionguard.scheduler import Scheduler
+from electionguard.type import CONTEST_ID, SELECTION_ID
+from electionguard.utils import get_optional
+
+from .scheduler import get_scheduler
+from .settings import Settings
+
+__all__ = [
+    "SelectionShareCheck",
+    "validate_decryption_share",
+]
+
+_P = mpz(P)
+_Q = mpz(Q)
+_G = mpz(G)
+
+# an invalid proof passes a batch check with probability at most 2^-127
+_BATCH_WEIGHT_BITS = 128
+
+# bits of the exponents consumed per multiplication by a multi-exponentiation
+_WINDOW_BITS = 4
+
+
+class SelectionShareCheck(NamedTuple):
+    """The share of a guardian for one selection, with the tally ciphertext it decrypts."""
+
+    contest_id: CONTEST_ID
+    selection_id: SELECTION_ID
+    share: Optional[CiphertextDecryptionSelection]
+    message: ElGamalCiphertext
+
+
+def validate_decryption_share(
+    tally_share: DecryptionShare,
+    ciphertexts: Dict[CONTEST_ID, Dict[SELECTION_ID, ElGamalCiphertext]],
+    election_public_key: ElementModP,
+    extended_base_hash: ElementModQ,
+    batch: bool = False,
+    settings: Settings = Settings(),
+    scheduler: Optional[Scheduler] = None,
+) -> Optional[Tuple[CONTEST_ID, SELECTION_ID]]:
+    """
+    Check the proof of the share of each selection of the tally.
+
+    The selections are split into chunks that are checked on the scheduler's process pool.
+    With `batch`, each chunk is first checked at once by a randomized batch verification,
+    and only a chunk that fails it is checked selection by selection.
+    Returns the contest and selection of the first invalid share, or None if all are valid.
+    """
+    checks: List[SelectionShareCheck] = []
+    for contest_id, selections in ciphertexts.items():
+        contest_share = tally_share.contests.get(contest_id)
+        for selection_id, message in selections.items():
+            share = (
+                contest_share.selections.get(selection_id) if contest_share else None
+            )
+            checks.append(SelectionShareCheck(contest_id, selection_id, share, message))
+
+    chunk_size = max(1, settings.DECRYPTION_SHARE_VALIDATION_CHUNK_SIZE)
+    chunks = [
+        checks[index : index + chunk_size]
+        for index in range(0, len(checks), chunk_size)
+    ]
+    tasks = [
+        (chunk, election_public_key, extended_base_hash, batch) for chunk in chunks
+    ]
+    chunk_results: List[List[Tuple[CONTEST_ID, SELECTION_ID]]] = []
+    if len(chunks) > 1:
+        chunk_results = (scheduler or get_scheduler()).schedule(_validate_chunk, tasks)
+    if len(chunk_results) != len(chunks):
+        # the scheduler returns nothing if the pool fails, so finish on this thread
+        chunk_results = [_validate_chunk(*task) for task in tasks]
+
+    for invalid in chunk_results:
+        if invalid:
+            return invalid[0]
+    return None
+
+
+def _validate_chunk(
+    checks: Sequence[SelectionShareCheck],
+    election_public_key: ElementModP,
+    extended_base_hash: ElementModQ,
+    batch: bool,
+) -> List[Tuple[CONTEST_ID, SELECTION_ID]]:
+    if batch and _batch_is_valid(checks, election_public_key, extended_base_hash):
+        return []
+    return [
+        (check.contest_id, check.selection_id)
+        for check in checks
+        if check.share is None
+        or not check.share.is_valid(
+            check.message, election_public_key, extended_base_hash
+        )
+    ]
+
+
+def _batch_is_valid(
+    checks: Sequence[SelectionShareCheck],
+    election_public_key: ElementModP,
+    extended_base_hash: ElementModQ,
+) -> bool:
+    """
+    Check every proof of the shares at once.  A share is proven either by its own proof
+    or, for a missing guardian, by the proofs of the parts recovered by the others,
+    as in `CiphertextDecryptionSelection.is_valid`.
+    """
+    proofs: List[
+        Tuple[ElGamalCiphertext, ElementModP, ElementModP, ChaumPedersenProof]
+    ] = []
+    for check in checks:
+        share = check.share
+        if share is None or (share.proof is None) == (share.recovered_parts is None):
+            return False
+        if share.proof is not None:
+            proofs.append(
+                (check.message, election_public_key, share.share, share.proof)
+            )
+        else:
+            for part in get_optional(share.recovered_parts).values():
+                proofs.append(
+                    (check.message, part.recovery_key, part.share, part.proof)
+                )
+    return _proofs_are_valid(proofs, extended_base_hash)
+
+
+def _proofs_are_valid(
+    proofs: Sequence[
+        Tuple[ElGamalCiphertext, ElementModP, ElementModP, ChaumPedersenProof]
+    ],
+    extended_base_hash: ElementModQ,
+) -> bool:
+    """
+    Verify the same conditions as `ChaumPedersenProof.is_valid` for a batch of proofs.
+
+    The challenges are hashed and the bounds are checked for each proof.
+    The group membership of the elements and the two equations of the proofs,
+    g^v = a·k^c and α^v = b·m^c, are each checked once for a random combination
+    of all the proofs, so most exponents are 128 bit weights rather than 256 bit,
+    and the exponentiations share their squarings.
+    """
+    if not extended_base_hash.is_in_bounds():
+        return False
+
+    elements: Dict[mpz, mpz] = {}
+    generator_exponent = mpz(0)
+    # g^Σwv = Πa^w·Πk^Σwc
+    first_right: Dict[mpz, mpz] = {}
+    # Πα^wv = Πb^w·Πm^wc
+    second_left: Dict[mpz, mpz] = {}
+    second_right: Dict[mpz, mpz] = {}
+    for message, k, m, proof in proofs:
+        if not (proof.challenge.is_in_bounds() and proof.response.is_in_bounds()):
+            return False
+        if proof.challenge != hash_elems(
+            extended_base_hash, message.pad, message.data, proof.pad, proof.data, m
+        ):
+            return False
+        for element in (message.pad, message.data, k, m, proof.pad, proof.data):
+            elements[element.to_int()] = _weight()
+
+        weight = _weight()
+        c = proof.challenge.to_int()
+        v = proof.response.to_int()
+        generator_exponent += weight * v
+        _add_exponent(first_right, proof.pad.to_int(), weight)
+        _add_exponent(first_right, k.to_int(), weight * c)
+        _add_exponent(second_left, message.pad.to_int(), weight * v)
+        _add_exponent(second_right, proof.data.to_int(), weight)
+        _add_exponent(second_right, m.to_int(), weight * c)
+
+    return (
+        _are_residues(elements)
+        and powmod(_G, generator_exponent % _Q, _P) == _multi_exponentiate(first_right)
+        and _multi_exponentiate(second_left) == _multi_exponentiate(second_right)
+    )
+
+
+def _are_residues(elements: Dict[mpz, mpz]) -> bool:
+    """
+    Check that the elements are in the subgroup of order q, i.e. x^q = 1 mod p,
+    by raising their product with random weights to q once.
+    Since p - 1 = 2·q·r for a large prime r, the quadratic residue check
+    leaves only components of large prime order, which the weights cannot cancel.
+    """
+    for element in elements:
+        if not 0 < element < _P or jacobi(element, _P) != 1:
+            return False
+    return bool(powmod(_multi_exponentiate(elements), _Q, _P) == 1)
+
+
+def _multi_exponentiate(terms: Dict[mpz, mpz]) -> mpz:
+    """
+    Compute the product of base^exponent mod p for each term,
+    squaring once for all the terms rather than once per term.
+    """
+    tables: List[Tuple[List[mpz], mpz]] = []
+    for base, exponent in terms.items():
+        if exponent == 0:
+            continue
+        table = [mpz(1), base]
+        for _ in range(2, 1 << _WINDOW_BITS):
+            table.append(table[-1] * base % _P)
+        tables.append((table, exponent))
+    if not tables:
+        return mpz(1)
+
+    mask = (1 << _WINDOW_BITS) - 1
+    bits = max(exponent.bit_length() for _, exponent in tables)
+    result = mpz(1)
+    for shift in range((bits - 1) // _WINDOW_BITS * _WINDOW_BITS, -1, -_WINDOW_BITS):
+        result = powmod(result, 1 << _WINDOW_BITS, _P)
+        for table, exponent in tables:
+            digit = (exponent >> shift) & mask
+            if digit:
+                result = result * table[digit] % _P
+    return result
+
+
+def _add_exponent(terms: Dict[mpz, mpz], base: mpz, exponent: mpz) -> None:
+    # the bases are checked to be of order q, so the exponents are reduced mod q
+    terms[base] = (terms.get(base, mpz(0)) + exponent) % _Q
+
+
+def _weight() -> mpz:
+    return mpz(secrets.randbits(_BATCH_WEIGHT_BITS) | 1)
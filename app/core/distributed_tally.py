@@ -0,0 +1,224 @@
+from typing import Dict, List, MutableMapping, Optional, Set, Tuple
+from logging import getLogger
+from time import monotonic, sleep
+from uuid import uuid4
+import json
+import sys
+
+from fastapi import HTTPException, status
+
+from electionguard.elgamal import ElGamalCiphertext, elgamal_add
+from electionguard.scheduler import Scheduler
+from electionguard.serializable import write_json_object
+from electionguard.type import BALLOT_ID, SELECTION_ID
+
+from .ballot import get_ballot_ciphertexts, stream_ballot_ids
+from .queue import IMessageQueue, get_message_queue
+from .repository import get_repository, DataCollection
+from .scheduler import get_scheduler
+from .settings import QueueMode, Settings
+from ..api.v1.common.ballot_decoder import decode_ciphertext
+from ..api.v1.models import CiphertextTallyShard
+
+__all__ = [
+    "TALLY_SHARD_QUEUE",
+    "publish_tally_shards",
+    "process_tally_shard_queue",
+    "drain_tally_shard_queue",
+    "reduce_tally_shards",
+]
+
+TALLY_SHARD_QUEUE = "tally-shards"
+
+# how often the mediator checks whether the workers have tallied every shard
+_SHARD_POLL_SECONDS = 1.0
+
+logger = getLogger(__name__)
+
+
+def publish_tally_shards(
+    election_id: str,
+    tally_name: str,
+    filter: MutableMapping,
+    limit: int = 0,
+    settings: Settings = Settings(),
+) -> List[str]:
+    """
+    Partition the ids of the matching ballots into shards of TALLY_SHARD_SIZE
+    and publish one message per shard for the tally workers.
+    Returns the ids of the shards.
+    """
+    shard_ids: List[str] = []
+    try:
+        with get_message_queue(TALLY_SHARD_QUEUE, TALLY_SHARD_QUEUE, settings) as queue:
+            for ballot_ids in stream_ballot_ids(
+                election_id, filter, limit, settings.TALLY_SHARD_SIZE, settings
+            ):
+                shard_id = str(uuid4())
+                queue.publish(
+                    json.dumps(
+                        {
+                            "election_id": election_id,
+                            "tally_name": tally_name,
+                            "shard_id": shard_id,
+                            "ballot_ids": ballot_ids,
+                        }
+                    )
+                )
+                shard_ids.append(shard_id)
+        return shard_ids
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="publish tally shards failed",
+        ) from error
+
+
+def process_tally_shard_queue(
+    queue: IMessageQueue,
+    settings: Settings = Settings(),
+    scheduler: Optional[Scheduler] = None,
+    timeout_seconds: float = 0,
+) -> int:
+    """
+    Receive shards of distributed tallies and store the partial tally of each.
+
+    A message is acknowledged once its partial tally is stored.  Partial tallies
+    are stored once per shard, so a redelivered shard is not counted twice.
+    Returns the number of messages received.
+    """
+    messages = queue.receive(1, timeout_seconds)
+    for message in messages:
+        try:
+            body = json.loads(message.body)
+            shard = CiphertextTallyShard(
+                election_id=body["election_id"],
+                tally_name=body["tally_name"],
+                shard_id=body["shard_id"],
+            )
+            ballot_ids: List[BALLOT_ID] = body["ballot_ids"]
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(f"dropping unreadable tally shard {message.delivery_tag}")
+            queue.reject([message], requeue=False)
+            continue
+        try:
+            _tally_shard(shard, ballot_ids, settings, scheduler)
+        except Exception:  # pylint: disable=broad-except
+            print(sys.exc_info())
+            queue.reject([message], requeue=True)
+            continue
+        queue.ack([message])
+    return len(messages)
+
+
+def drain_tally_shard_queue(
+    settings: Settings = Settings(), scheduler: Optional[Scheduler] = None
+) -> None:
+    """Tally shards until the queue is empty."""
+    with get_message_queue(TALLY_SHARD_QUEUE, TALLY_SHARD_QUEUE, settings) as queue:
+        while process_tally_shard_queue(queue, settings, scheduler) > 0:
+            pass
+
+
+def reduce_tally_shards(
+    election_id: str,
+    tally_name: str,
+    shard_ids: List[str],
+    settings: Settings = Settings(),
+    scheduler: Optional[Scheduler] = None,
+) -> Tuple[Dict[SELECTION_ID, ElGamalCiphertext], Set[BALLOT_ID]]:
+    """
+    Wait until every shard is tallied and merge the partial tallies.
+
+    With a local queue the shards are tallied here, on the scheduler's process pool.
+    Otherwise the tally workers tally them, for up to TALLY_SHARD_TIMEOUT_SECONDS.
+    Returns the product of each selection and the ids of the ballots included.
+    """
+    if settings.QUEUE_MODE == QueueMode.LOCAL:
+        drain_tally_shard_queue(settings, scheduler)
+
+    expected = set(shard_ids)
+    deadline = monotonic() + settings.TALLY_SHARD_TIMEOUT_SECONDS
+    with get_repository(
+        election_id, DataCollection.CIPHERTEXT_TALLY_SHARD, settings
+    ) as repository:
+        while True:
+            tallied = {
+                shard["shard_id"]
+                for shard in repository.find(
+                    {"tally_name": tally_name}, projection=["shard_id"]
+                )
+            }
+            if expected <= tallied:
+                break
+            if monotonic() > deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail=f"{len(expected - tallied)} of {len(expected)} "
+                    f"shards of tally {tally_name} were not tallied in time",
+                )
+            sleep(_SHARD_POLL_SECONDS)
+
+        selections: Dict[SELECTION_ID, ElGamalCiphertext] = {}
+        ballot_ids: Set[BALLOT_ID] = set()
+        for shard in repository.find({"tally_name": tally_name}):
+            if shard["shard_id"] not in expected:
+                continue
+            ballot_ids.update(shard["ballot_ids"])
+            for selection_id, ciphertext in shard["selections"].items():
+                partial = decode_ciphertext(ciphertext)
+                existing = selections.get(selection_id)
+                selections[selection_id] = (
+                    partial if existing is None else elgamal_add(existing, partial)
+                )
+        return selections, ballot_ids
+
+
+def _tally_shard(
+    shard: CiphertextTallyShard,
+    ballot_ids: List[BALLOT_ID],
+    settings: Settings,
+    scheduler: Optional[Scheduler],
+) -> None:
+    ballots = get_ballot_ciphertexts(shard.election_id, ballot_ids, settings)
+    ciphertexts: Dict[SELECTION_ID, List[ElGamalCiphertext]] = {}
+    for ballot in ballots:
+        for contest in ballot["contests"]:
+            for selection in contest["ballot_selections"]:
+                ciphertexts.setdefault(selection["object_id"], []).append(
+                    decode_ciphertext(selection["ciphertext"])
+                )
+
+    tasks = list(ciphertexts.items())
+    products: List[Tuple[SELECTION_ID, ElGamalCiphertext]] = (
+        scheduler or get_scheduler()
+    ).schedule(_multiply, tasks)
+    if len(products) != len(tasks):
+        # the scheduler returns nothing if the pool fails, so finish on this thread
+        products = [_multiply(*task) for task in tasks]
+
+    shard.ballot_ids = [ballot["object_id"] for ballot in ballots]
+    shard.selections = {
+        selection_id: write_json_object(ciphertext)
+        for selection_id, ciphertext in products
+    }
+    with get_repository(
+        shard.election_id, DataCollection.CIPHERTEXT_TALLY_SHARD, settings
+    ) as repository:
+        if repository.set_unordered([shard.dict()]):
+            logger.info(f"tally shard {shard.shard_id} was already tallied")
+            return
+    with get_repository(
+        shard.election_id, DataCollection.CIPHERTEXT_TALLY_PROGRESS, settings
+    ) as repository:
+        repository.increment(
+            {"election_id": shard.election_id, "tally_name": shard.tally_name},
+            {"processed_ballot_count": len(ballot_ids)},
+        )
+
+
+def _multiply(
+    selection_id: SELECTION_ID, ciphertexts: List[ElGamalCiphertext]
+) -> Tuple[SELECTION_ID, ElGamalCiphertext]:
+    return selection_id, elgamal_add(*ciphertexts)
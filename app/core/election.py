@@ -5,6 +5,8 @@ from fastapi import HTTPException, status
 
 from electionguard.serializable import write_json_object
 
+from .async_repository import get_async_repository
+from .cache import CacheName, LruCache, get_cache
 from .client import get_client_id
 from .repository import get_repository, DataCollection
 from .settings import Settings
@@ -13,6 +15,7 @@ from ..api.v1.models import BaseResponse, Election, ElectionState
 __all__ = [
     "election_from_query",
     "get_election",
+    "get_election_async",
     "set_election",
     "filter_elections",
     "update_election_state",
@@ -30,6 +33,10 @@ def election_from_query(query_result: Any) -> Election:
 
 
 def get_election(election_id: str, settings: Settings = Settings()) -> Election:
+    cache: LruCache[Election] = get_cache(CacheName.ELECTION, settings)
+    cached_election = cache.get((get_client_id(), election_id))
+    if cached_election is not None:
+        return cached_election.copy()
     try:
         with get_repository(
             get_client_id(), DataCollection.ELECTION, settings
@@ -41,8 +48,36 @@ def get_election(election_id: str, settings: Settings = Settings()) -> Election:
                     detail=f"Could not find election {election_id}",
                 )
             election = election_from_query(query_result)
+            cache.set((get_client_id(), election_id), election)
+            return election.copy()
+    except Exception as error:
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{election_id} not found",
+        ) from error
+
 
-            return election
+async def get_election_async(
+    election_id: str, settings: Settings = Settings()
+) -> Election:
+    cache: LruCache[Election] = get_cache(CacheName.ELECTION, settings)
+    cached_election = cache.get((get_client_id(), election_id))
+    if cached_election is not None:
+        return cached_election.copy()
+    try:
+        async with get_async_repository(
+            get_client_id(), DataCollection.ELECTION, settings
+        ) as repository:
+            query_result = await repository.get({"election_id": election_id})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find election {election_id}",
+                )
+            election = election_from_query(query_result)
+            cache.set((get_client_id(), election_id), election)
+            return election.copy()
     except Exception as error:
         traceback.print_exc()
         raise HTTPException(
@@ -57,6 +92,7 @@ def set_election(election: Election, settings: Settings = Settings()) -> BaseRes
             get_client_id(), DataCollection.ELECTION, settings
         ) as repository:
             _ = repository.set(write_json_object(election.dict()))
+            _invalidate_election(election.election_id, settings)
             return BaseResponse(
                 message="Election Successfully Set",
             )
@@ -104,6 +140,7 @@ def update_election_state(
             election = election_from_query(query_result)
             election.state = new_state
             repository.update({"election_id": election_id}, election.dict())
+            _invalidate_election(election_id, settings)
             return BaseResponse()
     except Exception as error:
         traceback.print_exc()
@@ -111,3 +148,9 @@ def update_election_state(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="update election failed",
         ) from error
+
+
+def _invalidate_election(election_id: str, settings: Settings) -> None:
+    key = (get_client_id(), election_id)
+    get_cache(CacheName.ELECTION, settings).invalidate(key)
+    get_cache(CacheName.BALLOT_VALIDATION, settings).invalidate(key)
@@ -0,0 +1,126 @@
+from typing import Any, Dict, List, Tuple
+
+import sys
+
+from pymongo import MongoClient
+from pymongo.database import Database
+
+from .repository import (
+    COLLECTION_INDEXES,
+    INDEX_FAILURE_COLLECTION,
+    IndexSpec,
+    ensure_mongo_indexes,
+)
+from .settings import Settings
+
+__all__ = [
+    "ensure_all_mongo_indexes",
+    "find_missing_mongo_indexes",
+    "find_mongo_index_failures",
+]
+
+# Databases that belong to the server rather than the api
+SYSTEM_DATABASES = ["admin", "config", "local"]
+
+
+def _user_databases(client: MongoClient) -> List[Database]:
+    return [
+        client.get_database(name)
+        for name in client.list_database_names()
+        if name not in SYSTEM_DATABASES
+    ]
+
+
+def ensure_all_mongo_indexes(client: MongoClient) -> List[Tuple[str, str]]:
+    """
+    Create the registered indexes of every collection that already exists,
+    including those whose creation failed recently.
+    Returns the database and collection names whose indexes could not be created.
+    """
+    failed: List[Tuple[str, str]] = []
+    for database in _user_databases(client):
+        for collection in database.list_collection_names():
+            if not ensure_mongo_indexes(database, collection, force=True):
+                failed.append((database.name, collection))
+    return failed
+
+
+def find_missing_mongo_indexes(
+    client: MongoClient,
+) -> List[Tuple[str, str, IndexSpec]]:
+    """Find the registered indexes that do not exist on the server."""
+    missing: List[Tuple[str, str, IndexSpec]] = []
+    for database in _user_databases(client):
+        for collection in database.list_collection_names():
+            if collection not in COLLECTION_INDEXES:
+                continue
+            existing = {
+                (tuple(field for field, _ in info["key"]), bool(info.get("unique")))
+                for info in database.get_collection(collection)
+                .index_information()
+                .values()
+            }
+            for spec in COLLECTION_INDEXES[collection]:
+                if (spec.fields, spec.unique) not in existing:
+                    missing.append((database.name, collection, spec))
+    return missing
+
+
+def find_mongo_index_failures(client: MongoClient) -> List[Tuple[str, Dict[str, Any]]]:
+    """Find the index creations that failed and have not succeeded since."""
+    failures: List[Tuple[str, Dict[str, Any]]] = []
+    for database in _user_databases(client):
+        if INDEX_FAILURE_COLLECTION not in database.list_collection_names():
+            continue
+        for failure in database.get_collection(INDEX_FAILURE_COLLECTION).find(
+            {}, {"_id": False}
+        ):
+            failures.append((database.name, failure))
+    return failures
+
+
+if __name__ == "__main__":
+    # Report the missing indexes, e.g. `python -m app.core.indexes`.
+    # Pass `--create` to create them.
+    import argparse
+
+    from .repository import get_mongo_client
+
+    parser = argparse.ArgumentParser(
+        description="Report registered mongo indexes that are missing"
+    )
+    parser.add_argument(
+        "--create",
+        action="store_true",
+        help="Create the missing indexes",
+    )
+    args = parser.parse_args()
+
+    mongo_client = get_mongo_client(Settings())
+    for database_name, failure in find_mongo_index_failures(mongo_client):
+        print(
+            f"{database_name}.{failure['collection']}: index creation failed "
+            f"{failure['attempts']} times, last at {failure['failed_at']} "
+            f"(retry after {failure['retry_seconds']:.0f}s): {failure['error']}"
+        )
+    missing_indexes = find_missing_mongo_indexes(mongo_client)
+    for database_name, collection_name, index in missing_indexes:
+        unique = " unique" if index.unique else ""
+        print(
+            f"{database_name}.{collection_name}: missing{unique} index {index.fields}"
+        )
+    if args.create:
+        failed_collections = ensure_all_mongo_indexes(mongo_client)
+        for database_name, collection_name in failed_collections:
+            print(f"{database_name}.{collection_name}: could not create indexes")
+        remaining_indexes = find_missing_mongo_indexes(mongo_client)
+        print(
+            f"created {len(missing_indexes) - len(remaining_indexes)} indexes, "
+            f"{len(remaining_indexes)} still missing"
+        )
+        if failed_collections or remaining_indexes:
+            sys.exit(1)
+    elif missing_indexes:
+        sys.exit(1)
+    else:
+        print("all indexes exist")
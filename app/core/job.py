@@ -0,0 +1,324 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from threading import Event, Lock, Thread
+from uuid import uuid4
+import json
+import os
+import socket
+import sys
+
+from fastapi import HTTPException, status
+
+from .client import get_client_id
+from .repository import get_repository, DataCollection
+from .settings import Settings
+from ..api.v1.models import Job, JobKind, JobState
+
+__all__ = [
+    "JOB_OWNER",
+    "JobHandler",
+    "job_from_query",
+    "register_job_handler",
+    "get_job",
+    "submit_job",
+    "claim_job",
+    "renew_job_lease",
+    "finish_job",
+    "resume_jobs",
+    "shutdown_job_workers",
+]
+
+# identifies the leases held by this process
+JOB_OWNER = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+
+JobHandler = Callable[[Job, Settings], None]
+
+logger = getLogger(__name__)
+
+_job_handlers: Dict[JobKind, JobHandler] = {}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_monitor_stop = Event()
+_monitor: Optional[Thread] = None
+_executor_lock = Lock()
+
+# the jobs running in this process, whose leases the monitor renews
+_active_jobs: Set[str] = set()
+_active_jobs_lock = Lock()
+
+
+def job_from_query(query_result: Any) -> Job:
+    return Job(**query_result)
+
+
+def register_job_handler(kind: JobKind, handler: JobHandler) -> None:
+    """Set the function that runs the jobs of a kind.  A job is done when it returns."""
+    _job_handlers[kind] = handler
+
+
+def get_job(job_id: str, settings: Settings = Settings()) -> Job:
+    try:
+        with get_repository(
+            get_client_id(), DataCollection.JOB, settings
+        ) as repository:
+            query_result = repository.get({"job_id": job_id})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find job {job_id}",
+                )
+            return job_from_query(query_result)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{job_id} not found",
+        ) from error
+
+
+def submit_job(
+    kind: JobKind,
+    election_id: str,
+    tally_name: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    settings: Settings = Settings(),
+) -> Job:
+    """Store a queued job and run it on the job workers of this process."""
+    now = _now()
+    job = Job(
+        job_id=str(uuid4()),
+        kind=kind,
+        election_id=election_id,
+        tally_name=tally_name,
+        parameters=parameters or {},
+        created=now,
+        updated=now,
+    )
+    try:
+        with get_repository(
+            get_client_id(), DataCollection.JOB, settings
+        ) as repository:
+            repository.set(_job_document(job))
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="submit job failed",
+        ) from error
+    _get_job_executor(settings).submit(_run_job, job.job_id, settings)
+    return job
+
+
+def claim_job(job_id: str, settings: Settings = Settings()) -> Optional[Job]:
+    """
+    Lease a queued job, or a processing job whose lease expired, to this process.
+    The claim only succeeds if the version is unchanged, so one process claims it.
+    Returns None if the job is not claimable or another process claimed it first.
+    A job that was already attempted JOB_MAX_ATTEMPTS times fails instead.
+    """
+    with get_repository(get_client_id(), DataCollection.JOB, settings) as repository:
+        query_result = repository.get({"job_id": job_id})
+        if not query_result:
+            return None
+        job = job_from_query(query_result)
+        if not _is_claimable(job, _now()):
+            return None
+        now = _now()
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            fields: Dict[str, Any] = {
+                "state": JobState.ERROR,
+                "version": job.version + 1,
+                "updated": now,
+                "lease_owner": None,
+                "lease_expires": None,
+                "error": f"stopped after {job.attempts} attempts",
+            }
+        else:
+            fields = {
+                "state": JobState.PROCESSING,
+                "version": job.version + 1,
+                "attempts": job.attempts + 1,
+                "updated": now,
+                "lease_owner": JOB_OWNER,
+                "lease_expires": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            }
+        claimed = job.copy(update=fields)
+        if not repository.update(
+            {"job_id": job_id, "version": job.version}, _job_document(claimed)
+        ):
+            return None
+        return claimed if claimed.state == JobState.PROCESSING else None
+
+
+def renew_job_lease(job_id: str, settings: Settings = Settings()) -> bool:
+    """Extend the lease of a job this process is running.  Returns False if it was lost."""
+    now = _now()
+    with get_repository(get_client_id(), DataCollection.JOB, settings) as repository:
+        return bool(
+            repository.update(
+                {
+                    "job_id": job_id,
+                    "state": JobState.PROCESSING.value,
+                    "lease_owner": JOB_OWNER,
+                },
+                {
+                    "updated": now.isoformat(),
+                    "lease_expires": (
+                        now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                    ).isoformat(),
+                },
+            )
+        )
+
+
+def finish_job(
+    job: Job,
+    state: JobState,
+    error: Optional[str] = None,
+    settings: Settings = Settings(),
+) -> None:
+    """Record the outcome of a job this process is running and release its lease."""
+    fields: Dict[str, Any] = {
+        "state": state,
+        "updated": _now(),
+        "lease_owner": None,
+        "lease_expires": None,
+        "error": error,
+    }
+    with get_repository(get_client_id(), DataCollection.JOB, settings) as repository:
+        if not repository.update(
+            {"job_id": job.job_id, "lease_owner": JOB_OWNER},
+            _job_document(job.copy(update=fields)),
+        ):
+            logger.warning(f"job {job.job_id} was claimed by another process")
+
+
+def resume_jobs(settings: Settings = Settings()) -> int:
+    """
+    Run the queued jobs and the processing jobs whose lease expired,
+    e.g. because the process running them stopped.
+    Only jobs of the kinds with a registered handler are resumed.
+    Returns the number of jobs submitted to the job workers.
+    """
+    now = _now()
+    job_ids: List[str] = []
+    with get_repository(get_client_id(), DataCollection.JOB, settings) as repository:
+        for state in (JobState.QUEUED, JobState.PROCESSING):
+            for query_result in repository.find({"state": state.value}):
+                job = job_from_query(query_result)
+                if job.kind in _job_handlers and _is_claimable(job, now):
+                    job_ids.append(job.job_id)
+    with _active_jobs_lock:
+        job_ids = [job_id for job_id in job_ids if job_id not in _active_jobs]
+    executor = _get_job_executor(settings)
+    for job_id in job_ids:
+        logger.info(f"resuming job {job_id}")
+        executor.submit(_run_job, job_id, settings)
+    return len(job_ids)
+
+
+def shutdown_job_workers() -> None:
+    """
+    Stop the job workers once the running jobs finish.  Call once when the app shuts down.
+    Jobs that have not started stay queued and are resumed by another process.
+    """
+    global _executor, _monitor  # pylint: disable=global-statement
+    _monitor_stop.set()
+    with _executor_lock:
+        monitor, _monitor = _monitor, None
+    if monitor is not None:
+        monitor.join()
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    _monitor_stop.clear()
+
+
+def _get_job_executor(settings: Settings) -> ThreadPoolExecutor:
+    """
+    Get the bounded pool the jobs run on, apart from the threads serving requests,
+    and start the monitor that renews the leases of the running jobs.
+    """
+    global _executor, _monitor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.JOB_WORKER_COUNT, thread_name_prefix="job"
+            )
+            _monitor = Thread(
+                target=_monitor_jobs, args=(settings,), name="job-monitor", daemon=True
+            )
+            _monitor.start()
+        return _executor
+
+
+def _monitor_jobs(settings: Settings) -> None:
+    """
+    Renew the leases of the running jobs well before they expire,
+    and resume the jobs of other processes once their leases expire.
+    """
+    renewals = 0
+    while not _monitor_stop.wait(settings.JOB_LEASE_SECONDS / 3):
+        with _active_jobs_lock:
+            job_ids = list(_active_jobs)
+        for job_id in job_ids:
+            try:
+                if not renew_job_lease(job_id, settings):
+                    logger.warning(f"lost the lease of job {job_id}")
+            except Exception:  # pylint: disable=broad-except
+                print(sys.exc_info())
+        renewals += 1
+        if renewals % 3 == 0 and not _monitor_stop.is_set():
+            try:
+                resume_jobs(settings)
+            except Exception:  # pylint: disable=broad-except
+                print(sys.exc_info())
+
+
+def _run_job(job_id: str, settings: Settings) -> None:
+    try:
+        job = claim_job(job_id, settings)
+    except Exception:  # pylint: disable=broad-except
+        # the job stays claimable, so it is resumed later
+        print(sys.exc_info())
+        return
+    if job is None:
+        return
+
+    logger.info(f"running {job.kind.value} job {job_id} attempt {job.attempts}")
+    with _active_jobs_lock:
+        _active_jobs.add(job_id)
+    try:
+        _job_handlers[job.kind](job, settings)
+        finish_job(job, JobState.COMPLETE, None, settings)
+    except HTTPException as error:
+        print(sys.exc_info())
+        finish_job(job, JobState.ERROR, str(error.detail), settings)
+    except Exception as error:  # pylint: disable=broad-except
+        print(sys.exc_info())
+        finish_job(job, JobState.ERROR, str(error), settings)
+    finally:
+        with _active_jobs_lock:
+            _active_jobs.discard(job_id)
+
+
+def _now() -> datetime:
+    # leases are compared across processes, so they are in utc
+    return datetime.now(timezone.utc)
+
+
+def _is_claimable(job: Job, now: datetime) -> bool:
+    if job.state == JobState.QUEUED:
+        return True
+    return job.state == JobState.PROCESSING and (
+        job.lease_expires is None or job.lease_expires < now
+    )
+
+
+def _job_document(job: Job) -> Dict[str, Any]:
+    # dates are stored as iso strings, which every storage mode can encode
+    document: Dict[str, Any] = json.loads(job.json())
+    return document
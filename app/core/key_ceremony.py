@@ -2,6 +2,7 @@ from typing import Any
 import sys
 from fastapi import HTTPException, status
 
+from .cache import CacheName, LruCache, get_cache
 from .client import get_client_id
 from .repository import get_repository, DataCollection
 from .settings import Settings
@@ -36,6 +37,10 @@ def key_ceremony_from_query(query_result: Any) -> KeyCeremony:
 
 
 def get_key_ceremony(key_name: str, settings: Settings = Settings()) -> KeyCeremony:
+    cache: LruCache[KeyCeremony] = get_cache(CacheName.KEY_CEREMONY, settings)
+    cached_ceremony = cache.get((get_client_id(), key_name))
+    if cached_ceremony is not None:
+        return cached_ceremony.copy()
     try:
         with get_repository(
             get_client_id(), DataCollection.KEY_CEREMONY, settings
@@ -47,7 +52,10 @@ def get_key_ceremony(key_name: str, settings: Settings = Settings()) -> KeyCerem
                     detail=f"Could not find key ceremony {key_name}",
                 )
             key_ceremony = key_ceremony_from_query(query_result)
-            return key_ceremony
+            # only published ceremonies are cached, since guardians update open ones
+            if key_ceremony.elgamal_public_key is not None:
+                cache.set((get_client_id(), key_name), key_ceremony)
+            return key_ceremony.copy()
     except Exception as error:
         print(sys.exc_info())
         raise HTTPException(
@@ -70,6 +78,9 @@ def update_key_ceremony(
                     detail=f"Could not find key ceremony {key_name}",
                 )
             repository.update({"key_name": key_name}, ceremony.dict())
+            get_cache(CacheName.KEY_CEREMONY, settings).invalidate(
+                (get_client_id(), key_name)
+            )
             return BaseResponse()
     except Exception as error:
         print(sys.exc_info())
@@ -96,6 +107,9 @@ def update_key_ceremony_state(
             key_ceremony.state = new_state
 
             repository.update({"key_name": key_name}, key_ceremony.dict())
+            get_cache(CacheName.KEY_CEREMONY, settings).invalidate(
+                (get_client_id(), key_name)
+            )
             return BaseResponse()
     except Exception as error:
         print(sys.exc_info())
@@ -8,6 +8,7 @@ from electionguard.serializable import read_json_object, write_json_object
 
 import electionguard.manifest
 
+from .cache import CacheName, LruCache, get_cache
 from .client import get_client_id
 from .repository import get_repository, DataCollection
 from .settings import Settings
@@ -34,6 +35,11 @@ def from_manifest_query(query_result: Any) -> Manifest:
 def get_manifest(
     manifest_hash: ElementModQ, settings: Settings = Settings()
 ) -> Manifest:
+    # manifests are addressed by their hash, so a cached manifest never changes
+    cache: LruCache[Manifest] = get_cache(CacheName.MANIFEST, settings)
+    cached_manifest = cache.get((get_client_id(), manifest_hash.to_hex()))
+    if cached_manifest is not None:
+        return cached_manifest.copy()
     try:
         with get_repository(
             get_client_id(), DataCollection.MANIFEST, settings
@@ -45,7 +51,9 @@ def get_manifest(
                     detail=f"Could not find manifest {manifest_hash.to_hex()}",
                 )
 
-            return from_manifest_query(query_result)
+            manifest = from_manifest_query(query_result)
+            cache.set((get_client_id(), manifest_hash.to_hex()), manifest)
+            return manifest.copy()
     except Exception as error:
         print(sys.exc_info())
         raise HTTPException(
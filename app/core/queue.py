@@ -1,5 +1,20 @@
-from typing import Iterable, Any, Protocol
-from queue import SimpleQueue
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+)
+from collections import deque
+from itertools import count
+from queue import Empty, SimpleQueue
+from threading import Lock
+from time import monotonic
 
 import sys
 import pika
@@ -7,12 +22,33 @@ import pika
 from .settings import Settings, QueueMode
 
 __all__ = [
+    "QueueMessage",
     "IMessageQueue",
     "MemoryMessageQueue",
     "RabbitMQMessageQueue",
     "get_message_queue",
+    "close_rabbitmq_connections",
 ]
 
+# How long subscribe waits for more messages before deciding the queue is empty
+SUBSCRIBE_IDLE_SECONDS = 0.1
+
+# Messages survive a broker restart
+PERSISTENT = pika.BasicProperties(delivery_mode=2)
+
+# the reply code of a channel the broker closed because a declaration did not match
+PRECONDITION_FAILED = 406
+
+# The most messages published ahead of the broker confirming them
+PUBLISH_CONFIRM_WINDOW = 1000
+
+
+class QueueMessage(NamedTuple):
+    """A received message, held by the queue until it is acknowledged."""
+
+    body: str
+    delivery_tag: Any
+
 
 class IMessageQueue(Protocol):
     def __enter__(self) -> Any:
@@ -23,79 +59,405 @@ class IMessageQueue(Protocol):
 
     def publish(self, body: str) -> Any:
         """
-        Get an item from the container
+        Publish a message to the queue
+        """
+
+    def publish_many(self, bodies: Iterable[str]) -> Any:
+        """
+        Publish a batch of messages to the queue
         """
 
     def subscribe(self) -> Iterable[Any]:
         """
-        Set and item in the container
+        Remove and yield the messages in the queue
+        """
+
+    def receive(self, max_count: int, timeout_seconds: float = 0) -> List[QueueMessage]:
+        """
+        Receive up to max_count messages, waiting up to the timeout for the first.
+        Received messages are redelivered unless they are acknowledged.
+        """
+
+    def ack(self, messages: Sequence[QueueMessage]) -> None:
+        """
+        Acknowledge received messages so they are removed from the queue
+        """
+
+    def reject(self, messages: Sequence[QueueMessage], requeue: bool = True) -> None:
+        """
+        Return received messages to the queue, or drop them
         """
 
 
+# Memory queues are shared by name within the process,
+# so a publisher and a consumer of the same queue see the same messages
+_memory_queues: Dict[str, "SimpleQueue[str]"] = {}
+_memory_queues_lock = Lock()
+_delivery_tags = count(1)
+
+
 class MemoryMessageQueue(IMessageQueue):
     def __init__(self, queue: str, topic: str):
         super().__init__()
-        self._storage: SimpleQueue = SimpleQueue()
+        with _memory_queues_lock:
+            self._storage = _memory_queues.setdefault(queue, SimpleQueue())
         self._queue = queue
         self._topic = topic
+        self._unacked: Dict[int, str] = {}
 
     def __enter__(self) -> Any:
         return self
 
     def __exit__(self, exc_type: Any, exc_value: Any, exc_traceback: Any) -> None:
-        pass
+        # like a closed connection, redeliver what was received but not acknowledged
+        for body in self._unacked.values():
+            self._storage.put_nowait(body)
+        self._unacked.clear()
 
     def publish(self, body: str) -> None:
         print("MemoryMessageQueue: publish")
         self._storage.put_nowait(body)
 
+    def publish_many(self, bodies: Iterable[str]) -> None:
+        for body in bodies:
+            self._storage.put_nowait(body)
+
     def subscribe(self) -> Iterable[Any]:
         while self._storage.qsize() > 0:
             item = self._storage.get_nowait()
             print("MemoryMessageQueue: subscribe")
             yield item
 
+    def receive(self, max_count: int, timeout_seconds: float = 0) -> List[QueueMessage]:
+        messages: List[QueueMessage] = []
+        try:
+            body = (
+                self._storage.get(timeout=timeout_seconds)
+                if timeout_seconds > 0
+                else self._storage.get_nowait()
+            )
+            while True:
+                delivery_tag = next(_delivery_tags)
+                self._unacked[delivery_tag] = body
+                messages.append(QueueMessage(body, delivery_tag))
+                if len(messages) >= max_count:
+                    break
+                body = self._storage.get_nowait()
+        except Empty:
+            pass
+        return messages
+
+    def ack(self, messages: Sequence[QueueMessage]) -> None:
+        for message in messages:
+            self._unacked.pop(message.delivery_tag, None)
+
+    def reject(self, messages: Sequence[QueueMessage], requeue: bool = True) -> None:
+        for message in messages:
+            body = self._unacked.pop(message.delivery_tag, None)
+            if requeue and body is not None:
+                self._storage.put_nowait(body)
+
+
+class _PublisherConfirms:
+    """The messages published on a confirm channel that the broker has yet to confirm."""
+
+    def __init__(self) -> None:
+        # the broker numbers the messages published on a channel from 1
+        self.next_delivery_tag = 1
+        self.pending: Set[int] = set()
+        self.nacked = 0
+        self.returned = 0
+
+    def published(self) -> None:
+        self.pending.add(self.next_delivery_tag)
+        self.next_delivery_tag += 1
+
+    def on_confirm(self, frame: Any) -> None:
+        method = frame.method
+        if method.multiple:
+            settled = {tag for tag in self.pending if tag <= method.delivery_tag}
+        else:
+            settled = self.pending & {method.delivery_tag}
+        self.pending -= settled
+        if isinstance(method, pika.spec.Basic.Nack):
+            self.nacked += len(settled)
+
+    def on_return(self, *_: Any) -> None:
+        self.returned += 1
+
+
+class _RabbitMQConnection:
+    """A pooled connection with the long-lived channel used to publish on it."""
+
+    def __init__(self, params: pika.URLParameters):
+        self.connection = pika.BlockingConnection(params)
+        self._confirm_channel: Any = None
+        self._confirms = _PublisherConfirms()
+        self._declared_queues: Set[str] = set()
+
+    def declare(self, channel: Any, queue: str, durable: bool) -> None:
+        if queue not in self._declared_queues:
+            _declare_queue(channel, queue, durable)
+            self._declared_queues.add(queue)
+
+    def confirm_channel(self, queue: str, durable: bool) -> Any:
+        """A channel on which the broker confirms each message published."""
+        if self._confirm_channel is None or not self._confirm_channel.is_open:
+            channel = self.connection.channel()
+            # the blocking channel waits for each confirm in turn,
+            # so the confirms are tracked on the channel beneath it instead
+            self._confirms = _PublisherConfirms()
+            selected: List[Any] = []
+            channel._impl.confirm_delivery(
+                ack_nack_callback=self._confirms.on_confirm, callback=selected.append
+            )
+            channel._impl.add_on_return_callback(self._confirms.on_return)
+            while not selected:
+                self.connection.process_data_events(time_limit=None)
+            self._confirm_channel = channel
+        self.declare(self._confirm_channel, queue, durable)
+        return self._confirm_channel
+
+    def publish_confirmed(
+        self,
+        queue: str,
+        durable: bool,
+        topic: str,
+        bodies: Iterable[str],
+        properties: Optional[pika.BasicProperties],
+    ) -> None:
+        """
+        Publish messages on the confirm channel, returning once the broker
+        has confirmed all of them.  At most `PUBLISH_CONFIRM_WINDOW` messages
+        are published ahead of their confirms.
+        """
+        channel = self.confirm_channel(queue, durable)
+        confirms = self._confirms
+        confirms.nacked = confirms.returned = 0
+        for body in bodies:
+            channel._impl.basic_publish(
+                exchange="",
+                routing_key=topic,
+                body=body,
+                properties=properties,
+                mandatory=True,
+            )
+            confirms.published()
+            if len(confirms.pending) >= PUBLISH_CONFIRM_WINDOW:
+                self._wait_for_confirms(channel, PUBLISH_CONFIRM_WINDOW // 2)
+        self._wait_for_confirms(channel, 0)
+        if confirms.nacked:
+            raise pika.exceptions.NackError([])
+        if confirms.returned:
+            # e.g. the queue was deleted, so there was nowhere to route the messages
+            raise pika.exceptions.UnroutableError([])
+
+    def _wait_for_confirms(self, channel: Any, max_pending: int) -> None:
+        while len(self._confirms.pending) > max_pending:
+            if not channel.is_open:
+                raise pika.exceptions.ChannelWrongStateError(
+                    "the channel closed before the broker confirmed its messages"
+                )
+            self.connection.process_data_events(time_limit=None)
+
+
+def _declare_queue(channel: Any, queue: str, durable: bool) -> None:
+    """
+    Declare a queue, explaining the broker's refusal to declare
+    an existing queue with another durability.
+    """
+    try:
+        channel.queue_declare(queue=queue, durable=durable)
+    except pika.exceptions.ChannelClosedByBroker as error:
+        if error.reply_code == PRECONDITION_FAILED:
+            raise RuntimeError(
+                f"queue {queue} exists with another durability than durable={durable}, "
+                "set MESSAGEQUEUE_DURABLE to match it or delete the queue"
+            ) from error
+        raise
+
+
+_rabbitmq_connections: Dict[str, "SimpleQueue[_RabbitMQConnection]"] = {}
+_rabbitmq_lock = Lock()
+
+
+def _get_rabbitmq_connection(uri: str) -> _RabbitMQConnection:
+    """Get an idle connection from the process-wide pool or open a new one."""
+    with _rabbitmq_lock:
+        pool = _rabbitmq_connections.setdefault(uri, SimpleQueue())
+    while True:
+        try:
+            connection = pool.get_nowait()
+        except Empty:
+            return _RabbitMQConnection(pika.URLParameters(uri))
+        try:
+            # answer heartbeats missed while idle, and find connections the broker closed
+            connection.connection.process_data_events(time_limit=0)
+            return connection
+        except pika.exceptions.AMQPError:
+            continue
+
+
+def _release_rabbitmq_connection(uri: str, connection: _RabbitMQConnection) -> None:
+    if not connection.connection.is_open:
+        return
+    with _rabbitmq_lock:
+        pool = _rabbitmq_connections.setdefault(uri, SimpleQueue())
+    pool.put_nowait(connection)
+
+
+def close_rabbitmq_connections() -> None:
+    """Close all of the pooled connections.  Call once when the app shuts down."""
+    with _rabbitmq_lock:
+        for pool in _rabbitmq_connections.values():
+            while not pool.empty():
+                connection = pool.get_nowait().connection
+                if connection.is_open:
+                    connection.close()
+        _rabbitmq_connections.clear()
+
 
 class RabbitMQMessageQueue(IMessageQueue):
-    def __init__(self, uri: str, queue: str, topic: str):
+    """
+    A queue on a RabbitMQ broker, using a connection from a process-wide pool.
+
+    Messages are published on long-lived channels and consumed with `basic_consume`,
+    so the broker pushes up to the prefetch count of unacknowledged messages ahead.
+    Durable queues are published to with persistent messages.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        queue: str,
+        topic: str,
+        prefetch_count: int = 100,
+        durable: bool = False,
+    ):
         super().__init__()
+        self._uri = uri
         self._queue = queue
         self._topic = topic
-        self._params = pika.URLParameters(uri)
-        self._client: pika.BlockingConnection = None
+        self._prefetch_count = prefetch_count
+        self._durable = durable
+        self._properties = PERSISTENT if durable else None
+        self._connection: Optional[_RabbitMQConnection] = None
+        self._consumer_channel: Any = None
+        self._deliveries: Deque[QueueMessage] = deque()
+        self._unacked: Set[int] = set()
 
     def __enter__(self) -> Any:
-        self._client = pika.BlockingConnection(self._params)
+        self._connection = _get_rabbitmq_connection(self._uri)
         return self
 
     def __exit__(self, exc_type: Any, exc_value: Any, exc_traceback: Any) -> None:
-        self._client.close()
+        try:
+            if self._consumer_channel is not None and self._consumer_channel.is_open:
+                # unacknowledged messages are redelivered when the channel closes
+                self._consumer_channel.close()
+        except pika.exceptions.AMQPError:
+            print(sys.exc_info())
+        self._consumer_channel = None
+        self._deliveries.clear()
+        self._unacked.clear()
+        if self._connection is not None:
+            _release_rabbitmq_connection(self._uri, self._connection)
+            self._connection = None
+
+    @property
+    def _pooled(self) -> _RabbitMQConnection:
+        if self._connection is None:
+            raise RuntimeError("RabbitMQMessageQueue must be used in a with block")
+        return self._connection
 
     def publish(self, body: str) -> None:
+        """Publish a message, returning once the broker confirms it."""
+        self.publish_many([body])
+
+    def publish_many(self, bodies: Iterable[str]) -> None:
+        """
+        Publish messages on the confirm channel,
+        returning once the broker has confirmed all of them.
+        """
         try:
-            channel = self._client.channel()
-            channel.queue_declare(queue=self._queue)
-            channel.basic_publish(
-                exchange="",
-                routing_key=self._topic,
-                body=body,
+            self._pooled.publish_confirmed(
+                self._queue, self._durable, self._topic, bodies, self._properties
             )
-            channel.close()
-        except (pika.exceptions.ChannelError, pika.exceptions.StreamLostError):
+        except pika.exceptions.AMQPError:
             print(sys.exc_info())
+            raise
 
     def subscribe(self) -> Iterable[Any]:
-        channel = self._client.channel()
-        data = channel.basic_get(self._topic, True)
-        while data[0]:
-            yield data[2]
-            data = channel.basic_get(self._topic, True)
-        channel.close()
+        """Yield the messages in the queue, acknowledging each once it is processed."""
+        while True:
+            messages = self.receive(self._prefetch_count, SUBSCRIBE_IDLE_SECONDS)
+            if not messages:
+                return
+            for message in messages:
+                yield message.body
+                self.ack([message])
+
+    def receive(self, max_count: int, timeout_seconds: float = 0) -> List[QueueMessage]:
+        self._start_consuming()
+        deadline = monotonic() + timeout_seconds
+        while not self._deliveries:
+            remaining = deadline - monotonic()
+            self._pooled.connection.process_data_events(time_limit=max(0.0, remaining))
+            if remaining <= 0:
+                break
+        messages: List[QueueMessage] = []
+        while self._deliveries and len(messages) < max_count:
+            messages.append(self._deliveries.popleft())
+        return messages
+
+    def ack(self, messages: Sequence[QueueMessage]) -> None:
+        if not messages:
+            return
+        tags = {message.delivery_tag for message in messages}
+        last_tag = max(tags)
+        if all(tag in tags for tag in self._unacked if tag <= last_tag):
+            # every outstanding message up to the last one is acknowledged in one frame
+            self._consumer_channel.basic_ack(delivery_tag=last_tag, multiple=True)
+            self._unacked = {tag for tag in self._unacked if tag > last_tag}
+            return
+        for tag in tags:
+            self._consumer_channel.basic_ack(delivery_tag=tag)
+            self._unacked.discard(tag)
+
+    def reject(self, messages: Sequence[QueueMessage], requeue: bool = True) -> None:
+        for message in messages:
+            self._consumer_channel.basic_nack(
+                delivery_tag=message.delivery_tag, requeue=requeue
+            )
+            self._unacked.discard(message.delivery_tag)
+
+    def _start_consuming(self) -> None:
+        if self._consumer_channel is not None:
+            return
+        channel = self._pooled.connection.channel()
+        _declare_queue(channel, self._queue, self._durable)
+        channel.basic_qos(prefetch_count=self._prefetch_count)
+        channel.basic_consume(
+            queue=self._topic, on_message_callback=self._on_message, auto_ack=False
+        )
+        self._consumer_channel = channel
+
+    def _on_message(
+        self, _channel: Any, method: Any, _properties: Any, body: bytes
+    ) -> None:
+        self._unacked.add(method.delivery_tag)
+        self._deliveries.append(QueueMessage(body.decode(), method.delivery_tag))
 
 
 def get_message_queue(
     queue: str, topic: str, settings: Settings = Settings()
 ) -> IMessageQueue:
     if settings.QUEUE_MODE == QueueMode.REMOTE:
-        return RabbitMQMessageQueue(settings.MESSAGEQUEUE_URI, queue, topic)
+        return RabbitMQMessageQueue(
+            settings.MESSAGEQUEUE_URI,
+            queue,
+            topic,
+            settings.MESSAGEQUEUE_PREFETCH_COUNT,
+            settings.MESSAGEQUEUE_DURABLE,
+        )
     return MemoryMessageQueue(queue, topic)
@@ -1,29 +1,69 @@
-from typing import Any, List, Union
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 from collections.abc import MutableMapping
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging import getLogger
+from queue import Empty, SimpleQueue
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
 
-import mmap
+import fcntl
 import os
 import json
-import re
+import sqlite3
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, IndexModel, MongoClient
 from pymongo.database import Database
-
-from electionguard.hash import hash_elems
+from pymongo.errors import BulkWriteError, OperationFailure
+import pymongo.errors
 
 from .settings import Settings, StorageMode
 
 __all__ = [
     "IRepository",
+    "DuplicateKeyError",
+    "INDEXED_FIELDS",
+    "IndexSpec",
+    "COLLECTION_INDEXES",
+    "INDEX_FAILURE_COLLECTION",
+    "ensure_mongo_indexes",
+    "ensure_mongo_indexes_async",
+    "LocalIndex",
     "LocalRepository",
     "MongoRepository",
+    "SqliteRepository",
+    "get_mongo_client",
+    "close_mongo_clients",
+    "close_sqlite_connections",
     "get_repository",
 ]
 
+logger = getLogger(__name__)
 
 DOCUMENT_VALUE_TYPE = Union[MutableMapping, List[MutableMapping]]
 
+# The dotted paths of the fields to return, like a mongo inclusion projection
+PROJECTION_TYPE = Optional[List[str]]
+
+
+class DuplicateKeyError(Exception):
+    """A document has the same value as a stored document for a unique field."""
+
 
 class IRepository(ABC):
     def __enter__(self) -> Any:
@@ -33,13 +73,19 @@ class IRepository(ABC):
         pass
 
     @abstractmethod
-    def find(self, filter: MutableMapping, skip: int = 0, limit: int = 0) -> Any:
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> Any:
         """
         Find items matching the filter
         """
 
     @abstractmethod
-    def get(self, filter: MutableMapping) -> Any:
+    def get(self, filter: MutableMapping, projection: PROJECTION_TYPE = None) -> Any:
         """
         Get an item from the container
         """
@@ -50,12 +96,26 @@ class IRepository(ABC):
         Set and item in the container
         """
 
+    @abstractmethod
+    def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        """
+        Set each item independently, skipping the items that repeat a unique field.
+        Returns the positions of the skipped items.
+        """
+
     @abstractmethod
     def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
         """
         Update an item
         """
 
+    @abstractmethod
+    def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        """
+        Atomically add to numeric fields of an item,
+        creating the item from the filter if it does not exist
+        """
+
 
 class DataCollection:
     AUTHENTICATION = "authenticationContext"
@@ -65,15 +125,530 @@ class DataCollection:
     ELECTION = "election"
     MANIFEST = "manifest"
     BALLOT_INVENTORY = "ballotInventory"
+    BALLOT_CODE = "ballotCodes"
+    BALLOT_SUBMISSION = "ballotSubmissions"
+    BALLOT_SUBMISSION_RECEIPT = "ballotSubmissionReceipts"
     SUBMITTED_BALLOT = "submittedBallots"
     CIPHERTEXT_TALLY = "ciphertextTally"
+    CIPHERTEXT_TALLY_PROGRESS = "ciphertextTallyProgress"
+    CIPHERTEXT_TALLY_SHARD = "ciphertextTallyShards"
+    RUNNING_TALLY = "runningTally"
     PLAINTEXT_TALLY = "plaintextTally"
     DECRYPTION_SHARES = "decryptionShares"
+    JOB = "jobs"
     USER_INFO = "userInfo"
 
 
+# The fields each collection is queried by
+INDEXED_FIELDS: Dict[str, List[str]] = {
+    DataCollection.AUTHENTICATION: ["username"],
+    DataCollection.GUARDIAN: ["guardian_id"],
+    DataCollection.KEY_GUARDIAN: ["key_name", "guardian_id"],
+    DataCollection.KEY_CEREMONY: ["key_name"],
+    DataCollection.ELECTION: ["election_id"],
+    DataCollection.MANIFEST: ["manifest_hash"],
+    DataCollection.BALLOT_INVENTORY: ["election_id"],
+    DataCollection.BALLOT_CODE: ["code", "object_id", "state"],
+    DataCollection.BALLOT_SUBMISSION: ["tracking_id"],
+    DataCollection.BALLOT_SUBMISSION_RECEIPT: ["receipt_id"],
+    DataCollection.SUBMITTED_BALLOT: ["object_id", "state", "code"],
+    DataCollection.CIPHERTEXT_TALLY: ["election_id", "tally_name"],
+    DataCollection.CIPHERTEXT_TALLY_PROGRESS: ["election_id", "tally_name"],
+    DataCollection.CIPHERTEXT_TALLY_SHARD: ["shard_id", "tally_name"],
+    DataCollection.RUNNING_TALLY: ["election_id"],
+    DataCollection.PLAINTEXT_TALLY: ["election_id", "tally_name"],
+    DataCollection.DECRYPTION_SHARES: ["election_id", "tally_name", "guardian_id"],
+    DataCollection.JOB: ["job_id", "state"],
+    DataCollection.USER_INFO: ["username"],
+}
+
+
+class IndexSpec(NamedTuple):
+    """An ascending index over one or more fields of a collection."""
+
+    fields: Tuple[str, ...]
+    unique: bool = False
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(
+            [(field, ASCENDING) for field in self.fields], unique=self.unique
+        )
+
+
+# The indexes each collection needs to serve the queries in app.core
+COLLECTION_INDEXES: Dict[str, List[IndexSpec]] = {
+    DataCollection.AUTHENTICATION: [IndexSpec(("username",))],
+    DataCollection.GUARDIAN: [IndexSpec(("guardian_id",))],
+    DataCollection.KEY_GUARDIAN: [IndexSpec(("key_name", "guardian_id"))],
+    DataCollection.KEY_CEREMONY: [IndexSpec(("key_name",))],
+    DataCollection.ELECTION: [IndexSpec(("election_id",))],
+    DataCollection.MANIFEST: [IndexSpec(("manifest_hash",))],
+    DataCollection.BALLOT_INVENTORY: [IndexSpec(("election_id",))],
+    DataCollection.BALLOT_CODE: [
+        IndexSpec(("code",), unique=True),
+        IndexSpec(("object_id",), unique=True),
+        IndexSpec(("state",)),
+    ],
+    DataCollection.BALLOT_SUBMISSION: [IndexSpec(("tracking_id",), unique=True)],
+    DataCollection.BALLOT_SUBMISSION_RECEIPT: [IndexSpec(("receipt_id",), unique=True)],
+    DataCollection.SUBMITTED_BALLOT: [
+        IndexSpec(("object_id",), unique=True),
+        IndexSpec(("state",)),
+        IndexSpec(("code",)),
+    ],
+    DataCollection.CIPHERTEXT_TALLY: [IndexSpec(("election_id", "tally_name"))],
+    DataCollection.CIPHERTEXT_TALLY_PROGRESS: [
+        IndexSpec(("election_id", "tally_name"))
+    ],
+    DataCollection.CIPHERTEXT_TALLY_SHARD: [
+        IndexSpec(("shard_id",), unique=True),
+        IndexSpec(("tally_name",)),
+    ],
+    DataCollection.RUNNING_TALLY: [IndexSpec(("election_id",), unique=True)],
+    DataCollection.PLAINTEXT_TALLY: [IndexSpec(("election_id", "tally_name"))],
+    DataCollection.DECRYPTION_SHARES: [IndexSpec(("tally_name", "guardian_id"))],
+    DataCollection.JOB: [IndexSpec(("job_id",), unique=True), IndexSpec(("state",))],
+    DataCollection.USER_INFO: [IndexSpec(("username",))],
+}
+
+# The collection in each database where failed index creations are recorded
+INDEX_FAILURE_COLLECTION = "indexFailures"
+# wait this long before retrying a failed index creation, doubling on each failure
+INDEX_RETRY_MIN_SECONDS = 60.0
+INDEX_RETRY_MAX_SECONDS = 3600.0
+
+_ensured_indexes: Set[Tuple[str, str]] = set()
+# the number of consecutive failures and the time to retry, of each failed creation
+_failed_indexes: Dict[Tuple[str, str], Tuple[int, float]] = {}
+_ensured_indexes_lock = Lock()
+
+
+def _needs_indexes(database_name: str, collection: str) -> bool:
+    with _ensured_indexes_lock:
+        return (
+            collection in COLLECTION_INDEXES
+            and (database_name, collection) not in _ensured_indexes
+        )
+
+
+def _backing_off(database_name: str, collection: str) -> bool:
+    with _ensured_indexes_lock:
+        failure = _failed_indexes.get((database_name, collection))
+        return failure is not None and monotonic() < failure[1]
+
+
+def _mark_indexes_ensured(database_name: str, collection: str) -> None:
+    with _ensured_indexes_lock:
+        _ensured_indexes.add((database_name, collection))
+        _failed_indexes.pop((database_name, collection), None)
+
+
+def _mark_indexes_failed(
+    database_name: str, collection: str, error: Exception
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Back off from retrying a failed index creation.
+    Returns the filter and update that record the failure in the database.
+    """
+    with _ensured_indexes_lock:
+        attempts = _failed_indexes.get((database_name, collection), (0, 0.0))[0] + 1
+        retry_seconds = min(
+            INDEX_RETRY_MIN_SECONDS * 2 ** (attempts - 1), INDEX_RETRY_MAX_SECONDS
+        )
+        _failed_indexes[(database_name, collection)] = (
+            attempts,
+            monotonic() + retry_seconds,
+        )
+    logger.exception(
+        f"could not create indexes on {database_name}.{collection}, "
+        f"retrying in {retry_seconds:.0f} seconds"
+    )
+    return {"collection": collection}, {
+        "$set": {
+            "error": str(error),
+            "failed_at": datetime.now(timezone.utc),
+            "retry_seconds": retry_seconds,
+        },
+        "$inc": {"attempts": 1},
+    }
+
+
+def ensure_mongo_indexes(
+    database: Database, collection: str, force: bool = False
+) -> bool:
+    """
+    Create the registered indexes of a collection the first time
+    the process uses it.  Creating an existing index is a no-op.
+    Returns False if the creation failed.  The failure is recorded in the
+    database, and a later use retries it after a backoff, or at once if forced.
+    """
+    if not _needs_indexes(database.name, collection):
+        return True
+    if not force and _backing_off(database.name, collection):
+        return False
+    failures = database.get_collection(INDEX_FAILURE_COLLECTION)
+    try:
+        database.get_collection(collection).create_indexes(
+            [spec.to_model() for spec in COLLECTION_INDEXES[collection]]
+        )
+    except OperationFailure as error:
+        # e.g. existing duplicates prevent a unique index, which should not stop the api
+        try:
+            failures.update_one(
+                *_mark_indexes_failed(database.name, collection, error), upsert=True
+            )
+        except pymongo.errors.PyMongoError:
+            logger.exception(f"could not record the index failure of {collection}")
+        return False
+    _mark_indexes_ensured(database.name, collection)
+    try:
+        failures.delete_one({"collection": collection})
+    except pymongo.errors.PyMongoError:
+        logger.exception(f"could not clear the index failure of {collection}")
+    return True
+
+
+async def ensure_mongo_indexes_async(
+    database: Any, collection: str, force: bool = False
+) -> bool:
+    """Create the registered indexes of a collection using the async driver."""
+    if not _needs_indexes(database.name, collection):
+        return True
+    if not force and _backing_off(database.name, collection):
+        return False
+    failures = database.get_collection(INDEX_FAILURE_COLLECTION)
+    try:
+        await database.get_collection(collection).create_indexes(
+            [spec.to_model() for spec in COLLECTION_INDEXES[collection]]
+        )
+    except OperationFailure as error:
+        try:
+            await failures.update_one(
+                *_mark_indexes_failed(database.name, collection, error), upsert=True
+            )
+        except pymongo.errors.PyMongoError:
+            logger.exception(f"could not record the index failure of {collection}")
+        return False
+    _mark_indexes_ensured(database.name, collection)
+    try:
+        await failures.delete_one({"collection": collection})
+    except pymongo.errors.PyMongoError:
+        logger.exception(f"could not clear the index failure of {collection}")
+    return True
+
+
+LOCAL_INDEX_FILENAME = "_index.jsonl"
+LOCAL_LOCK_FILENAME = "_lock"
+LOCAL_SEGMENT_PREFIX = "segment-"
+LOCAL_SEGMENT_SUFFIX = ".jsonl"
+# start a new segment once the active one reaches this size
+LOCAL_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+# compact a sealed segment once less than this fraction of it is live
+LOCAL_SEGMENT_MIN_LIVE_RATIO = 0.5
+
+# A document is either stored in a legacy file of its own
+# or as a record at an offset and length in a segment
+LOCATION_TYPE = Union[str, List[Any]]
+
+
+def _unique_fields(collection: str) -> List[str]:
+    """Get the indexed fields of a collection that have a unique index of their own."""
+    return [
+        spec.fields[0]
+        for spec in COLLECTION_INDEXES.get(collection, [])
+        if spec.unique
+        and len(spec.fields) == 1
+        and spec.fields[0] in INDEXED_FIELDS.get(collection, [])
+    ]
+
+
+def _matches(document: MutableMapping, filter: MutableMapping) -> bool:
+    """Check a document against an equality filter.  Dotted keys address nested fields."""
+    for key, expected in filter.items():
+        value: Any = document
+        for part in key.split("."):
+            if not isinstance(value, MutableMapping) or part not in value:
+                return False
+            value = value[part]
+        if value != expected:
+            return False
+    return True
+
+
+def _project(document: MutableMapping, projection: PROJECTION_TYPE) -> MutableMapping:
+    """
+    Keep only the projected fields of a document.
+    Like mongo, a dotted path through an array applies to each document in the array.
+    """
+    if projection is None:
+        return document
+    projected: Dict[str, Any] = {}
+    for field in projection:
+        _project_path(document, field.split("."), projected)
+    return projected
+
+
+def _project_path(source: Any, parts: List[str], target: Dict[str, Any]) -> None:
+    head, rest = parts[0], parts[1:]
+    if not isinstance(source, MutableMapping) or head not in source:
+        return
+    value = source[head]
+    if not rest:
+        target[head] = value
+    elif isinstance(value, list):
+        items = [item for item in value if isinstance(item, MutableMapping)]
+        projected_items = target.setdefault(head, [{} for _ in items])
+        for item, projected_item in zip(items, projected_items):
+            _project_path(item, rest, projected_item)
+    elif isinstance(value, MutableMapping):
+        _project_path(value, rest, target.setdefault(head, {}))
+
+
+class LocalIndex:
+    """
+    A persistent index of document fields to storage keys for a local collection.
+
+    The index is an append-only log of json lines stored alongside the documents.
+    It records where each document is stored, the values of its indexed fields
+    and how far each segment has been indexed.
+    Each process keeps an in-memory view of the log and only reads the lines
+    appended since it last looked, so a lookup is a dictionary probe
+    rather than a scan of the collection.  The log is rewritten from that view
+    when segments are compacted, and can always be rebuilt from the documents.
+    """
+
+    def __init__(self, path: str, fields: List[str]):
+        self._path = path
+        self._fields = fields
+        self._lock = Lock()
+        self._inode = -1
+        self._offset = 0
+        self._indexed_fields: Optional[List[str]] = None
+        self._keys: Dict[str, Dict[str, str]] = {}
+        self._locations: Dict[str, LOCATION_TYPE] = {}
+        self._live_bytes: Dict[str, int] = {}
+        self._segment_sizes: Dict[str, int] = {}
+        self._values: Dict[str, Dict[str, Dict[str, None]]] = {}
+
+    def is_current(self, segment_sizes: Dict[str, int]) -> bool:
+        """
+        Check the index exists, was built for the configured fields
+        and covers every record of the segments on disk.
+        """
+        with self._lock:
+            self._refresh()
+            return self._indexed_fields == self._fields and all(
+                self._segment_sizes.get(segment) == size
+                for segment, size in segment_sizes.items()
+            )
+
+    def covers(self, filter: MutableMapping) -> bool:
+        """Check whether every field of the filter is indexed."""
+        return all(field in self._fields for field in filter)
+
+    def keys(self) -> List[str]:
+        """Get the keys of all indexed documents, in insertion order."""
+        with self._lock:
+            self._refresh()
+            return list(self._keys)
+
+    def location(self, key: str, refresh: bool = False) -> Optional[LOCATION_TYPE]:
+        """Get where a document is stored."""
+        with self._lock:
+            if refresh:
+                self._refresh()
+            return self._locations.get(key)
+
+    def live_bytes(self) -> Dict[str, int]:
+        """Get the number of bytes of each segment still referenced by the index."""
+        with self._lock:
+            self._refresh()
+            return dict(self._live_bytes)
+
+    def probe(self, filter: MutableMapping) -> Optional[List[str]]:
+        """
+        Get the keys of the documents that may match the filter, in insertion order.
+        Returns None when the filter does not include an indexed field.
+        """
+        terms = [
+            (field, _index_value(value))
+            for field, value in filter.items()
+            if field in self._fields
+        ]
+        if not terms:
+            return None
+        with self._lock:
+            self._refresh()
+            candidates = [
+                self._values.get(field, {}).get(value, {}) for field, value in terms
+            ]
+            smallest = min(candidates, key=len)
+            return [
+                key
+                for key in smallest
+                if all(key in candidate for candidate in candidates)
+            ]
+
+    def add(
+        self, documents: Iterable[Tuple[str, LOCATION_TYPE, MutableMapping]]
+    ) -> None:
+        """Index documents under their storage keys with a single append to the log."""
+        self._append([self._entry(*document) for document in documents])
+
+    def rebuild(
+        self,
+        documents: Iterable[Tuple[str, LOCATION_TYPE, MutableMapping]],
+        segment_sizes: Dict[str, int],
+    ) -> None:
+        """Replace the index with one built from the provided documents."""
+        self._replace(segment_sizes, (self._entry(*document) for document in documents))
+
+    def compact(self, segment_sizes: Dict[str, int]) -> None:
+        """Replace the log with one holding only the current entry of each document."""
+        with self._lock:
+            self._refresh()
+            entries = [
+                {
+                    "op": "set",
+                    "key": key,
+                    "location": self._locations[key],
+                    "fields": fields,
+                }
+                for key, fields in self._keys.items()
+            ]
+        self._replace(segment_sizes, entries)
+
+    def _replace(
+        self, segment_sizes: Dict[str, int], entries: Iterable[Dict[str, Any]]
+    ) -> None:
+        temp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"op": "fields", "fields": self._fields}))
+            file.write("\n")
+            file.write(json.dumps({"op": "segments", "sizes": segment_sizes}))
+            file.write("\n")
+            for entry in entries:
+                file.write(json.dumps(entry))
+                file.write("\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self._path)
+
+    def _entry(
+        self, key: str, location: LOCATION_TYPE, document: MutableMapping
+    ) -> Dict[str, Any]:
+        fields = {
+            field: _index_value(document[field])
+            for field in self._fields
+            if field in document
+        }
+        return {"op": "set", "key": key, "location": location, "fields": fields}
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _refresh(self) -> None:
+        """Read any lines appended to the log since the last refresh."""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            self._reset(-1)
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # the log was rebuilt, so start over
+            self._reset(stat.st_ino)
+        if stat.st_size == self._offset:
+            return
+        with open(self._path, "rb") as file:
+            file.seek(self._offset)
+            data = file.read()
+        # ignore a trailing line that is still being written
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line:
+                self._apply(json.loads(line))
+        self._offset += end
+
+    def _reset(self, inode: int) -> None:
+        self._inode = inode
+        self._offset = 0
+        self._indexed_fields = None
+        self._keys = {}
+        self._locations = {}
+        self._live_bytes = {}
+        self._segment_sizes = {}
+        self._values = {}
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "fields":
+            self._indexed_fields = entry["fields"]
+            return
+        if entry["op"] == "segments":
+            self._segment_sizes.update(entry["sizes"])
+            return
+        key = entry["key"]
+        self._remove(key)
+        if entry["op"] == "set":
+            location = entry["location"]
+            self._keys[key] = entry["fields"]
+            self._locations[key] = location
+            if isinstance(location, list):
+                segment, offset, length = location
+                self._live_bytes[segment] = self._live_bytes.get(segment, 0) + length
+                self._segment_sizes[segment] = max(
+                    self._segment_sizes.get(segment, 0), offset + length
+                )
+            for field, value in entry["fields"].items():
+                self._values.setdefault(field, {}).setdefault(value, {})[key] = None
+
+    def _remove(self, key: str) -> None:
+        fields = self._keys.pop(key, None)
+        location = self._locations.pop(key, None)
+        if isinstance(location, list):
+            segment, _, length = location
+            self._live_bytes[segment] -= length
+        if not fields:
+            return
+        for field, value in fields.items():
+            keys = self._values[field][value]
+            keys.pop(key, None)
+            if not keys:
+                del self._values[field][value]
+
+
+def _index_value(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+_local_indexes: Dict[str, LocalIndex] = {}
+_local_indexes_lock = Lock()
+
+
+def _get_local_index(storage: str, collection: str) -> LocalIndex:
+    """Get the process-wide view of the index for a local collection."""
+    with _local_indexes_lock:
+        index = _local_indexes.get(storage)
+        if index is None:
+            index = LocalIndex(
+                os.path.join(storage, LOCAL_INDEX_FILENAME),
+                INDEXED_FIELDS.get(collection, []),
+            )
+            _local_indexes[storage] = index
+        return index
+
+
 class LocalRepository(IRepository):
-    """A simple local storage interface.  For testing only."""
+    """
+    A simple local storage interface.
+
+    Documents are appended as json lines to segment files, so a bulk set is one
+    sequential write and one fsync.  An index log maps each document to its
+    segment offset, and segments that are mostly superseded by updates are compacted.
+    """
 
     def __init__(
         self,
@@ -87,104 +662,734 @@ class LocalRepository(IRepository):
         self._storage = os.path.join(
             os.getcwd(), "storage", self._container, self._collection
         )
+        self._index = _get_local_index(self._storage, self._collection)
+        self._unique_fields = _unique_fields(self._collection)
 
     def __enter__(self) -> Any:
         if not os.path.exists(self._storage):
             os.makedirs(self._storage)
+        if not self._index.is_current(self._segment_sizes()):
+            with self._locked():
+                if not self._index.is_current(self._segment_sizes()):
+                    self.rebuild_index()
         return self
 
     def __exit__(self, exc_type: Any, exc_value: Any, exc_traceback: Any) -> None:
         pass
 
-    def find(self, filter: MutableMapping, skip: int = 0, limit: int = 0) -> Any:
-        # TODO: implement a find function
-        pass
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> Iterator[MutableMapping]:
+        """
+        Lazily yield the documents matching an equality filter, in insertion order.
 
-    def get(self, filter: MutableMapping) -> Any:
-        """An inefficient search through all files in the directory."""
-        # query_string = json.dumps(dict(filter))
-        query_string = re.sub(r"\{|\}", r"", json.dumps(dict(filter)))
+        Candidates come from the index when the filter includes an indexed field,
+        otherwise every document is streamed and checked.  A limit of 0 is unlimited.
+        """
+        filter = filter or {}
+        keys = self._candidates(filter)
+        if self._index.covers(filter):
+            # the index matches exactly, so skip without reading the documents
+            keys = keys[skip:]
+            skip = 0
 
-        search_files = [
-            file
-            for file in os.listdir(self._storage)
-            if os.path.isfile(os.path.join(self._storage, file))
-        ]
+        returned = 0
+        for key in keys:
+            document = self._read(key)
+            if document is None or not _matches(document, filter):
+                continue
+            if skip > 0:
+                skip -= 1
+                continue
+            yield _project(document, projection)
+            returned += 1
+            if limit and returned >= limit:
+                return
 
-        for filename in search_files:
-            try:
-                with open(
-                    os.path.join(self._storage, filename), encoding="utf-8"
-                ) as file, mmap.mmap(
-                    file.fileno(), 0, access=mmap.ACCESS_READ
-                ) as search:
-                    if search.find(bytes(query_string, "utf-8")) != -1:
-                        json_string = file.read()
-                        return json.loads(json_string)
-            except FileNotFoundError:
-                # swallow errors
-                pass
-        return None
+    def get(self, filter: MutableMapping, projection: PROJECTION_TYPE = None) -> Any:
+        """Get the first document matching the filter, using the index when possible."""
+        return next(self.find(filter, limit=1, projection=projection), None)
 
     def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
-        """A naive set function that hashes the data and writes the file."""
-        # just ignore lists for now
-        if isinstance(value, List):
-            raise Exception("Not Implemented")
-        json_string = json.dumps(dict(value))
-        filename = hash_elems(json_string).to_hex()
+        """
+        Append one or more documents to the active segment with a single write and fsync.
+        Returns the key of a single document or the keys of a list of documents.
+        Raises DuplicateKeyError without writing if any document repeats a unique field.
+        """
+        documents = value if isinstance(value, List) else [value]
+        keys = [uuid4().hex for _ in documents]
+        with self._locked():
+            self._check_unique(documents)
+            self._append(list(zip(keys, documents)))
+            self._compact()
+        return keys if isinstance(value, List) else keys[0]
+
+    def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        """Append the documents that do not repeat a unique field with a single write."""
+        with self._locked():
+            duplicates = self._duplicates(values)
+            documents = [
+                (uuid4().hex, document)
+                for position, document in enumerate(values)
+                if position not in duplicates
+            ]
+            if documents:
+                self._append(documents)
+                self._compact()
+        return duplicates
+
+    def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """
+        Set the fields of the first document matching the filter.
+
+        The new version is appended to the active segment and its index entry is
+        updated in place, so the previous version stays intact until it is compacted.
+        Returns the number of documents updated.
+        """
+        with self._locked():
+            for key in self._candidates(filter):
+                document = self._read(key)
+                if document is None or not _matches(document, filter):
+                    continue
+                document.update(cast(MutableMapping, value))
+                self._append([(key, document)])
+                self._compact()
+                return 1
+        return 0
+
+    def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        """Add to numeric fields of the first matching document while holding the lock."""
+        with self._locked():
+            for key in self._candidates(filter):
+                document = self._read(key)
+                if document is None or not _matches(document, filter):
+                    continue
+                for field, amount in value.items():
+                    document[field] = document.get(field, 0) + amount
+                self._append([(key, document)])
+                self._compact()
+                return 1
+            self._append([(uuid4().hex, {**filter, **value})])
+        return 1
+
+    def rebuild_index(self) -> None:
+        """
+        Rebuild the index of the collection from the documents on disk,
+        dropping any record torn by a crash from the end of the segments.
+        """
+        for segment in self._segments():
+            self._truncate_torn_record(segment)
+        self._index.rebuild(self._scan(), self._segment_sizes())
+
+    def _candidates(self, filter: MutableMapping) -> List[str]:
+        """Get the keys of the documents that may match the filter."""
+        keys = self._index.probe(filter)
+        return self._index.keys() if keys is None else keys
+
+    def _check_unique(self, documents: List[MutableMapping]) -> None:
+        duplicates = self._duplicates(documents)
+        if duplicates:
+            raise DuplicateKeyError(f"duplicate document at position {duplicates[0]}")
+
+    def _duplicates(self, documents: List[MutableMapping]) -> List[int]:
+        """Get the positions of the documents that repeat a unique field."""
+        duplicates: Set[int] = set()
+        for field in self._unique_fields:
+            values: Set[str] = set()
+            for position, document in enumerate(documents):
+                if field not in document or position in duplicates:
+                    continue
+                value = _index_value(document[field])
+                if value in values or self._index.probe({field: document[field]}):
+                    duplicates.add(position)
+                else:
+                    values.add(value)
+        return sorted(duplicates)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the collection while writing.
+        The lock is shared by every thread and process using the storage directory.
+        """
         with open(
-            f"{os.path.join(self._storage, filename)}.json", "w", encoding="utf-8"
+            os.path.join(self._storage, LOCAL_LOCK_FILENAME), "a", encoding="utf-8"
         ) as file:
-            file.write(json_string)
-        return filename
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
 
-    def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
-        # TODO: implement an update function
-        pass
+    def _append(self, documents: List[Tuple[str, MutableMapping]]) -> None:
+        """Append documents to the active segment, then index their locations."""
+        records = [
+            (json.dumps({"key": key, "document": dict(document)}) + "\n").encode(
+                "utf-8"
+            )
+            for key, document in documents
+        ]
+        segment = self._active_segment()
+        with open(os.path.join(self._storage, segment), "ab") as file:
+            offset = file.tell()
+            file.write(b"".join(records))
+            file.flush()
+            os.fsync(file.fileno())
+
+        locations = []
+        for record in records:
+            locations.append([segment, offset, len(record)])
+            offset += len(record)
+        self._index.add(
+            (key, location, document)
+            for (key, document), location in zip(documents, locations)
+        )
+
+    def _compact(self) -> None:
+        """
+        Move the live records out of sealed segments that are mostly superseded,
+        then rewrite the index without the entries of the removed segments.
+        """
+        compacted = False
+        active = self._active_segment()
+        for segment, live in self._index.live_bytes().items():
+            if segment == active:
+                continue
+            path = os.path.join(self._storage, segment)
+            if not os.path.exists(path):
+                continue
+            if (
+                live > 0
+                and live >= os.path.getsize(path) * LOCAL_SEGMENT_MIN_LIVE_RATIO
+            ):
+                continue
+            documents = [
+                (key, document)
+                for key, location, document in self._read_segment(segment)
+                if self._index.location(key) == location
+            ]
+            if documents:
+                self._append(documents)
+            os.remove(path)
+            compacted = True
+        if compacted:
+            self._index.compact(self._segment_sizes())
+
+    def _active_segment(self) -> str:
+        """Get the segment to append to, starting a new one when it is full."""
+        segments = self._segments()
+        if segments:
+            segment = segments[-1]
+            if (
+                os.path.getsize(os.path.join(self._storage, segment))
+                < LOCAL_SEGMENT_MAX_BYTES
+            ):
+                return segment
+            number = int(
+                segment[len(LOCAL_SEGMENT_PREFIX) : -len(LOCAL_SEGMENT_SUFFIX)]
+            )
+        else:
+            number = 0
+        return f"{LOCAL_SEGMENT_PREFIX}{number + 1:06d}{LOCAL_SEGMENT_SUFFIX}"
+
+    def _segment_sizes(self) -> Dict[str, int]:
+        return {
+            segment: os.path.getsize(os.path.join(self._storage, segment))
+            for segment in self._segments()
+        }
+
+    def _truncate_torn_record(self, segment: str) -> None:
+        """Truncate a segment after its last complete record."""
+        with open(os.path.join(self._storage, segment), "r+b") as file:
+            end = file.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 64 * 1024)
+                file.seek(start)
+                newline = file.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < file.seek(0, os.SEEK_END):
+                file.truncate(end)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _segments(self) -> List[str]:
+        return sorted(
+            name
+            for name in os.listdir(self._storage)
+            if name.startswith(LOCAL_SEGMENT_PREFIX)
+            and name.endswith(LOCAL_SEGMENT_SUFFIX)
+        )
+
+    def _scan(self) -> Iterator[Tuple[str, LOCATION_TYPE, MutableMapping]]:
+        """
+        Iterate the keys, locations and documents on disk.
+        Legacy files come first and later segment records supersede earlier ones.
+        """
+        latest: Dict[str, Tuple[LOCATION_TYPE, MutableMapping]] = {}
+        with os.scandir(self._storage) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    document = self._read_location(entry.name)
+                    if document is not None:
+                        latest[entry.name] = (entry.name, document)
+        for segment in self._segments():
+            for key, location, document in self._read_segment(segment):
+                latest.pop(key, None)
+                latest[key] = (location, document)
+        for key, (location, document) in latest.items():
+            yield key, location, document
+
+    def _read_segment(
+        self, segment: str
+    ) -> Iterator[Tuple[str, LOCATION_TYPE, MutableMapping]]:
+        """Iterate the records of a segment with their locations."""
+        offset = 0
+        with open(os.path.join(self._storage, segment), "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # a torn write at the end of the segment
+                    return
+                record = json.loads(line)
+                yield record["key"], [segment, offset, len(line)], record["document"]
+                offset += len(line)
+
+    def _read(self, key: str) -> Optional[MutableMapping]:
+        location = self._index.location(key)
+        document = self._read_location(location) if location else None
+        if document is None:
+            # the segment may have been compacted since the index was read
+            location = self._index.location(key, refresh=True)
+            document = self._read_location(location) if location else None
+        return document
+
+    def _read_location(self, location: LOCATION_TYPE) -> Optional[MutableMapping]:
+        try:
+            if isinstance(location, str):
+                with open(
+                    os.path.join(self._storage, location), encoding="utf-8"
+                ) as file:
+                    return cast(MutableMapping, json.load(file))
+            segment, offset, length = location
+            with open(os.path.join(self._storage, segment), "rb") as segment_file:
+                segment_file.seek(offset)
+                record = json.loads(segment_file.read(length))
+                return cast(MutableMapping, record["document"])
+        except FileNotFoundError:
+            return None
 
 
 class MongoRepository(IRepository):
+    """
+    A repository backed by a MongoDB collection.
+
+    The client is shared across repositories and owned by the process,
+    so entering and exiting the repository does not open or close connections.
+    """
+
     def __init__(
         self,
-        uri: str,
+        client: MongoClient,
         container: str,
         collection: str,
     ):
         super().__init__()
-        self._uri = uri
         self._container = container
         self._collection = collection
-        self._client: MongoClient = None
+        self._client = client
         self._database: Database = None
 
     def __enter__(self) -> Any:
-        self._client = MongoClient(self._uri)
         self._database = self._client.get_database(self._container)
+        ensure_mongo_indexes(self._database, self._collection)
         return self
 
     def __exit__(self, exc_type: Any, exc_value: Any, exc_traceback: Any) -> None:
-        self._client.close()
+        self._database = None
 
-    def find(self, filter: MutableMapping, skip: int = 0, limit: int = 0) -> Any:
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> Any:
         collection = self._database.get_collection(self._collection)
-        return collection.find(filter=filter, skip=skip, limit=limit)
+        return collection.find(
+            filter=filter, projection=projection, skip=skip, limit=limit
+        )
 
-    def get(self, filter: MutableMapping) -> Any:
+    def get(self, filter: MutableMapping, projection: PROJECTION_TYPE = None) -> Any:
         collection = self._database.get_collection(self._collection)
-        return collection.find_one(filter)
+        return collection.find_one(filter, projection=projection)
 
     def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
         collection = self._database.get_collection(self._collection)
-        if isinstance(value, List):
-            result = collection.insert_many(value)
-            return [str(id) for id in result.inserted_ids]
-        result = collection.insert_one(value)
-        return [str(result.inserted_id)]
+        try:
+            if isinstance(value, List):
+                result = collection.insert_many(value)
+                return [str(id) for id in result.inserted_ids]
+            result = collection.insert_one(value)
+            return [str(result.inserted_id)]
+        except pymongo.errors.DuplicateKeyError as error:
+            raise DuplicateKeyError(str(error)) from error
+        except BulkWriteError as error:
+            if _is_duplicate_key_failure(error):
+                raise DuplicateKeyError(str(error)) from error
+            raise
+
+    def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        """Insert in one unordered bulk write, so a duplicate does not stop the others."""
+        if not values:
+            return []
+        collection = self._database.get_collection(self._collection)
+        try:
+            collection.insert_many(values, ordered=False)
+            return []
+        except BulkWriteError as error:
+            if _is_duplicate_key_failure(error):
+                return _duplicate_key_positions(error)
+            raise
 
     def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """Returns the number of documents matched."""
         collection = self._database.get_collection(self._collection)
-        return collection.update_one(filter=filter, update={"$set": value})
+        return collection.update_one(
+            filter=filter, update={"$set": value}
+        ).matched_count
+
+    def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        collection = self._database.get_collection(self._collection)
+        collection.update_one(filter=filter, update={"$inc": value}, upsert=True)
+        return 1
+
+
+# the server error code of a unique index violation
+MONGO_DUPLICATE_KEY_ERROR = 11000
+
+
+def _is_duplicate_key_failure(error: BulkWriteError) -> bool:
+    write_errors = error.details.get("writeErrors", [])
+    return bool(write_errors) and all(
+        write_error.get("code") == MONGO_DUPLICATE_KEY_ERROR
+        for write_error in write_errors
+    )
+
+
+def _duplicate_key_positions(error: BulkWriteError) -> List[int]:
+    return sorted(
+        write_error["index"] for write_error in error.details.get("writeErrors", [])
+    )
+
+
+_mongo_clients: Dict[str, MongoClient] = {}
+_mongo_clients_lock = Lock()
+
+
+def get_mongo_client(settings: Settings = Settings()) -> MongoClient:
+    """
+    Get the process-wide client for the configured uri, creating it on first use.
+
+    MongoClient is thread-safe and maintains its own connection pool,
+    so a single instance should be shared for the lifetime of the process.
+    """
+    with _mongo_clients_lock:
+        client = _mongo_clients.get(settings.MONGODB_URI)
+        if client is None:
+            client = MongoClient(
+                settings.MONGODB_URI,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+            )
+            _mongo_clients[settings.MONGODB_URI] = client
+        return client
+
+
+def close_mongo_clients() -> None:
+    """Close all of the process-wide clients.  Call once when the app shuts down."""
+    with _mongo_clients_lock:
+        for client in _mongo_clients.values():
+            client.close()
+        _mongo_clients.clear()
+
+
+_sqlite_connections: Dict[str, "SimpleQueue[sqlite3.Connection]"] = {}
+_sqlite_tables: Dict[str, Set[str]] = {}
+_sqlite_lock = Lock()
+
+
+def _json_path(field: str) -> str:
+    return "$." + ".".join(f'"{part}"' for part in field.split("."))
+
+
+class SqliteRepository(IRepository):
+    """
+    A repository backed by an embedded SQLite database.
+
+    Each collection is a table of json documents partitioned by container,
+    with a generated column and index for every field in INDEXED_FIELDS.
+    The database runs in WAL mode so readers do not block the writer.
+    Connections are pooled per process and returned to the pool on exit,
+    so results of find must be consumed before leaving the with-block.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        container: str,
+        collection: str,
+    ):
+        super().__init__()
+        self._path = path
+        self._container = container
+        self._collection = collection
+        self._fields = INDEXED_FIELDS.get(collection, [])
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> Any:
+        self._connection = _get_sqlite_connection(self._path)
+        self._ensure_table()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, exc_traceback: Any) -> None:
+        if self._connection is not None:
+            _release_sqlite_connection(self._path, self._connection)
+            self._connection = None
+
+    def find(
+        self,
+        filter: MutableMapping,
+        skip: int = 0,
+        limit: int = 0,
+        projection: PROJECTION_TYPE = None,
+    ) -> Iterator[MutableMapping]:
+        """Stream the documents matching an equality filter from a cursor."""
+        for _, document in self._find_rows(filter, skip, limit):
+            yield _project(document, projection)
+
+    def get(self, filter: MutableMapping, projection: PROJECTION_TYPE = None) -> Any:
+        return next(self.find(filter, limit=1, projection=projection), None)
+
+    def set(self, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """
+        Insert one or more documents.  Lists are inserted in one transaction,
+        so nothing is inserted if any document repeats a unique field.
+        """
+        documents = value if isinstance(value, List) else [value]
+        rows = [(self._container, json.dumps(dict(document))) for document in documents]
+        with self._transaction() as connection:
+            (last_id,) = connection.execute(
+                f'SELECT coalesce(max(id), 0) FROM "{self._collection}"'
+            ).fetchone()
+            try:
+                connection.executemany(
+                    f'INSERT INTO "{self._collection}" (container, document) VALUES (?, ?)',
+                    rows,
+                )
+            except sqlite3.IntegrityError as error:
+                raise DuplicateKeyError(str(error)) from error
+        # rows are assigned the next id in order while the write lock is held
+        return [str(last_id + index + 1) for index in range(len(rows))]
+
+    def set_unordered(self, values: List[MutableMapping]) -> List[int]:
+        """
+        Insert the documents in one transaction.  A constraint failure
+        only undoes the statement that caused it, so each row succeeds or fails alone.
+        """
+        duplicates: List[int] = []
+        with self._transaction() as connection:
+            for position, document in enumerate(values):
+                try:
+                    connection.execute(
+                        f'INSERT INTO "{self._collection}" (container, document) VALUES (?, ?)',
+                        (self._container, json.dumps(dict(document))),
+                    )
+                except sqlite3.IntegrityError:
+                    duplicates.append(position)
+        return duplicates
+
+    def update(self, filter: MutableMapping, value: DOCUMENT_VALUE_TYPE) -> Any:
+        """
+        Set the fields of the first document matching the filter.
+        Returns the number of documents updated.
+        """
+        assignments: List[Any] = []
+        for field, field_value in cast(MutableMapping, value).items():
+            assignments += [_json_path(field), json.dumps(field_value)]
+        placeholders = ", ".join("?, json(?)" for _ in range(len(assignments) // 2))
+
+        with self._transaction() as connection:
+            rows = self._find_rows(filter, 0, 1)
+            row = next(rows, None)
+            rows.close()
+            if row is None:
+                return 0
+            cursor = connection.execute(
+                f'UPDATE "{self._collection}" SET document = json_set(document, {placeholders}) '
+                "WHERE id = ?",
+                assignments + [row[0]],
+            )
+            return cursor.rowcount
+
+    def increment(self, filter: MutableMapping, value: Dict[str, int]) -> Any:
+        """Add to numeric fields of the first matching document in one transaction."""
+        with self._transaction() as connection:
+            rows = self._find_rows(filter, 0, 1)
+            row = next(rows, None)
+            rows.close()
+            if row is None:
+                connection.execute(
+                    f'INSERT INTO "{self._collection}" (container, document) VALUES (?, ?)',
+                    (self._container, json.dumps({**filter, **value})),
+                )
+                return 1
+            document = row[1]
+            for field, amount in value.items():
+                document[field] = document.get(field, 0) + amount
+            connection.execute(
+                f'UPDATE "{self._collection}" SET document = ? WHERE id = ?',
+                (json.dumps(document), row[0]),
+            )
+            return 1
+
+    def _find_rows(
+        self, filter: MutableMapping, skip: int, limit: int
+    ) -> Generator[Tuple[int, MutableMapping], None, None]:
+        filter = filter or {}
+        where, parameters, remaining = self._where(filter)
+        query = (
+            f'SELECT id, document FROM "{self._collection}" WHERE {where} ORDER BY id'
+        )
+        if not remaining:
+            # the whole filter runs in sql, so sql can page
+            query += " LIMIT ? OFFSET ?"
+            parameters += [limit or -1, skip]
+
+        cursor = self._get_connection().execute(query, parameters)
+        try:
+            returned = 0
+            for row_id, row in cursor:
+                document = json.loads(row)
+                if remaining:
+                    if not _matches(document, remaining):
+                        continue
+                    if skip > 0:
+                        skip -= 1
+                        continue
+                yield row_id, document
+                returned += 1
+                if limit and returned >= limit:
+                    return
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the database write lock for the duration of the block."""
+        connection = self._get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise RuntimeError("SqliteRepository must be used within a with-block")
+        return self._connection
+
+    def _where(self, filter: MutableMapping) -> Tuple[str, List[Any], Dict[str, Any]]:
+        """
+        Translate an equality filter into sql.  Indexed fields use their generated column.
+        Returns the clause, its parameters and any part of the filter left to match in python.
+        """
+        clauses = ["container = ?"]
+        parameters: List[Any] = [self._container]
+        remaining: Dict[str, Any] = {}
+        for field, value in filter.items():
+            if isinstance(value, (MutableMapping, list)):
+                remaining[field] = value
+            elif field in self._fields:
+                clauses.append(f'"{field}" IS ?')
+                parameters.append(value)
+            else:
+                clauses.append("json_extract(document, ?) IS ?")
+                parameters += [_json_path(field), value]
+        return " AND ".join(clauses), parameters, remaining
+
+    def _ensure_table(self) -> None:
+        """Create the collection table and its indexes once per process."""
+        with _sqlite_lock:
+            tables = _sqlite_tables.setdefault(self._path, set())
+            if self._collection in tables:
+                return
+            connection = self._get_connection()
+            table = self._collection
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "id INTEGER PRIMARY KEY, container TEXT NOT NULL, document TEXT NOT NULL)"
+            )
+            columns = {
+                row[1] for row in connection.execute(f'PRAGMA table_xinfo("{table}")')
+            }
+            unique_fields = _unique_fields(table)
+            for field in self._fields:
+                if field not in columns:
+                    connection.execute(
+                        f'ALTER TABLE "{table}" ADD COLUMN "{field}" '
+                        f"GENERATED ALWAYS AS (json_extract(document, '{_json_path(field)}')) VIRTUAL"
+                    )
+                unique = "UNIQUE " if field in unique_fields else ""
+                connection.execute(
+                    f'CREATE {unique}INDEX IF NOT EXISTS "{table}_{field}" ON "{table}" (container, "{field}")'
+                )
+            tables.add(self._collection)
+
+
+def _get_sqlite_connection(path: str) -> sqlite3.Connection:
+    """Get an idle connection from the process-wide pool or open a new one."""
+    with _sqlite_lock:
+        pool = _sqlite_connections.setdefault(path, SimpleQueue())
+    try:
+        return pool.get_nowait()
+    except Empty:
+        pass
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    # autocommit, with explicit transactions for batches
+    connection = sqlite3.connect(
+        path, isolation_level=None, check_same_thread=False, timeout=30
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _release_sqlite_connection(path: str, connection: sqlite3.Connection) -> None:
+    with _sqlite_lock:
+        pool = _sqlite_connections.setdefault(path, SimpleQueue())
+    pool.put_nowait(connection)
+
+
+def close_sqlite_connections() -> None:
+    """Close all of the pooled connections.  Call once when the app shuts down."""
+    with _sqlite_lock:
+        for pool in _sqlite_connections.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+        _sqlite_connections.clear()
+        _sqlite_tables.clear()
 
 
 def get_repository(
@@ -192,7 +1397,10 @@ def get_repository(
 ) -> IRepository:
     """Get a repository by settings strage mode."""
     if settings.STORAGE_MODE == StorageMode.MONGO:
-        return MongoRepository(settings.MONGODB_URI, container, collection)
+        return MongoRepository(get_mongo_client(settings), container, collection)
+
+    if settings.STORAGE_MODE == StorageMode.SQLITE:
+        return SqliteRepository(settings.SQLITE_PATH, container, collection)
 
     if settings.STORAGE_MODE == StorageMode.LOCAL_STORAGE:
         return LocalRepository(container, collection)
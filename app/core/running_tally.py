@@ -0,0 +1,184 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from hashlib import sha256
+from logging import getLogger
+from threading import Lock
+import sys
+
+from electionguard.ballot import BallotBoxState, SubmittedBallot
+from electionguard.elgamal import ElGamalCiphertext, elgamal_add
+from electionguard.serializable import read_json_object, write_json_object
+from electionguard.type import SELECTION_ID
+
+from .client import get_client_id
+from .repository import get_repository, DataCollection, DuplicateKeyError
+from .settings import Settings
+from ..api.v1.models import RunningTally
+
+__all__ = [
+    "running_tally_from_query",
+    "get_running_tally",
+    "accumulate_running_tally",
+    "read_running_tally_selections",
+    "ballot_ids_digest",
+]
+
+# attempts to apply a batch while other processes are updating the running tally
+_MAX_UPDATE_ATTEMPTS = 16
+
+# ballot id digests are sums of sha256 hashes modulo this
+_DIGEST_MODULUS = 2 ** 256
+
+logger = getLogger(__name__)
+
+_running_tally_locks: Dict[Tuple[str, str], Lock] = {}
+_running_tally_locks_lock = Lock()
+
+
+def running_tally_from_query(query_result: Any) -> RunningTally:
+    return RunningTally(
+        election_id=query_result["election_id"],
+        version=query_result["version"],
+        cast_ballot_count=query_result["cast_ballot_count"],
+        cast_ballot_ids_digest=query_result.get("cast_ballot_ids_digest"),
+        selections=query_result["selections"],
+    )
+
+
+def get_running_tally(
+    election_id: str, settings: Settings = Settings()
+) -> RunningTally:
+    """Get the running tally of an election, which is empty until a ballot is cast."""
+    with get_repository(
+        election_id, DataCollection.RUNNING_TALLY, settings
+    ) as repository:
+        query_result = repository.get({"election_id": election_id})
+        if not query_result:
+            return RunningTally(election_id=election_id)
+        return running_tally_from_query(query_result)
+
+
+def accumulate_running_tally(
+    election_id: str, ballots: List[SubmittedBallot], settings: Settings = Settings()
+) -> bool:
+    """
+    Homomorphically add the selections of newly stored cast ballots to the running tally.
+
+    The batch is combined first and then applied only if the version is unchanged,
+    so concurrent submissions retry rather than overwrite each other.
+    Submissions in the same process take turns, so only other processes cause retries.
+    Returns False if the batch could not be applied.  The ballots included
+    in the running tally then differ from the ballot inventory,
+    which is how a tally knows to recompute from the stored ballots instead.
+    """
+    cast_ballots = [ballot for ballot in ballots if ballot.state == BallotBoxState.CAST]
+    if not cast_ballots:
+        return True
+    batch = _combine_selections(cast_ballots)
+    batch_ids = [ballot.object_id for ballot in cast_ballots]
+    try:
+        with _get_running_tally_lock(election_id), get_repository(
+            election_id, DataCollection.RUNNING_TALLY, settings
+        ) as repository:
+            for _ in range(_MAX_UPDATE_ATTEMPTS):
+                query_result = repository.get({"election_id": election_id})
+                if not query_result:
+                    try:
+                        repository.set(
+                            RunningTally(
+                                election_id=election_id,
+                                version=1,
+                                cast_ballot_count=len(cast_ballots),
+                                cast_ballot_ids_digest=ballot_ids_digest(batch_ids),
+                                selections=_write_selections(batch),
+                            ).dict()
+                        )
+                        return True
+                    except DuplicateKeyError:
+                        # created by a concurrent submission, so add to theirs
+                        continue
+
+                running_tally = running_tally_from_query(query_result)
+                selections = read_running_tally_selections(running_tally)
+                for selection_id, ciphertext in batch.items():
+                    existing = selections.get(selection_id)
+                    selections[selection_id] = (
+                        ciphertext
+                        if existing is None
+                        else elgamal_add(existing, ciphertext)
+                    )
+                if repository.update(
+                    {"election_id": election_id, "version": running_tally.version},
+                    {
+                        "version": running_tally.version + 1,
+                        "cast_ballot_count": running_tally.cast_ballot_count
+                        + len(cast_ballots),
+                        "cast_ballot_ids_digest": ballot_ids_digest(
+                            batch_ids, running_tally.cast_ballot_ids_digest
+                        ),
+                        "selections": _write_selections(selections),
+                    },
+                ):
+                    return True
+        logger.warning(f"running tally of {election_id} is too contended to update")
+        return False
+    except Exception:  # pylint: disable=broad-except
+        # the ballots are already stored, so the submission still succeeds
+        print(sys.exc_info())
+        return False
+
+
+def read_running_tally_selections(
+    running_tally: RunningTally,
+) -> Dict[SELECTION_ID, ElGamalCiphertext]:
+    return {
+        selection_id: read_json_object(ciphertext, ElGamalCiphertext)
+        for selection_id, ciphertext in running_tally.selections.items()
+    }
+
+
+def ballot_ids_digest(
+    ballot_ids: Iterable[str], digest: Optional[str] = "0"
+) -> Optional[str]:
+    """
+    Add ballot ids to an order independent digest of a set of ballot ids,
+    so the digest of the ballots in a running tally can be extended a batch at a time.
+    An unknown digest stays unknown.
+    """
+    if digest is None:
+        return None
+    total = int(digest, 16)
+    for ballot_id in ballot_ids:
+        total += int.from_bytes(sha256(ballot_id.encode("utf-8")).digest(), "big")
+    return f"{total % _DIGEST_MODULUS:064x}"
+
+
+def _get_running_tally_lock(election_id: str) -> Lock:
+    key = (get_client_id(), election_id)
+    with _running_tally_locks_lock:
+        return _running_tally_locks.setdefault(key, Lock())
+
+
+def _combine_selections(
+    ballots: List[SubmittedBallot],
+) -> Dict[SELECTION_ID, ElGamalCiphertext]:
+    ciphertexts: Dict[SELECTION_ID, List[ElGamalCiphertext]] = {}
+    for ballot in ballots:
+        for contest in ballot.contests:
+            for selection in contest.ballot_selections:
+                if not selection.is_placeholder_selection:
+                    ciphertexts.setdefault(selection.object_id, []).append(
+                        selection.ciphertext
+                    )
+    return {
+        selection_id: elgamal_add(*selection_ciphertexts)
+        for selection_id, selection_ciphertexts in ciphertexts.items()
+    }
+
+
+def _write_selections(
+    selections: Dict[SELECTION_ID, ElGamalCiphertext]
+) -> Dict[str, Any]:
+    return {
+        selection_id: write_json_object(ciphertext)
+        for selection_id, ciphertext in selections.items()
+    }
@@ -1,21 +1,34 @@
 from typing import Any, List
+import json
 import sys
 from fastapi import HTTPException, status
 
+from .async_repository import get_async_repository
 from .repository import get_repository, DataCollection
 from .settings import Settings
-from ..api.v1.models import BaseResponse, CiphertextTally, PlaintextTally
+from ..api.v1.models import (
+    BaseResponse,
+    CiphertextTally,
+    CiphertextTallyProgress,
+    PlaintextTally,
+)
 
 __all__ = [
     "ciphertext_tally_from_query",
     "plaintext_tally_from_query",
     "get_ciphertext_tally",
+    "get_ciphertext_tally_async",
     "set_ciphertext_tally",
     "filter_ciphertext_tallies",
+    "get_ciphertext_tally_progress",
+    "set_ciphertext_tally_progress",
     "get_plaintext_tally",
     "set_plaintext_tally",
+    "set_plaintext_tally_async",
     "update_plaintext_tally",
+    "update_plaintext_tally_async",
     "filter_plaintext_tallies",
+    "filter_plaintext_tallies_async",
 ]
 
 
@@ -62,14 +75,48 @@ def get_ciphertext_tally(
         ) from error
 
 
+async def get_ciphertext_tally_async(
+    election_id: str, tally_name: str, settings: Settings = Settings()
+) -> CiphertextTally:
+    try:
+        async with get_async_repository(
+            election_id, DataCollection.CIPHERTEXT_TALLY, settings
+        ) as repository:
+            query_result = await repository.get(
+                {"election_id": election_id, "tally_name": tally_name}
+            )
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find tally {election_id} {tally_name}",
+                )
+            return ciphertext_tally_from_query(query_result)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{election_id} {tally_name} not found",
+        ) from error
+
+
 def set_ciphertext_tally(
     tally: CiphertextTally, settings: Settings = Settings()
 ) -> BaseResponse:
+    """
+    Store a tally, replacing a tally of the same name,
+    so a retried tally job does not store it twice.
+    """
+    # dates are stored as iso strings, which every storage mode can encode
+    document = json.loads(tally.json())
     try:
         with get_repository(
             tally.election_id, DataCollection.CIPHERTEXT_TALLY, settings
         ) as repository:
-            repository.set(tally.dict())
+            if not repository.update(
+                {"election_id": tally.election_id, "tally_name": tally.tally_name},
+                document,
+            ):
+                repository.set(document)
             return BaseResponse()
     except Exception as error:
         print(sys.exc_info())
@@ -103,6 +150,62 @@ def filter_ciphertext_tallies(
         ) from error
 
 
+def get_ciphertext_tally_progress(
+    election_id: str, tally_name: str, settings: Settings = Settings()
+) -> CiphertextTallyProgress:
+    try:
+        with get_repository(
+            election_id, DataCollection.CIPHERTEXT_TALLY_PROGRESS, settings
+        ) as repository:
+            query_result = repository.get(
+                {"election_id": election_id, "tally_name": tally_name}
+            )
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find tally progress {election_id} {tally_name}",
+                )
+            return CiphertextTallyProgress(
+                election_id=query_result["election_id"],
+                tally_name=query_result["tally_name"],
+                ballot_count=query_result["ballot_count"],
+                processed_ballot_count=query_result["processed_ballot_count"],
+            )
+    except HTTPException:
+        raise
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="get ciphertext tally progress failed",
+        ) from error
+
+
+def set_ciphertext_tally_progress(
+    progress: CiphertextTallyProgress, settings: Settings = Settings()
+) -> BaseResponse:
+    """Record the progress of a tally, replacing the progress of a previous tally with its name."""
+    try:
+        with get_repository(
+            progress.election_id, DataCollection.CIPHERTEXT_TALLY_PROGRESS, settings
+        ) as repository:
+            if not repository.update(
+                {
+                    "election_id": progress.election_id,
+                    "tally_name": progress.tally_name,
+                },
+                progress.dict(),
+            ):
+                repository.set(progress.dict())
+            return BaseResponse()
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="set ciphertext tally progress failed",
+        ) from error
+
+
 def get_plaintext_tally(
     election_id: str, tally_name: str, settings: Settings = Settings()
 ) -> PlaintextTally:
@@ -144,6 +247,23 @@ def set_plaintext_tally(
         ) from error
 
 
+async def set_plaintext_tally_async(
+    tally: PlaintextTally, settings: Settings = Settings()
+) -> BaseResponse:
+    try:
+        async with get_async_repository(
+            tally.election_id, DataCollection.PLAINTEXT_TALLY, settings
+        ) as repository:
+            await repository.set(tally.dict())
+            return BaseResponse()
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="set plaintext tally failed",
+        ) from error
+
+
 def update_plaintext_tally(
     tally: PlaintextTally, settings: Settings = Settings()
 ) -> BaseResponse:
@@ -172,6 +292,34 @@ def update_plaintext_tally(
         ) from error
 
 
+async def update_plaintext_tally_async(
+    tally: PlaintextTally, settings: Settings = Settings()
+) -> BaseResponse:
+    try:
+        async with get_async_repository(
+            tally.election_id, DataCollection.PLAINTEXT_TALLY, settings
+        ) as repository:
+            query_result = await repository.get(
+                {"election_id": tally.election_id, "tally_name": tally.tally_name}
+            )
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find plaintext tally {tally.election_id} {tally.tally_name}",
+                )
+            await repository.update(
+                {"election_id": tally.election_id, "tally_name": tally.tally_name},
+                tally.dict(),
+            )
+            return BaseResponse()
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="update plaintext tally failed",
+        ) from error
+
+
 def filter_plaintext_tallies(
     election_id: str,
     filter: Any,
@@ -194,3 +342,26 @@ def filter_plaintext_tallies(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="filter plaintext tallies failed",
         ) from error
+
+
+async def filter_plaintext_tallies_async(
+    election_id: str,
+    filter: Any,
+    skip: int = 0,
+    limit: int = 1000,
+    settings: Settings = Settings(),
+) -> List[PlaintextTally]:
+    try:
+        async with get_async_repository(
+            election_id, DataCollection.PLAINTEXT_TALLY, settings
+        ) as repository:
+            tallies: List[PlaintextTally] = []
+            async for item in repository.find(filter, skip, limit):
+                tallies.append(plaintext_tally_from_query(item))
+            return tallies
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="filter plaintext tallies failed",
+        ) from error
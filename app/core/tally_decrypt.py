@@ -2,6 +2,7 @@ from typing import Any, List
 import sys
 from fastapi import HTTPException, status
 
+from .async_repository import get_async_repository
 from .repository import get_repository, DataCollection
 from .settings import Settings
 from ..api.v1.models import BaseResponse, CiphertextTallyDecryptionShare
@@ -11,6 +12,7 @@ __all__ = [
     "get_decryption_share",
     "set_decryption_share",
     "filter_decryption_shares",
+    "filter_decryption_shares_async",
 ]
 
 
@@ -93,3 +95,26 @@ def filter_decryption_shares(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="find decryption shares failed",
         ) from error
+
+
+async def filter_decryption_shares_async(
+    tally_name: str,
+    filter: Any,
+    skip: int = 0,
+    limit: int = 1000,
+    settings: Settings = Settings(),
+) -> List[CiphertextTallyDecryptionShare]:
+    try:
+        async with get_async_repository(
+            tally_name, DataCollection.DECRYPTION_SHARES, settings
+        ) as repository:
+            decryption_shares: List[CiphertextTallyDecryptionShare] = []
+            async for item in repository.find(filter, skip, limit):
+                decryption_shares.append(from_tally_decryption_share_query(item))
+            return decryption_shares
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="find decryption shares failed",
+        ) from error
@@ -2,12 +2,20 @@ from typing import Any, List
 import sys
 from fastapi import HTTPException, status
 
+from .async_repository import get_async_repository
 from .client import get_client_id
 from .repository import get_repository, DataCollection
 from .settings import Settings
 from ..api.v1.models import BaseResponse, UserInfo
 
-__all__ = ["get_user_info", "filter_user_info", "set_user_info", "update_user_info"]
+__all__ = [
+    "get_user_info",
+    "get_user_info_async",
+    "filter_user_info",
+    "filter_user_info_async",
+    "set_user_info",
+    "update_user_info",
+]
 
 
 def get_user_info(username: str, settings: Settings = Settings()) -> UserInfo:
@@ -30,6 +38,28 @@ def get_user_info(username: str, settings: Settings = Settings()) -> UserInfo:
         ) from error
 
 
+async def get_user_info_async(
+    username: str, settings: Settings = Settings()
+) -> UserInfo:
+    try:
+        async with get_async_repository(
+            get_client_id(), DataCollection.USER_INFO, settings
+        ) as repository:
+            query_result = await repository.get({"username": username})
+            if not query_result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Could not find user {username}",
+                )
+            return UserInfo(**query_result)
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{username} not found",
+        ) from error
+
+
 def filter_user_info(
     filter: Any, skip: int = 0, limit: int = 1000, settings: Settings = Settings()
 ) -> List[UserInfo]:
@@ -50,6 +80,25 @@ def filter_user_info(
         ) from error
 
 
+async def filter_user_info_async(
+    filter: Any, skip: int = 0, limit: int = 1000, settings: Settings = Settings()
+) -> List[UserInfo]:
+    try:
+        async with get_async_repository(
+            get_client_id(), DataCollection.USER_INFO, settings
+        ) as repository:
+            results: List[UserInfo] = []
+            async for item in repository.find(filter, skip, limit):
+                results.append(item)
+            return results
+    except Exception as error:
+        print(sys.exc_info())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="filter users failed",
+        ) from error
+
+
 def set_user_info(user: UserInfo, settings: Settings = Settings()) -> None:
     try:
         with get_repository(
@@ -7,8 +7,20 @@ from app.api.v1.models.auth import AuthenticationCredential
 
 from app.api.v1.routes import get_v1_routes
 from app.api.v1_1.routes import get_v1_1_routes
-from app.core.settings import Settings
+from app.core.settings import ApiMode, Settings, StorageMode
 from app.core.scheduler import get_scheduler
+from app.core.repository import (
+    get_mongo_client,
+    close_mongo_clients,
+    close_sqlite_connections,
+)
+from app.core.indexes import ensure_all_mongo_indexes
+from app.core.job import resume_jobs, shutdown_job_workers
+from app.core.queue import close_rabbitmq_connections
+from app.core.async_repository import (
+    close_async_mongo_clients,
+    shutdown_repository_executor,
+)
 
 from app.api.v1.models import UserInfo, UserScope
 from app.core import AuthenticationContext, set_auth_credential, set_user_info
@@ -85,15 +97,33 @@ app = get_app()
 
 @app.on_event("startup")
 def on_startup() -> None:
-    pass
+    # Create the process-wide mongo client up front so the first request
+    # does not pay for connection setup, and make sure existing collections are indexed.
+    # New collections are indexed when they are first used.
+    settings = app.state.settings
+    if settings.STORAGE_MODE == StorageMode.MONGO:
+        ensure_all_mongo_indexes(get_mongo_client(settings))
+    # Pick up the background jobs left behind by a process that stopped
+    if settings.API_MODE == ApiMode.MEDIATOR:
+        resume_jobs(settings)
 
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
+    # Let the running background jobs finish, the queued ones resume elsewhere
+    shutdown_job_workers()
+
     # Ensure a clean shutdown of the singleton Scheduler
     scheduler = get_scheduler()
     scheduler.close()
 
+    # Close the pooled database connections
+    close_mongo_clients()
+    close_async_mongo_clients()
+    shutdown_repository_executor()
+    close_sqlite_connections()
+    close_rabbitmq_connections()
+
 
 if __name__ == "__main__":
     # IMPORTANT: This should only be used to debug the application.
@@ -0,0 +1,100 @@
+import logging
+import signal
+import sys
+from typing import Any, Callable, Dict, Optional, Type
+
+from electionguard.scheduler import Scheduler
+
+from app.core.ballot_queue import SUBMITTED_BALLOT_QUEUE, process_ballot_queue
+from app.core.distributed_tally import TALLY_SHARD_QUEUE, process_tally_shard_queue
+from app.core.queue import (
+    IMessageQueue,
+    close_rabbitmq_connections,
+    get_message_queue,
+)
+from app.core.repository import close_mongo_clients, close_sqlite_connections
+from app.core.scheduler import get_scheduler
+from app.core.settings import QueueMode, Settings
+
+logging.basicConfig(
+    level="INFO",
+    format="%(asctime)s %(levelname)-8s %(funcName)s() L%(lineno)-4d %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# How long to wait for messages before checking whether the worker was stopped
+RECEIVE_TIMEOUT_SECONDS = 1.0
+
+
+class QueueWorker:
+    """Processes the messages the mediator api publishes to a queue until stopped."""
+
+    queue_name: str
+    process: Callable[[IMessageQueue, Settings, Optional[Scheduler], float], int]
+
+    def __init__(self, settings: Settings = Settings()):
+        self._settings = settings
+        self._running = False
+
+    def run(self) -> None:
+        self._running = True
+        scheduler = get_scheduler()
+        with get_message_queue(
+            self.queue_name, self.queue_name, self._settings
+        ) as queue:
+            logger.info(f"consuming messages from {self.queue_name}")
+            while self._running:
+                count = type(self).process(
+                    queue, self._settings, scheduler, RECEIVE_TIMEOUT_SECONDS
+                )
+                if count > 0:
+                    logger.info(f"processed {count} messages from {self.queue_name}")
+
+    def stop(self, *_: Any) -> None:
+        """Stop after the messages in progress are processed and acknowledged."""
+        self._running = False
+
+
+class BallotWorker(QueueWorker):
+    """Validates and stores the ballots queued by the mediator api."""
+
+    queue_name = SUBMITTED_BALLOT_QUEUE
+    process = process_ballot_queue
+
+
+class TallyWorker(QueueWorker):
+    """Tallies the shards of the distributed tallies started by the mediator api."""
+
+    queue_name = TALLY_SHARD_QUEUE
+    process = process_tally_shard_queue
+
+
+WORKERS: Dict[str, Type[QueueWorker]] = {
+    "ballots": BallotWorker,
+    "tally": TallyWorker,
+}
+
+
+if __name__ == "__main__":
+    # Run alongside the mediator api with a remote queue, e.g.
+    # `QUEUE_MODE=remote STORAGE_MODE=mongo poetry run python -m app.worker tally`
+    worker_settings = Settings()
+    if worker_settings.QUEUE_MODE != QueueMode.REMOTE:
+        # a local queue only exists inside the api process, which drains it itself
+        logger.error("the worker requires QUEUE_MODE=remote")
+        sys.exit(1)
+    worker_name = sys.argv[1] if len(sys.argv) > 1 else "ballots"
+    if worker_name not in WORKERS:
+        logger.error(f"unknown worker {worker_name}, expected one of {list(WORKERS)}")
+        sys.exit(1)
+
+    worker = WORKERS[worker_name](worker_settings)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    try:
+        worker.run()
+    finally:
+        get_scheduler().close()
+        close_mongo_clients()
+        close_sqlite_connections()
+        close_rabbitmq_connections()
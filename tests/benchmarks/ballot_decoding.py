@@ -0,0 +1,122 @@
+"""
+Compare the ways a submitted ballot can be decoded from a json request body,
+and the ways the hex elements of a ballot can be converted to integers.
+
+Run from the repository root with `PYTHONPATH=. python tests/benchmarks/ballot_decoding.py`.
+"""
+from typing import Any, Callable, List, Tuple
+import argparse
+import json
+import timeit
+
+from gmpy2 import mpz
+
+from electionguard.ballot import SubmittedBallot
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.models.ballot import SubmittedBallotDto
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def _benchmarks() -> List[Tuple[str, Callable[[], SubmittedBallot]]]:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        api_ballot = json.load(file)["ballots"][0]
+    expected = SubmittedBallotDto.parse_obj(api_ballot).to_sdk_format()
+    api_body = json.dumps(api_ballot)
+    sdk_body = json.dumps(expected.to_json_object())
+
+    benchmarks: List[Tuple[str, Callable[[], SubmittedBallot]]] = [
+        (
+            "SubmittedBallotDto.parse_raw().to_sdk_format()",
+            lambda: SubmittedBallotDto.parse_raw(api_body).to_sdk_format(),
+        ),
+        (
+            "SubmittedBallot.from_json_object(json.loads())",
+            lambda: SubmittedBallot.from_json_object(json.loads(sdk_body)),
+        ),
+        (
+            "decode_submitted_ballot(json.loads()) api encoding",
+            lambda: decode_submitted_ballot(json.loads(api_body)),
+        ),
+        (
+            "decode_submitted_ballot(json.loads()) sdk encoding",
+            lambda: decode_submitted_ballot(json.loads(sdk_body)),
+        ),
+    ]
+    for name, decode in benchmarks:
+        assert decode() == expected, f"{name} decoded a different ballot"
+    return benchmarks
+
+
+def _hex_elements(value: Any) -> List[str]:
+    """Find the hex elements of a ballot in the api encoding."""
+    if isinstance(value, dict):
+        if list(value) == ["data"]:
+            return [value["data"]]
+        return [element for item in value.values() for element in _hex_elements(item)]
+    if isinstance(value, list):
+        return [element for item in value for element in _hex_elements(item)]
+    return []
+
+
+def _batched(elements: List[str], width: int) -> List[mpz]:
+    """Convert elements padded to the same width in one call, then split them."""
+    data = bytes.fromhex("".join(element.rjust(width, "0") for element in elements))
+    size = width // 2
+    return [
+        mpz(int.from_bytes(data[offset : offset + size], "big"))
+        for offset in range(0, len(data), size)
+    ]
+
+
+def _hex_benchmarks() -> List[Tuple[str, Callable[[], List[mpz]]]]:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        api_ballot = json.load(file)["ballots"][0]
+    elements = _hex_elements(api_ballot)
+    expected = sorted(mpz(element, 16) for element in elements)
+
+    def batched() -> List[mpz]:
+        # the elements have to be found before they can be converted together
+        found = _hex_elements(api_ballot)
+        # elements mod p are 4096 bits and elements mod q 256 bits
+        return _batched([element for element in found if len(element) > 64], 1024) + (
+            _batched([element for element in found if len(element) <= 64], 64)
+        )
+
+    benchmarks: List[Tuple[str, Callable[[], List[mpz]]]] = [
+        (
+            "mpz(element, 16) per element, as decoded",
+            lambda: [mpz(element, 16) for element in elements],
+        ),
+        ("find elements, bytes.fromhex() per ballot, split", batched),
+    ]
+    for name, convert in benchmarks:
+        assert sorted(convert()) == expected, f"{name} converted different elements"
+    return benchmarks
+
+
+def _run(benchmarks: List[Tuple[str, Callable[[], Any]]], args: Any) -> None:
+    baseline = 0.0
+    for name, run in benchmarks:
+        best = min(timeit.repeat(run, number=args.number, repeat=args.repeat))
+        per_ballot = best / args.number * 1e6
+        baseline = baseline or per_ballot
+        print(f"{name:55} {per_ballot:9.1f} us/ballot {baseline / per_ballot:6.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--number", default=1000, type=int, help="ballots decoded per run"
+    )
+    parser.add_argument("-r", "--repeat", default=5, type=int, help="runs")
+    args = parser.parse_args()
+
+    _run(_benchmarks(), args)
+    print()
+    _run(_hex_benchmarks(), args)
+
+
+if __name__ == "__main__":
+    main()
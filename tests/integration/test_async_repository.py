@@ -0,0 +1,118 @@
+from typing import Any, List, Tuple
+import asyncio
+import json
+import os
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.core import async_repository
+from app.core.async_repository import ThreadedAsyncRepository, get_async_repository
+from app.core.ballot import filter_ballots, filter_ballots_async, set_ballots
+from app.core.repository import DataCollection, SqliteRepository, get_repository
+from app.core.settings import Settings, StorageMode
+from app.core.tally import get_ciphertext_tally, get_ciphertext_tally_async
+from app.core.tally_decrypt import (
+    filter_decryption_shares,
+    filter_decryption_shares_async,
+)
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_threaded_async_repository_round_trip(tmp_path: Any, monkeypatch: Any) -> None:
+    # stream the results over several round trips to the executor
+    monkeypatch.setattr(async_repository, "FIND_BATCH_SIZE", 3)
+    path = os.path.join(tmp_path, "electionguard.db")
+
+    async def round_trip() -> None:
+        async with ThreadedAsyncRepository(
+            SqliteRepository(path, "election-1", DataCollection.SUBMITTED_BALLOT)
+        ) as repository:
+            await repository.set(
+                [
+                    {
+                        "object_id": f"ballot-{index}",
+                        "state": "CAST" if index % 2 else "SPOILED",
+                    }
+                    for index in range(10)
+                ]
+            )
+            assert await repository.set_unordered(
+                [{"object_id": "ballot-1"}, {"object_id": "ballot-10", "state": "CAST"}]
+            ) == [0]
+
+            found: List[str] = [
+                ballot["object_id"]
+                async for ballot in repository.find(
+                    {"state": "CAST"}, 1, 0, ["object_id"]
+                )
+            ]
+            assert found == [
+                "ballot-3",
+                "ballot-5",
+                "ballot-7",
+                "ballot-9",
+                "ballot-10",
+            ]
+
+            assert await repository.update({"object_id": "ballot-3"}, {"state": "X"})
+            ballot = await repository.get({"object_id": "ballot-3"}, ["state"])
+            assert ballot["state"] == "X"
+            assert await repository.get({"object_id": "missing"}) is None
+
+        async with ThreadedAsyncRepository(
+            SqliteRepository(path, "election-1", DataCollection.BALLOT_INVENTORY)
+        ) as repository:
+            await repository.increment({"election_id": "election-1"}, {"count": 2})
+            await repository.increment({"election_id": "election-1"}, {"count": 3})
+            inventory = await repository.get({"election_id": "election-1"})
+            assert inventory["count"] == 5
+
+    asyncio.run(round_trip())
+
+
+def test_get_async_repository_wraps_synchronous_storage(tmp_path: Any) -> None:
+    settings = Settings(
+        STORAGE_MODE=StorageMode.SQLITE,
+        SQLITE_PATH=os.path.join(tmp_path, "electionguard.db"),
+    )
+
+    async def get_user() -> Any:
+        repository = get_async_repository(
+            "client-1", DataCollection.USER_INFO, settings
+        )
+        assert isinstance(repository, ThreadedAsyncRepository)
+        async with repository:
+            await repository.set({"username": "user-1"})
+            return await repository.get({"username": "user-1"})
+
+    assert asyncio.run(get_user())["username"] == "user-1"
+
+
+def test_async_accessors_match_synchronous(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-async"
+    set_ballots(election_id, [ballot])
+    with get_repository(election_id, DataCollection.CIPHERTEXT_TALLY) as repository:
+        repository.set(
+            {
+                "election_id": election_id,
+                "tally_name": "tally-1",
+                "created": "2021-01-01T00:00:00",
+                "tally": {"object_id": "tally-1", "contests": {}},
+            }
+        )
+
+    async def read() -> Tuple[Any, ...]:
+        return (
+            await filter_ballots_async(election_id, {"state": "CAST"}),
+            await get_ciphertext_tally_async(election_id, "tally-1"),
+            await filter_decryption_shares_async("tally-1", {}),
+        )
+
+    assert asyncio.run(read()) == (
+        filter_ballots(election_id, {"state": "CAST"}),
+        get_ciphertext_tally(election_id, "tally-1"),
+        filter_decryption_shares("tally-1", {}),
+    )
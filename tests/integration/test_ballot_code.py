@@ -0,0 +1,69 @@
+from typing import Any
+import asyncio
+import json
+import shutil
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.core.ballot import add_ballot_inventory, get_ballot_code_async, set_ballots
+from app.core.cache import CacheName, get_cache
+from app.core.settings import ApiMode, Settings
+from app.main import get_app
+
+from .api_utils import BASE_URL
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_fetch_ballot_code(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-ballot-code"
+    set_ballots(election_id, [ballot])
+    add_ballot_inventory(election_id, [ballot])
+    code = ballot.code.to_hex()
+    client = TestClient(get_app(Settings(API_MODE=ApiMode.MEDIATOR)))
+
+    response = client.get(
+        f"{BASE_URL}/ballot/code/{code}",
+        params={"election_id": election_id, "include_ballot": True},
+    )
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    body = response.json()
+    assert body["ballot_code"] == {
+        "code": code,
+        "object_id": ballot.object_id,
+        "state": "CAST",
+    }
+    assert body["ballot"]["object_id"] == ballot.object_id
+
+    response = client.get(
+        f"{BASE_URL}/ballot/code/{'0' * 64}", params={"election_id": election_id}
+    )
+    assert response.status_code == 404
+
+
+def test_get_ballot_code_async(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-ballot-code-async"
+    # a ballot stored before codes had their own collection
+    set_ballots(election_id, [ballot])
+    code = ballot.code.to_hex()
+    cache = get_cache(CacheName.BALLOT_CODE)
+
+    assert asyncio.run(get_ballot_code_async(election_id, "0" * 64)) is None
+    ballot_code = asyncio.run(get_ballot_code_async(election_id, code))
+    assert ballot_code is not None
+    assert (ballot_code.object_id, ballot_code.state) == (ballot.object_id, "CAST")
+
+    # found codes are served from the cache once stored codes are gone
+    shutil.rmtree(tmp_path / "storage")
+    hits = cache.stats()["hits"]
+    assert asyncio.run(get_ballot_code_async(election_id, code)) == ballot_code
+    assert cache.stats()["hits"] == hits + 1
+    assert asyncio.run(get_ballot_code_async(election_id, "0" * 64)) is None
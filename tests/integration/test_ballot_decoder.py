@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from typing import Any
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.mediator import ballot as ballot_routes
+from app.api.v1.models import SubmitBallotsRequest
+from app.api.v1.models.ballot import SubmittedBallotDto
+from app.core.ballot import get_ballot
+from app.core.settings import Settings
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def _api_ballot() -> dict:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        return json.load(file)["ballots"][0]
+
+
+def test_decode_submitted_ballot_matches_dto() -> None:
+    api_ballot = _api_ballot()
+    expected = SubmittedBallotDto.parse_obj(api_ballot).to_sdk_format()
+
+    assert decode_submitted_ballot(api_ballot) == expected
+    assert decode_submitted_ballot(expected.to_json_object()) == expected
+
+
+def test_decode_submitted_ballot_rejects_out_of_range_elements() -> None:
+    api_ballot = _api_ballot()
+    api_ballot["crypto_hash"] = {"data": "F" * 128}
+
+    with pytest.raises(ValueError):
+        decode_submitted_ballot(api_ballot)
+    with pytest.raises(ValueError):
+        decode_submitted_ballot({"object_id": "missing-fields"})
+
+
+def test_decode_submitted_ballot_rejects_non_boolean_flags() -> None:
+    api_ballot = _api_ballot()
+    api_ballot["contests"][0]["ballot_selections"][0][
+        "is_placeholder_selection"
+    ] = "false"
+
+    with pytest.raises(ValueError):
+        decode_submitted_ballot(api_ballot)
+
+
+def test_submit_ballots_decodes_ballots(tmp_path: Any, monkeypatch: Any) -> None:
+    api_ballot = _api_ballot()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        ballot_routes, "get_election_validation_parameters", lambda *_: None
+    )
+    monkeypatch.setattr(
+        ballot_routes,
+        "validate_ballots",
+        lambda ballots, *_: {ballot.object_id: True for ballot in ballots},
+    )
+    request: Any = SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(settings=Settings()))
+    )
+
+    def submit(ballot: dict) -> Any:
+        return ballot_routes.submit_ballots(
+            request, "election-submit", SubmitBallotsRequest(ballots=[ballot]), None  # type: ignore
+        )
+
+    assert submit(api_ballot).duplicate_ballot_ids == []
+    assert get_ballot("election-submit", api_ballot["object_id"]) == (
+        decode_submitted_ballot(api_ballot)
+    )
+
+    with pytest.raises(HTTPException) as error:
+        submit({**api_ballot, "crypto_hash": {"data": "F" * 128}})
+    assert error.value.status_code == 422
@@ -0,0 +1,94 @@
+from dataclasses import replace
+from threading import Event, Thread
+from typing import Any, List
+import json
+
+from electionguard.group import ONE_MOD_Q
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.mediator.ballot import _submit_ballots
+from app.core import ballot as ballot_core
+from app.core.ballot import (
+    _get_ballot_filter,
+    exclude_duplicate_ballots,
+    get_ballot_inventory_counts,
+    set_ballots,
+)
+from app.core.running_tally import get_running_tally
+from app.core.settings import Settings
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_retried_submission_is_counted_once(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-retried-submission"
+
+    # a submission that stored the ballot and failed before counting it
+    set_ballots(election_id, [ballot])
+    assert get_ballot_inventory_counts(election_id) is None
+
+    ballots, duplicate_ids = exclude_duplicate_ballots(election_id, [ballot])
+    assert ballots == [ballot] and not duplicate_ids
+    assert not _submit_ballots(election_id, ballots).duplicate_ballot_ids
+
+    # once counted, the ballot and a different ballot with its id are duplicates
+    changed = replace(ballot, code=ONE_MOD_Q)
+    ballots, duplicate_ids = exclude_duplicate_ballots(election_id, [ballot, changed])
+    assert not ballots
+    assert duplicate_ids == [ballot.object_id, ballot.object_id]
+    assert _submit_ballots(election_id, [ballot]).duplicate_ballot_ids == [
+        ballot.object_id
+    ]
+
+    inventory = get_ballot_inventory_counts(election_id)
+    assert inventory is not None
+    assert inventory.cast_ballot_count == 1
+    assert get_running_tally(election_id).cast_ballot_count == 1
+
+
+def test_ballot_filter_loads_do_not_block_other_elections(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ballot_core, "_ballot_filters", {})
+    scanning = Event()
+    release = Event()
+    get_repository = ballot_core.get_repository
+
+    class SlowScan:
+        def __init__(self, repository: Any) -> None:
+            self._repository = repository
+
+        def __enter__(self) -> Any:
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            pass
+
+        def find(self, *args: Any, **kwargs: Any) -> List[Any]:
+            scanning.set()
+            assert release.wait(10)
+            return [{"object_id": "ballot-slow"}]
+
+    def get_slow_repository(election_id: str, *args: Any) -> Any:
+        repository = get_repository(election_id, *args)
+        return SlowScan(repository) if election_id == "election-slow" else repository
+
+    monkeypatch.setattr(ballot_core, "get_repository", get_slow_repository)
+    filters: List[Any] = []
+    slow = Thread(
+        target=lambda: filters.append(_get_ballot_filter("election-slow", Settings()))
+    )
+    slow.start()
+    try:
+        assert scanning.wait(10)
+        # another election's filter loads while the slow scan holds its election's lock
+        assert "ballot-slow" not in _get_ballot_filter("election-fast", Settings())
+    finally:
+        release.set()
+        slow.join()
+    assert "ballot-slow" in filters[0]
+    assert _get_ballot_filter("election-slow", Settings()) is filters[0]
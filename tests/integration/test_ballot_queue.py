@@ -0,0 +1,92 @@
+from typing import Any, List, Tuple
+import json
+
+from electionguard.ballot import SubmittedBallot
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.core import ballot_queue
+from app.core.ballot import get_ballot, get_ballot_inventory_counts
+from app.core.ballot_queue import (
+    SUBMITTED_BALLOT_QUEUE,
+    get_ballot_submission,
+    process_ballot_queue,
+    publish_ballot_submission,
+)
+from app.core.queue import get_message_queue
+from app.core.running_tally import get_running_tally
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_redelivered_ballots_are_counted_once(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-redelivered"
+    monkeypatch.setattr(
+        ballot_queue, "get_election_validation_parameters", lambda *_: None
+    )
+    monkeypatch.setattr(
+        ballot_queue,
+        "validate_ballots",
+        lambda ballots, *_: {ballot.object_id: True for ballot in ballots},
+    )
+    add_ballot_inventory = ballot_queue.add_ballot_inventory
+    failures = [RuntimeError("inventory unavailable")]
+
+    def fail_once(election_id: str, ballots: List[SubmittedBallot], *args: Any) -> Any:
+        if failures:
+            raise failures.pop()
+        return add_ballot_inventory(election_id, ballots, *args)
+
+    monkeypatch.setattr(ballot_queue, "add_ballot_inventory", fail_once)
+
+    submission = publish_ballot_submission(election_id, [ballot])
+    with get_message_queue(SUBMITTED_BALLOT_QUEUE, SUBMITTED_BALLOT_QUEUE) as queue:
+        # the ballot is stored, then counting it fails and the message is requeued
+        assert process_ballot_queue(queue) == 1
+        assert get_ballot(election_id, ballot.object_id).object_id == ballot.object_id
+        assert get_ballot_inventory_counts(election_id) is None
+
+        assert process_ballot_queue(queue) == 1
+        assert process_ballot_queue(queue) == 0
+
+    def counts() -> Tuple[int, int]:
+        stored = get_ballot_submission(election_id, submission.tracking_id)
+        return stored.accepted_count, stored.rejected_count
+
+    assert counts() == (1, 0)
+
+    # a batch redelivered after it was counted, e.g. when its ack is lost
+    with get_message_queue(SUBMITTED_BALLOT_QUEUE, SUBMITTED_BALLOT_QUEUE) as queue:
+        queue.publish(
+            json.dumps(
+                {
+                    "tracking_id": submission.tracking_id,
+                    "election_id": election_id,
+                    "index": 0,
+                    "ballot": ballot.to_json_object(),
+                }
+            )
+        )
+        assert process_ballot_queue(queue) == 1
+    assert counts() == (1, 0)
+    inventory = get_ballot_inventory_counts(election_id)
+    assert inventory is not None
+    assert inventory.cast_ballot_count == 1
+    assert get_running_tally(election_id).cast_ballot_count == 1
+
+
+def test_malformed_message_is_dropped(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = json.load(file)["ballots"][0]
+    monkeypatch.chdir(tmp_path)
+    with get_message_queue(SUBMITTED_BALLOT_QUEUE, SUBMITTED_BALLOT_QUEUE) as queue:
+        queue.publish_many(
+            [
+                json.dumps({"ballot": ballot}),
+                json.dumps({"election_id": "election-malformed", "ballot": ballot}),
+            ]
+        )
+        assert process_ballot_queue(queue) == 2
+        assert queue.receive(10) == []
@@ -0,0 +1,89 @@
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.mediator import ballot as ballot_routes
+from app.api.v1.mediator.ballot import _ingest_chunk, _read_lines
+from app.core.settings import Settings
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+class StreamedRequest:
+    def __init__(self, body: bytes, headers: Dict[str, str], chunk_size: int) -> None:
+        self.headers = headers
+        self._chunks = [
+            body[index : index + chunk_size]
+            for index in range(0, len(body), chunk_size)
+        ]
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _read(
+    body: bytes, settings: Settings, gzipped: bool = False
+) -> List[Tuple[int, bytes]]:
+    headers = {"content-encoding": "gzip"} if gzipped else {}
+    request: Any = StreamedRequest(gzip.compress(body) if gzipped else body, headers, 7)
+
+    async def read() -> List[Tuple[int, bytes]]:
+        return [line async for line in _read_lines(request, settings)]
+
+    return asyncio.run(read())
+
+
+def test_read_ndjson_lines() -> None:
+    body = b'{"ballot": 1}\n\n  \n{"ballot": 2}\n{"ballot": 3}'
+    expected = [(1, b'{"ballot": 1}'), (4, b'{"ballot": 2}'), (5, b'{"ballot": 3}')]
+    settings = Settings(BALLOT_INGEST_MAX_LINE_BYTES=16)
+    assert _read(body, settings) == expected
+    assert _read(body, settings, gzipped=True) == expected
+
+    with pytest.raises(HTTPException) as error:
+        _read(body, Settings(BALLOT_INGEST_MAX_BALLOTS=2))
+    assert error.value.status_code == 413
+
+
+def test_read_oversized_line() -> None:
+    settings = Settings(BALLOT_INGEST_MAX_LINE_BYTES=1000)
+    with pytest.raises(HTTPException) as error:
+        _read(b'{"ballot": 1}\n' + b"0" * 1001 + b"\n", settings)
+    assert error.value.status_code == 413
+    assert "line 2" in error.value.detail
+
+    # a line that inflates far beyond the limit fails without being inflated whole
+    with pytest.raises(HTTPException) as error:
+        _read(b"0" * 100 * 1024 * 1024, settings, gzipped=True)
+    assert error.value.status_code == 413
+
+
+def test_ingest_malformed_line(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = json.load(file)["ballots"][0]
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        ballot_routes, "get_election_validation_parameters", lambda *_: None
+    )
+    monkeypatch.setattr(
+        ballot_routes,
+        "validate_ballots",
+        lambda ballots, *_: {ballot.object_id: True for ballot in ballots},
+    )
+
+    chunk = _ingest_chunk(
+        "election-stream",
+        0,
+        [(1, b'{"object_id": '), (2, json.dumps(ballot).encode())],
+        Settings(),
+        None,  # type: ignore
+    )
+    assert chunk.ballot_count == 2
+    assert chunk.accepted_count == 1
+    assert chunk.rejected == {"line 1": "could not read ballot"}
+    assert chunk.error is None
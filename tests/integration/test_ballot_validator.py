@@ -0,0 +1,169 @@
+from dataclasses import replace
+from typing import Any, List, Tuple
+import json
+
+import pytest
+from electionguard.ballot import CiphertextBallot, PlaintextBallot, create_ballot_hash
+from electionguard.ballot_validator import ballot_is_valid_for_election
+from electionguard.election import make_ciphertext_election_context
+from electionguard.encrypt import encrypt_ballot
+from electionguard.group import int_to_q, ONE_MOD_Q
+from electionguard.key_ceremony import generate_election_key_pair
+from electionguard.manifest import InternalManifest, Manifest
+
+from app.core import ballot_validator
+from app.core.ballot_validator import BallotValidationParameters, validate_ballots
+from app.core.cache import LruCache
+from app.core.scheduler import get_scheduler
+from app.core.settings import Settings
+
+_MANIFEST_FILE = "tests/integration/data/election_description.json"
+_BALLOT_FILE = "tests/integration/data/ballot-plaintext-simple.json"
+
+
+@pytest.fixture(scope="module")
+def election() -> Tuple[BallotValidationParameters, CiphertextBallot]:
+    """The validation parameters of an election and a ballot encrypted for it."""
+    with open(_MANIFEST_FILE, encoding="utf-8") as file:
+        manifest = Manifest.from_json_object(json.load(file))
+    keys = generate_election_key_pair("guardian-1", 1, 1)
+    context = make_ciphertext_election_context(
+        1, 1, keys.key_pair.public_key, int_to_q(1), manifest.crypto_hash()
+    )
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        plaintext = PlaintextBallot.from_json_object(json.load(file)["ballots"][0])
+    ballot = encrypt_ballot(
+        plaintext,
+        InternalManifest(manifest),
+        context,
+        int_to_q(1),
+        should_verify_proofs=False,
+    )
+    assert ballot is not None
+    return BallotValidationParameters(manifest, context), ballot
+
+
+def _copy_ballot(ballot: CiphertextBallot, object_id: str) -> CiphertextBallot:
+    """Copy an encrypted ballot with another id, which is only valid with its hash updated."""
+    return replace(
+        ballot,
+        object_id=object_id,
+        crypto_hash=create_ballot_hash(
+            object_id, ballot.manifest_hash, ballot.contests
+        ),
+    )
+
+
+class RecordingScheduler:
+    def __init__(self) -> None:
+        self.chunk_sizes: List[int] = []
+
+    def schedule(self, task: Any, arguments: List[Tuple[Any, ...]]) -> Any:
+        self.chunk_sizes.extend(
+            len(chunk) for chunk, _, serialized in arguments if serialized is None
+        )
+        return get_scheduler().schedule(task, arguments)
+
+
+class InProcessScheduler:
+    """Runs tasks on this process, which stands in for a single pool worker."""
+
+    def __init__(self) -> None:
+        self.sent_parameters = 0
+
+    def schedule(self, task: Any, arguments: List[Tuple[Any, ...]]) -> Any:
+        self.sent_parameters += sum(
+            serialized is not None for *_, serialized in arguments
+        )
+        return [task(*argument) for argument in arguments]
+
+
+def test_validate_ballots_in_chunks(
+    election: Tuple[BallotValidationParameters, CiphertextBallot]
+) -> None:
+    parameters, ballot = election
+    ballots = [
+        _copy_ballot(ballot, f"ballot-{index}") if index % 2
+        # an id that does not match the ballot hash
+        else replace(ballot, object_id=f"ballot-{index}")
+        for index in range(5)
+    ]
+
+    serial = validate_ballots(ballots, parameters, Settings())
+    assert list(serial) == [ballot.object_id for ballot in ballots]
+    assert list(serial.values()) == [False, True, False, True, False]
+
+    scheduler = RecordingScheduler()
+    chunked = validate_ballots(
+        ballots,
+        parameters,
+        Settings(
+            BALLOT_VALIDATION_PARALLEL_THRESHOLD=2, BALLOT_VALIDATION_CHUNK_SIZE=2
+        ),
+        scheduler,  # type: ignore
+    )
+    assert scheduler.chunk_sizes == [2, 2, 1]
+    assert list(chunked.items()) == list(serial.items())
+
+
+def test_validation_parameters_sent_once_per_worker(
+    election: Tuple[BallotValidationParameters, CiphertextBallot], monkeypatch: Any
+) -> None:
+    parameters, ballot = election
+    monkeypatch.setattr(
+        ballot_validator, "_worker_parameters", LruCache(1, float("inf"))
+    )
+    ballots = [_copy_ballot(ballot, f"ballot-{index}") for index in range(4)]
+    settings = Settings(
+        BALLOT_VALIDATION_PARALLEL_THRESHOLD=2, BALLOT_VALIDATION_CHUNK_SIZE=2
+    )
+    scheduler = InProcessScheduler()
+
+    first = validate_ballots(ballots, parameters, settings, scheduler)  # type: ignore
+    assert list(first.values()) == [True] * 4
+    assert scheduler.sent_parameters == 2
+
+    # the worker kept the parameters of the election
+    second = validate_ballots(ballots, parameters, settings, scheduler)  # type: ignore
+    assert second == first
+    assert scheduler.sent_parameters == 2
+    assert parameters.serialized() is parameters.serialized()
+
+
+def test_validation_matches_sdk(
+    election: Tuple[BallotValidationParameters, CiphertextBallot]
+) -> None:
+    parameters, ballot = election
+    contest = ballot.contests[0]
+    first, second = contest.ballot_selections[:2]
+    swapped_proofs = replace(
+        contest,
+        ballot_selections=[
+            replace(first, proof=second.proof),
+            replace(second, proof=first.proof),
+            *contest.ballot_selections[2:],
+        ],
+    )
+    changed_hash = replace(contest, description_hash=ONE_MOD_Q)
+    ballots = [
+        (ballot, True),
+        (replace(ballot, contests=[swapped_proofs, *ballot.contests[1:]]), False),
+        (replace(ballot, contests=[changed_hash, *ballot.contests[1:]]), False),
+        (replace(ballot, crypto_hash=ONE_MOD_Q), False),
+    ]
+    for test_ballot, expected in ballots:
+        assert parameters.is_valid(test_ballot) is expected
+        assert (
+            ballot_is_valid_for_election(
+                test_ballot, parameters.internal_manifest, parameters.context
+            )
+            is expected
+        )
+
+    # the sdk fails on a style that is not in the manifest
+    unknown_style = replace(ballot, style_id="unknown-style")
+    assert parameters.is_valid(unknown_style) is False
+    with pytest.raises(IndexError):
+        ballot_is_valid_for_election(
+            unknown_style, parameters.internal_manifest, parameters.context
+        )
@@ -0,0 +1,32 @@
+from typing import Any
+
+from app.core import cache as cache_module
+from app.core.cache import LruCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LruCache[str] = LruCache(max_size=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    cache.invalidate("c")
+    assert cache.get("c") is None
+    assert cache.stats() == {"hits": 3, "misses": 2, "size": 1}
+
+
+def test_lru_cache_expires_entries(monkeypatch: Any) -> None:
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now[0])
+    cache: LruCache[str] = LruCache(max_size=2, ttl_seconds=10)
+    cache.set("a", "1")
+
+    now[0] = 109.0
+    assert cache.get("a") == "1"
+    now[0] = 111.0
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,60 @@
+from dataclasses import replace
+import json
+
+from electionguard.decryption import compute_decryption_share
+from electionguard.election import make_ciphertext_election_context
+from electionguard.elgamal import elgamal_encrypt
+from electionguard.group import int_to_q, mult_p, rand_q, TWO_MOD_P
+from electionguard.key_ceremony import generate_election_key_pair
+from electionguard.manifest import InternalManifest, Manifest
+from electionguard.tally import CiphertextTally
+
+from app.core.decryption_share_validator import validate_decryption_share
+
+_MANIFEST_FILE = "tests/integration/data/election_description.json"
+
+
+def test_validate_decryption_share() -> None:
+    with open(_MANIFEST_FILE, encoding="utf-8") as file:
+        manifest = Manifest.from_json_object(json.load(file))
+    keys = generate_election_key_pair("guardian-1", 1, 1)
+    context = make_ciphertext_election_context(
+        1, 1, keys.key_pair.public_key, int_to_q(1), manifest.crypto_hash()
+    )
+    tally = CiphertextTally("tally-1", InternalManifest(manifest), context)
+    contests = list(tally.contests.values())[:2]
+    for contest in contests:
+        for selection in contest.selections.values():
+            selection.ciphertext = elgamal_encrypt(
+                3, rand_q(), keys.key_pair.public_key
+            )
+    share = compute_decryption_share(keys, tally, context)
+    assert share is not None
+    ciphertexts = {
+        contest.object_id: {
+            selection_id: selection.ciphertext
+            for selection_id, selection in contest.selections.items()
+        }
+        for contest in contests
+    }
+    public_key = keys.key_pair.public_key
+    extended_base_hash = context.crypto_extended_base_hash
+
+    for batch in (False, True):
+        assert (
+            validate_decryption_share(
+                share, ciphertexts, public_key, extended_base_hash, batch
+            )
+            is None
+        )
+
+    contest_id = contests[1].object_id
+    selection_id = list(contests[1].selections)[0]
+    selection_share = share.contests[contest_id].selections[selection_id]
+    share.contests[contest_id].selections[selection_id] = replace(
+        selection_share, share=mult_p(selection_share.share, TWO_MOD_P)
+    )
+    for batch in (False, True):
+        assert validate_decryption_share(
+            share, ciphertexts, public_key, extended_base_hash, batch
+        ) == (contest_id, selection_id)
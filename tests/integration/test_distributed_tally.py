@@ -0,0 +1,40 @@
+from dataclasses import replace
+from typing import Any
+import json
+
+from electionguard.elgamal import elgamal_add
+from electionguard.group import int_to_q
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.core.ballot import set_ballots
+from app.core.distributed_tally import publish_tally_shards, reduce_tally_shards
+from app.core.settings import Settings
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_distributed_tally_merges_shards(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    settings = Settings(TALLY_SHARD_SIZE=2)
+    ballots = [
+        replace(ballot, object_id=f"ballot-{index}", code=int_to_q(index + 1))
+        for index in range(5)
+    ]
+    set_ballots("election-1", ballots, settings)
+
+    shard_ids = publish_tally_shards(
+        "election-1", "tally-1", {"state": ballot.state.name}, 0, settings
+    )
+    selections, ballot_ids = reduce_tally_shards(
+        "election-1", "tally-1", shard_ids, settings
+    )
+
+    assert len(shard_ids) == 3
+    assert ballot_ids == {ballot.object_id for ballot in ballots}
+    for contest in ballot.contests:
+        for selection in contest.ballot_selections:
+            assert selections[selection.object_id] == elgamal_add(
+                *[selection.ciphertext] * len(ballots)
+            )
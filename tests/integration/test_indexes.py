@@ -0,0 +1,145 @@
+from typing import Any, Dict, List
+
+from pymongo.errors import OperationFailure
+
+from app.core import repository
+from app.core.indexes import (
+    ensure_all_mongo_indexes,
+    find_missing_mongo_indexes,
+    find_mongo_index_failures,
+)
+from app.core.repository import (
+    COLLECTION_INDEXES,
+    INDEX_FAILURE_COLLECTION,
+    DataCollection,
+    IndexSpec,
+    ensure_mongo_indexes,
+)
+
+
+class FakeCollection:
+    def __init__(self, failures: int = 0) -> None:
+        self.indexes: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)]}}
+        self.failures = failures
+        self.attempts = 0
+        self.documents: List[Dict[str, Any]] = []
+
+    def create_indexes(self, models: List[Any]) -> None:
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise OperationFailure("E11000 duplicate key error")
+        for model in models:
+            document = model.document
+            self.indexes[document["name"]] = {
+                "key": list(document["key"].items()),
+                "unique": document.get("unique", False),
+            }
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        return self.indexes
+
+    def find(self, filter: Dict[str, Any], projection: Any) -> List[Dict[str, Any]]:
+        return [dict(document) for document in self.documents]
+
+    def update_one(
+        self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool
+    ) -> None:
+        document = next(
+            (
+                document
+                for document in self.documents
+                if document.items() >= filter.items()
+            ),
+            None,
+        )
+        if document is None:
+            document = dict(filter)
+            self.documents.append(document)
+        document.update(update["$set"])
+        for field, increment in update["$inc"].items():
+            document[field] = document.get(field, 0) + increment
+
+    def delete_one(self, filter: Dict[str, Any]) -> None:
+        self.documents = [
+            document
+            for document in self.documents
+            if not document.items() >= filter.items()
+        ]
+
+
+class FakeDatabase:
+    def __init__(self, name: str, collections: Dict[str, FakeCollection]) -> None:
+        self.name = name
+        self.collections = collections
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
+
+    def list_collection_names(self) -> List[str]:
+        return list(self.collections)
+
+
+class FakeClient:
+    def __init__(self, databases: List[FakeDatabase]) -> None:
+        self.databases = {database.name: database for database in databases}
+
+    def get_database(self, name: str) -> FakeDatabase:
+        return self.databases[name]
+
+    def list_database_names(self) -> List[str]:
+        return list(self.databases)
+
+
+def test_ensure_all_mongo_indexes(monkeypatch: Any) -> None:
+    monkeypatch.setattr(repository, "_ensured_indexes", set())
+    monkeypatch.setattr(repository, "_failed_indexes", {})
+    codes = FakeCollection(failures=1)
+    client: Any = FakeClient(
+        [
+            FakeDatabase(
+                "client-1",
+                {
+                    DataCollection.BALLOT_CODE: codes,
+                    DataCollection.ELECTION: FakeCollection(),
+                    "unregistered": FakeCollection(),
+                },
+            ),
+            FakeDatabase("admin", {DataCollection.ELECTION: FakeCollection()}),
+        ]
+    )
+    missing = find_missing_mongo_indexes(client)
+    assert missing == [
+        ("client-1", DataCollection.BALLOT_CODE, IndexSpec(("code",), unique=True)),
+        (
+            "client-1",
+            DataCollection.BALLOT_CODE,
+            IndexSpec(("object_id",), unique=True),
+        ),
+        ("client-1", DataCollection.BALLOT_CODE, IndexSpec(("state",))),
+        ("client-1", DataCollection.ELECTION, IndexSpec(("election_id",))),
+    ]
+
+    # a failed creation is reported and recorded, rather than remembered as done
+    assert ensure_all_mongo_indexes(client) == [
+        ("client-1", DataCollection.BALLOT_CODE)
+    ]
+    assert [spec for _, _, spec in find_missing_mongo_indexes(client)] == (
+        COLLECTION_INDEXES[DataCollection.BALLOT_CODE]
+    )
+    [(database_name, failure)] = find_mongo_index_failures(client)
+    assert database_name == "client-1"
+    assert failure["collection"] == DataCollection.BALLOT_CODE
+    assert (failure["attempts"], failure["retry_seconds"]) == (1, 60.0)
+
+    # repositories do not retry it until the backoff has passed
+    database: Any = client.get_database("client-1")
+    assert not ensure_mongo_indexes(database, DataCollection.BALLOT_CODE)
+    assert codes.attempts == 1
+
+    # a forced retry, as by the command line, creates them and clears the failure
+    assert not ensure_all_mongo_indexes(client)
+    assert codes.attempts == 2
+    assert not find_missing_mongo_indexes(client)
+    assert not find_mongo_index_failures(client)
+    assert ensure_mongo_indexes(database, DataCollection.BALLOT_CODE)
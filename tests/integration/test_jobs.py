@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from time import monotonic, sleep
+from typing import Any, List
+import json
+
+from app.api.v1.models import Job, JobKind, JobState
+from app.core import job as job_module
+from app.core.client import get_client_id
+from app.core.job import get_job, resume_jobs, shutdown_job_workers, submit_job
+from app.core.repository import get_repository, DataCollection
+from app.core.settings import Settings
+
+
+def _wait_for_job(job_id: str, settings: Settings) -> Job:
+    deadline = monotonic() + 10
+    while monotonic() < deadline:
+        job = get_job(job_id, settings)
+        if job.state in (JobState.COMPLETE, JobState.ERROR):
+            return job
+        sleep(0.05)
+    raise TimeoutError(job_id)
+
+
+def test_jobs_run_and_resume(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    settings = Settings()
+    tallied: List[str] = []
+    monkeypatch.setitem(
+        job_module._job_handlers,
+        JobKind.CIPHERTEXT_TALLY,
+        lambda job, _: tallied.append(job.tally_name),
+    )
+    try:
+        job = _wait_for_job(
+            submit_job(
+                JobKind.CIPHERTEXT_TALLY, "election-1", "tally-1", None, settings
+            ).job_id,
+            settings,
+        )
+        assert job.state == JobState.COMPLETE
+        assert job.attempts == 1
+
+        # a job whose process stopped while it was running
+        now = datetime.now(timezone.utc)
+        abandoned = Job(
+            job_id="job-2",
+            kind=JobKind.CIPHERTEXT_TALLY,
+            election_id="election-1",
+            tally_name="tally-2",
+            state=JobState.PROCESSING,
+            version=1,
+            attempts=1,
+            created=now,
+            updated=now,
+            lease_owner="stopped-process",
+            lease_expires=now - timedelta(seconds=1),
+        )
+        with get_repository(
+            get_client_id(), DataCollection.JOB, settings
+        ) as repository:
+            repository.set(json.loads(abandoned.json()))
+
+        assert resume_jobs(settings) == 1
+        job = _wait_for_job("job-2", settings)
+        assert job.state == JobState.COMPLETE
+        assert job.attempts == 2
+        assert tallied == ["tally-1", "tally-2"]
+    finally:
+        shutdown_job_workers()
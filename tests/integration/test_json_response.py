@@ -0,0 +1,39 @@
+from datetime import datetime
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.v1.common.json_response import _accepts_gzip, encode_json
+from app.api.v1.models import (
+    PlaintextTally,
+    PlaintextTallyQueryResponse,
+    PlaintextTallyState,
+)
+
+
+def test_encode_json_matches_jsonable_encoder() -> None:
+    response = PlaintextTallyQueryResponse(
+        tallies=[
+            PlaintextTally(
+                election_id="election",
+                tally_name="tally",
+                created=datetime(2021, 5, 1, 12, 30, 15, 123456),
+                state=PlaintextTallyState.COMPLETE,
+                tally={"contests": {"contest": {"votes": 2 ** 70}}},
+            )
+        ]
+    )
+
+    assert json.loads(encode_json(response)) == jsonable_encoder(response)
+
+
+def test_accepts_gzip_honors_quality() -> None:
+    assert _accepts_gzip("gzip, deflate, br")
+    assert _accepts_gzip("deflate;q=0.5, GZIP;q=0.8")
+    assert _accepts_gzip("*")
+    assert not _accepts_gzip("")
+    assert not _accepts_gzip("identity")
+    assert not _accepts_gzip("gzip;q=0")
+    assert not _accepts_gzip("gzip; q=0.000, deflate")
+    assert not _accepts_gzip("*, gzip;q=0")
+    assert not _accepts_gzip("gzip;q=invalid")
@@ -0,0 +1,230 @@
+from typing import Any
+import json
+import os
+import pytest
+
+from app.core import repository as repository_module
+from app.core.repository import (
+    DataCollection,
+    DuplicateKeyError,
+    LOCAL_INDEX_FILENAME,
+    LocalRepository,
+)
+
+
+def test_local_repository_get_uses_index(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST"})
+        repository.set({"object_id": "ballot-10", "state": "SPOILED"})
+
+        assert repository.get({"object_id": "ballot-1"})["state"] == "CAST"
+        assert repository.get({"object_id": "ballot-10"})["state"] == "SPOILED"
+        assert repository.get({"object_id": "ballot-2"}) is None
+        # non-indexed fields fall back to a scan with exact matching
+        assert repository.get({"state": "SPOILED"})["object_id"] == "ballot-10"
+
+
+def test_local_repository_rebuilds_missing_index(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST"})
+
+    os.remove(
+        os.path.join(
+            tmp_path,
+            "storage",
+            "election-1",
+            DataCollection.SUBMITTED_BALLOT,
+            LOCAL_INDEX_FILENAME,
+        )
+    )
+
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        assert repository.get({"object_id": "ballot-1"})["state"] == "CAST"
+
+
+def test_local_repository_rebuilds_index_behind_segments(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST"})
+
+    storage = os.path.join(
+        tmp_path, "storage", "election-1", DataCollection.SUBMITTED_BALLOT
+    )
+    (segment,) = [name for name in os.listdir(storage) if name.startswith("segment-")]
+    # a crash after a record reached the segment but before it was indexed,
+    # followed by a crash while writing the next record
+    with open(os.path.join(storage, segment), "ab") as file:
+        file.write(
+            json.dumps(
+                {"key": "ballot-2", "document": {"object_id": "ballot-2"}}
+            ).encode()
+            + b"\n"
+        )
+        file.write(b'{"key": "ballot-3", "docu')
+
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        assert repository.get({"object_id": "ballot-2"}) is not None
+        repository.set({"object_id": "ballot-4", "state": "CAST"})
+        assert [document["object_id"] for document in repository.find({})] == [
+            "ballot-1",
+            "ballot-2",
+            "ballot-4",
+        ]
+
+
+def test_local_repository_find_filters_skips_and_limits(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        for index in range(5):
+            state = "CAST" if index % 2 == 0 else "SPOILED"
+            repository.set({"object_id": f"ballot-{index}", "state": state})
+
+        cast = [ballot["object_id"] for ballot in repository.find({"state": "CAST"})]
+        assert cast == ["ballot-0", "ballot-2", "ballot-4"]
+
+        page = [
+            ballot["object_id"]
+            for ballot in repository.find({"state": "CAST"}, skip=1, limit=1)
+        ]
+        assert page == ["ballot-2"]
+
+        assert len(list(repository.find({}))) == 5
+        assert len(list(repository.find({"state": "CAST", "style_id": "x"}))) == 0
+
+
+def test_local_repository_update_reindexes(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "UNKNOWN"})
+
+        assert repository.update({"object_id": "ballot-1"}, {"state": "CAST"}) == 1
+        assert repository.update({"object_id": "ballot-2"}, {"state": "CAST"}) == 0
+
+        assert repository.get({"object_id": "ballot-1"})["state"] == "CAST"
+        assert len(list(repository.find({"state": "UNKNOWN"}))) == 0
+        assert len(list(repository.find({"state": "CAST"}))) == 1
+
+
+def test_local_repository_appends_lists_to_segments(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        keys = repository.set(
+            [{"object_id": f"ballot-{index}", "state": "CAST"} for index in range(100)]
+        )
+
+        assert len(keys) == 100
+        assert repository.get({"object_id": "ballot-42"})["state"] == "CAST"
+
+    storage = os.path.join(
+        tmp_path, "storage", "election-1", DataCollection.SUBMITTED_BALLOT
+    )
+    assert not [name for name in os.listdir(storage) if name.endswith(".json")]
+
+
+def test_local_repository_compacts_superseded_segments(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repository_module, "LOCAL_SEGMENT_MAX_BYTES", 256)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST", "version": 0})
+        for version in range(1, 50):
+            repository.update({"object_id": "ballot-1"}, {"version": version})
+
+        assert repository.get({"object_id": "ballot-1"})["version"] == 49
+
+    storage = os.path.join(
+        tmp_path, "storage", "election-1", DataCollection.SUBMITTED_BALLOT
+    )
+    segments = [name for name in os.listdir(storage) if name.startswith("segment-")]
+    assert len(segments) <= 2
+    # the index is compacted along with the segments
+    with open(os.path.join(storage, LOCAL_INDEX_FILENAME), encoding="utf-8") as file:
+        assert len(file.readlines()) < 10
+
+    # the index can be rebuilt from the compacted segments
+    os.remove(os.path.join(storage, LOCAL_INDEX_FILENAME))
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        assert repository.get({"object_id": "ballot-1"})["version"] == 49
+
+
+def test_local_repository_projects_fields(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set(
+            {
+                "object_id": "ballot-1",
+                "state": "CAST",
+                "contests": [
+                    {
+                        "object_id": "contest-1",
+                        "proof": "proof",
+                        "ballot_selections": [
+                            {
+                                "object_id": "selection-1",
+                                "ciphertext": "c1",
+                                "proof": "p",
+                            }
+                        ],
+                    }
+                ],
+            }
+        )
+
+        ballot = repository.get(
+            {"object_id": "ballot-1"},
+            ["state", "contests.ballot_selections.ciphertext"],
+        )
+        assert ballot == {
+            "state": "CAST",
+            "contests": [{"ballot_selections": [{"ciphertext": "c1"}]}],
+        }
+
+
+def test_local_repository_increments_and_rejects_duplicates(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.BALLOT_INVENTORY) as repository:
+        repository.increment({"election_id": "election-1"}, {"cast_ballot_count": 2})
+        repository.increment({"election_id": "election-1"}, {"cast_ballot_count": 3})
+        assert repository.get({"election_id": "election-1"})["cast_ballot_count"] == 5
+
+    with LocalRepository("election-1", DataCollection.BALLOT_CODE) as repository:
+        repository.set({"code": "code-1", "object_id": "ballot-1", "state": "CAST"})
+        with pytest.raises(DuplicateKeyError):
+            repository.set(
+                [
+                    {"code": "code-2", "object_id": "ballot-2", "state": "CAST"},
+                    {"code": "code-1", "object_id": "ballot-3", "state": "CAST"},
+                ]
+            )
+        assert repository.get({"code": "code-2"}) is None
+
+
+def test_local_repository_sets_unordered(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    with LocalRepository("election-1", DataCollection.SUBMITTED_BALLOT) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST"})
+        duplicates = repository.set_unordered(
+            [
+                {"object_id": "ballot-1", "state": "CAST"},
+                {"object_id": "ballot-2", "state": "CAST"},
+                {"object_id": "ballot-2", "state": "SPOILED"},
+                {"object_id": "ballot-3", "state": "SPOILED"},
+            ]
+        )
+
+        assert duplicates == [0, 2]
+        assert repository.get({"object_id": "ballot-2"})["state"] == "CAST"
+        assert repository.get({"object_id": "ballot-3"})["state"] == "SPOILED"
@@ -0,0 +1,35 @@
+from dataclasses import replace
+from typing import Any
+import json
+
+from electionguard.elgamal import elgamal_add
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.core.running_tally import (
+    accumulate_running_tally,
+    get_running_tally,
+    read_running_tally_selections,
+)
+
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_accumulate_running_tally(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    assert get_running_tally("election-1").version == 0
+
+    accumulate_running_tally("election-1", [ballot])
+    accumulate_running_tally("election-1", [replace(ballot, object_id="ballot-2")])
+
+    running_tally = get_running_tally("election-1")
+    assert running_tally.version == 2
+    assert running_tally.cast_ballot_count == 2
+    selections = read_running_tally_selections(running_tally)
+    for contest in ballot.contests:
+        for selection in contest.ballot_selections:
+            if not selection.is_placeholder_selection:
+                assert selections[selection.object_id] == elgamal_add(
+                    selection.ciphertext, selection.ciphertext
+                )
@@ -0,0 +1,81 @@
+from typing import Any
+import os
+import pytest
+
+from app.core.repository import DataCollection, DuplicateKeyError, SqliteRepository
+
+
+def test_sqlite_repository_round_trip(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "electionguard.db")
+    with SqliteRepository(
+        path, "election-1", DataCollection.SUBMITTED_BALLOT
+    ) as repository:
+        ids = repository.set(
+            [
+                {
+                    "object_id": f"ballot-{index}",
+                    "state": "CAST" if index % 2 else "SPOILED",
+                }
+                for index in range(10)
+            ]
+        )
+        assert len(ids) == 10
+
+        assert repository.get({"object_id": "ballot-3"})["state"] == "CAST"
+        assert repository.get({"object_id": "missing"}) is None
+
+        cast = [
+            ballot["object_id"] for ballot in repository.find({"state": "CAST"}, 1, 2)
+        ]
+        assert cast == ["ballot-3", "ballot-5"]
+
+        assert repository.update({"object_id": "ballot-3"}, {"state": "SPOILED"}) == 1
+        assert repository.get({"object_id": "ballot-3"})["state"] == "SPOILED"
+        assert len(list(repository.find({"state": "CAST"}))) == 4
+
+    # containers partition the collection
+    with SqliteRepository(
+        path, "election-2", DataCollection.SUBMITTED_BALLOT
+    ) as repository:
+        assert repository.get({"object_id": "ballot-3"}) is None
+
+
+def test_sqlite_repository_increments_and_rejects_duplicates(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "electionguard.db")
+    with SqliteRepository(
+        path, "election-1", DataCollection.BALLOT_INVENTORY
+    ) as repository:
+        repository.increment({"election_id": "election-1"}, {"cast_ballot_count": 2})
+        repository.increment({"election_id": "election-1"}, {"cast_ballot_count": 3})
+        assert repository.get({"election_id": "election-1"})["cast_ballot_count"] == 5
+
+    with SqliteRepository(path, "election-1", DataCollection.BALLOT_CODE) as repository:
+        repository.set({"code": "code-1", "object_id": "ballot-1", "state": "CAST"})
+        with pytest.raises(DuplicateKeyError):
+            repository.set(
+                [
+                    {"code": "code-2", "object_id": "ballot-2", "state": "CAST"},
+                    {"code": "code-1", "object_id": "ballot-3", "state": "CAST"},
+                ]
+            )
+        assert repository.get({"code": "code-2"}) is None
+
+
+def test_sqlite_repository_sets_unordered(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "electionguard.db")
+    with SqliteRepository(
+        path, "election-1", DataCollection.SUBMITTED_BALLOT
+    ) as repository:
+        repository.set({"object_id": "ballot-1", "state": "CAST"})
+        duplicates = repository.set_unordered(
+            [
+                {"object_id": "ballot-1", "state": "CAST"},
+                {"object_id": "ballot-2", "state": "CAST"},
+                {"object_id": "ballot-2", "state": "SPOILED"},
+                {"object_id": "ballot-3", "state": "SPOILED"},
+            ]
+        )
+
+        assert duplicates == [0, 2]
+        assert repository.get({"object_id": "ballot-2"})["state"] == "CAST"
+        assert repository.get({"object_id": "ballot-3"})["state"] == "SPOILED"
@@ -0,0 +1,133 @@
+from dataclasses import replace
+from typing import Any, Dict, List
+import json
+
+import pytest
+from fastapi import HTTPException
+from electionguard.ballot import BallotBoxState
+from electionguard.election import make_ciphertext_election_context
+from electionguard.elgamal import elgamal_add, elgamal_keypair_from_secret
+from electionguard.group import int_to_q
+from electionguard.manifest import InternalManifest, Manifest
+from electionguard.tally import CiphertextTally
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.mediator import tally as tally_routes
+from app.api.v1.models import BallotInventory, CiphertextTallyProgress
+from app.core.ballot import set_ballots
+from app.core.scheduler import get_scheduler
+from app.core.settings import Settings
+from app.core.tally import get_ciphertext_tally_progress
+
+_MANIFEST_FILE = "tests/integration/data/election_description.json"
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_streamed_recompute_matches_single_chunk(
+    tmp_path: Any, monkeypatch: Any
+) -> None:
+    with open(_MANIFEST_FILE, encoding="utf-8") as file:
+        manifest = Manifest.from_json_object(json.load(file))
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    keys = elgamal_keypair_from_secret(int_to_q(2))
+    assert keys is not None
+    context = make_ciphertext_election_context(
+        1, 1, keys.public_key, int_to_q(1), manifest.crypto_hash()
+    )
+    ballots = [
+        replace(
+            ballot,
+            object_id=f"ballot-{index}",
+            code=int_to_q(index + 1),
+            state=BallotBoxState.SPOILED if index % 3 == 2 else BallotBoxState.CAST,
+        )
+        for index in range(7)
+    ]
+    set_ballots("election-1", ballots)
+    inventory = BallotInventory(
+        election_id="election-1", cast_ballot_count=5, spoiled_ballot_count=2
+    )
+
+    recorded: List[int] = []
+    set_progress = tally_routes.set_ciphertext_tally_progress
+
+    def record_progress(progress: CiphertextTallyProgress, settings: Settings) -> Any:
+        recorded.append(progress.processed_ballot_count)
+        return set_progress(progress, settings)
+
+    monkeypatch.setattr(tally_routes, "set_ciphertext_tally_progress", record_progress)
+
+    def recompute(tally_name: str, chunk_size: int) -> CiphertextTally:
+        sdk_tally = CiphertextTally(tally_name, InternalManifest(manifest), context)
+        progress = CiphertextTallyProgress(
+            election_id="election-1", tally_name=tally_name, ballot_count=7
+        )
+        # pylint: disable=protected-access
+        tally_routes._accumulate_stored_ballots(
+            sdk_tally,
+            progress,
+            inventory,
+            Settings(TALLY_CHUNK_SIZE=chunk_size),
+            get_scheduler(),
+        )
+        return sdk_tally
+
+    single = recompute("tally-single", 100)
+    assert recorded == [0, 5, 7]
+    recorded.clear()
+    streamed = recompute("tally-streamed", 2)
+    assert recorded == [0, 2, 4, 5, 7]
+    assert get_ciphertext_tally_progress("election-1", "tally-streamed") == (
+        CiphertextTallyProgress(
+            election_id="election-1",
+            tally_name="tally-streamed",
+            ballot_count=7,
+            processed_ballot_count=7,
+        )
+    )
+
+    def ciphertexts(sdk_tally: CiphertextTally) -> Dict[str, Any]:
+        return {
+            selection_id: selection.ciphertext
+            for contest in sdk_tally.contests.values()
+            for selection_id, selection in contest.selections.items()
+        }
+
+    # pylint: disable=protected-access
+    assert streamed._cast_ballot_ids == single._cast_ballot_ids
+    assert streamed._spoiled_ballot_ids == single._spoiled_ballot_ids
+    assert len(streamed._cast_ballot_ids) == 5
+    assert ciphertexts(streamed) == ciphertexts(single)
+    streamed_ciphertexts = ciphertexts(streamed)
+    selections = [
+        selection
+        for contest in ballot.contests
+        for selection in contest.ballot_selections
+        if selection.object_id in streamed_ciphertexts
+    ]
+    assert selections
+    for selection in selections:
+        assert streamed_ciphertexts[selection.object_id] == elgamal_add(
+            *[selection.ciphertext] * 5
+        )
+
+    class FailedScheduler:
+        def schedule(self, *_: Any) -> List[Any]:
+            return []
+
+    failed = CiphertextTally("tally-failed", InternalManifest(manifest), context)
+    with pytest.raises(HTTPException) as error:
+        # pylint: disable=protected-access
+        tally_routes._accumulate_stored_ballots(
+            failed,
+            CiphertextTallyProgress(
+                election_id="election-1", tally_name="tally-failed", ballot_count=7
+            ),
+            inventory,
+            Settings(),
+            FailedScheduler(),  # type: ignore
+        )
+    assert error.value.status_code == 500
+    assert not failed._cast_ballot_ids
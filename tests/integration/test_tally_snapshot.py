@@ -0,0 +1,118 @@
+from dataclasses import replace
+from typing import Any, List
+import json
+
+from electionguard.ballot import BallotBoxState
+from electionguard.election import make_ciphertext_election_context
+from electionguard.elgamal import elgamal_keypair_from_secret
+from electionguard.group import int_to_q
+from electionguard.manifest import Manifest
+from electionguard.serializable import write_json_object
+from fastapi.testclient import TestClient
+
+from app.api.v1.common.ballot_decoder import decode_submitted_ballot
+from app.api.v1.mediator import tally as tally_routes
+from app.api.v1.models import Election, ElectionState
+from app.core import ballot as ballot_core
+from app.core.ballot import add_ballot_inventory, set_ballots
+from app.core.election import set_election
+from app.core.running_tally import accumulate_running_tally
+from app.core.settings import ApiMode, Settings
+from app.core.tally import filter_ciphertext_tallies
+from app.main import get_app
+
+from .api_utils import BASE_URL
+
+_MANIFEST_FILE = "tests/integration/data/election_description.json"
+_BALLOT_FILE = "tests/integration/data/ballot-encrypted-simple.json"
+
+
+def test_tally_from_running_tally_snapshot(tmp_path: Any, monkeypatch: Any) -> None:
+    with open(_MANIFEST_FILE, encoding="utf-8") as file:
+        manifest_json = json.load(file)
+    with open(_BALLOT_FILE, encoding="utf-8") as file:
+        ballot = decode_submitted_ballot(json.load(file)["ballots"][0])
+    monkeypatch.chdir(tmp_path)
+    election_id = "election-snapshot"
+    keys = elgamal_keypair_from_secret(int_to_q(2))
+    assert keys is not None
+    context = make_ciphertext_election_context(
+        1,
+        1,
+        keys.public_key,
+        int_to_q(1),
+        Manifest.from_json_object(manifest_json).crypto_hash(),
+    )
+    set_election(
+        Election(
+            election_id=election_id,
+            key_name="key-snapshot",
+            state=ElectionState.OPEN,
+            context=write_json_object(context),
+            manifest=manifest_json,
+        )
+    )
+    ballots = [
+        replace(
+            ballot,
+            object_id=f"ballot-{index}",
+            code=int_to_q(index + 1),
+            state=BallotBoxState.SPOILED if index == 3 else BallotBoxState.CAST,
+        )
+        for index in range(6)
+    ]
+    set_ballots(election_id, ballots)
+    add_ballot_inventory(election_id, ballots[:4])
+
+    tallies: List[Any] = []
+    set_selection_ciphertexts = tally_routes._set_selection_ciphertexts
+    accumulate_stored_ballots = tally_routes._accumulate_stored_ballots
+
+    def record_snapshot(sdk_tally: Any, *args: Any) -> None:
+        tallies.append(sdk_tally)
+        set_selection_ciphertexts(sdk_tally, *args)
+
+    recomputed: List[Any] = []
+
+    def record_recompute(sdk_tally: Any, *args: Any) -> None:
+        recomputed.append(sdk_tally)
+        accumulate_stored_ballots(sdk_tally, *args)
+
+    monkeypatch.setattr(tally_routes, "_set_selection_ciphertexts", record_snapshot)
+    monkeypatch.setattr(tally_routes, "_accumulate_stored_ballots", record_recompute)
+    client = TestClient(get_app(Settings(API_MODE=ApiMode.MEDIATOR)))
+
+    def tally(tally_name: str) -> None:
+        response = client.post(
+            f"{BASE_URL}/tally",
+            params={"election_id": election_id, "tally_name": tally_name},
+        )
+        assert response.status_code == 200
+
+    tally("tally-snapshot")
+    assert not recomputed
+    # pylint: disable=protected-access
+    assert tallies[0]._cast_ballot_ids == {"ballot-0", "ballot-1", "ballot-2"}
+    assert tallies[0]._spoiled_ballot_ids == {"ballot-3"}
+
+    # a retried tally replaces the tally stored by the first attempt
+    tally("tally-snapshot")
+    stored = filter_ciphertext_tallies(election_id, {"tally_name": "tally-snapshot"})
+    assert len(stored) == 1
+
+    # ballot-4 is counted by the inventory but its running tally update is lost,
+    # while ballot-5 is added to the running tally but not to the inventory
+    monkeypatch.setattr(ballot_core, "accumulate_running_tally", lambda *_: False)
+    add_ballot_inventory(election_id, [ballots[4]])
+    assert accumulate_running_tally(election_id, [ballots[5]])
+
+    tallies.clear()
+    tally("tally-recomputed")
+    assert not tallies
+    assert len(recomputed) == 1
+    assert recomputed[0]._cast_ballot_ids == {
+        "ballot-0",
+        "ballot-1",
+        "ballot-2",
+        "ballot-4",
+    }